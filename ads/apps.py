@@ -5,3 +5,6 @@ class AdsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'ads'
     verbose_name = 'Управление объявлениями'
+
+    def ready(self):
+        from ads import barter, cache, matches  # noqa: F401
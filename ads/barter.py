@@ -0,0 +1,220 @@
+"""Поиск многосторонних обменов (циклов) по ожидающим предложениям.
+
+Граф «пользователь → пользователь»: ребро sender_user → receiver_user
+означает, что отправитель хочет объявление получателя. Цикл
+A → B → C → A — обмен, в котором каждый отдаёт своё объявление
+предыдущему участнику и получает объявление следующего.
+"""
+import threading
+from collections import defaultdict
+from datetime import timedelta
+
+from django.conf import settings
+from django.db.models.signals import post_delete
+from django.dispatch import receiver
+from django.utils import timezone
+
+from ads import choices as chcs
+from ads.models import ExchangeProposal
+
+
+class BarterGraph:
+    """Ориентированный граф ожидающих предложений в памяти.
+    Рёбра добавляются и удаляются по одному (идемпотентно); для пары
+    пользователей хранится id предложения, а множество — только если
+    предложений между ними несколько."""
+
+    def __init__(self):
+        self._out = defaultdict(dict)
+        self._in = defaultdict(set)
+        self.edge_count = 0
+
+    def add_edge(self, proposal_id, sender, receiver):
+        if sender == receiver:
+            return
+        successors = self._out[sender]
+        current = successors.get(receiver)
+        if current is None:
+            successors[receiver] = proposal_id
+            self._in[receiver].add(sender)
+        elif isinstance(current, set):
+            if proposal_id in current:
+                return
+            current.add(proposal_id)
+        elif current != proposal_id:
+            successors[receiver] = {current, proposal_id}
+        else:
+            return
+        self.edge_count += 1
+
+    def remove_edge(self, proposal_id, sender, receiver):
+        successors = self._out.get(sender)
+        current = successors.get(receiver) if successors else None
+        if isinstance(current, set):
+            if proposal_id not in current:
+                return
+            current.discard(proposal_id)
+            if len(current) == 1:
+                successors[receiver] = current.pop()
+        elif current is None or current != proposal_id:
+            return
+        else:
+            del successors[receiver]
+            self._in[receiver].discard(sender)
+            if not successors:
+                del self._out[sender]
+            if not self._in[receiver]:
+                del self._in[receiver]
+        self.edge_count -= 1
+
+    def _distances_to(self, user, max_depth):
+        """Кратчайшие расстояния до user по обратным рёбрам
+        (не длиннее max_depth)."""
+
+        distances = {user: 0}
+        frontier = [user]
+        for depth in range(1, max_depth + 1):
+            next_frontier = []
+            for node in frontier:
+                for predecessor in self._in.get(node, ()):
+                    if predecessor not in distances:
+                        distances[predecessor] = depth
+                        next_frontier.append(predecessor)
+            frontier = next_frontier
+        return distances
+
+    def find_cycles(self, user, max_length, limit):
+        """Простые циклы через user длиной от 2 до max_length.
+        Возвращает списки рёбер [(sender, receiver, proposal_id), ...].
+        Ветви, из которых не вернуться к user за оставшиеся шаги,
+        отсекаются по обратным расстояниям."""
+
+        if user not in self._out or user not in self._in:
+            return []
+        distances = self._distances_to(user, max_length - 1)
+        cycles = []
+        path = [user]
+        on_path = {user}
+        edges = []
+
+        def walk(node):
+            for successor, proposals in self._out.get(node, {}).items():
+                if len(cycles) >= limit:
+                    return
+                if isinstance(proposals, set):
+                    proposals = min(proposals)
+                edge = (node, successor, proposals)
+                if successor == user:
+                    if len(edges) >= 1:
+                        cycles.append(edges + [edge])
+                    continue
+                if successor in on_path:
+                    continue
+                distance = distances.get(successor)
+                if distance is None or len(path) + distance > max_length:
+                    continue
+                path.append(successor)
+                on_path.add(successor)
+                edges.append(edge)
+                walk(successor)
+                edges.pop()
+                on_path.discard(successor)
+                path.pop()
+
+        walk(user)
+        return cycles
+
+
+class BarterIndex:
+    """Граф ожидающих предложений процесса с инкрементальной
+    синхронизацией.
+
+    Граф загружается один раз, затем перед каждым поиском дочитываются
+    только предложения, изменённые после последней синхронизации
+    (по updated_at с запасом BARTER_SYNC_OVERLAP на долгие транзакции).
+    Удалённые предложения убираются сигналом в своём процессе, а в
+    остальных — при проверке найденных циклов по БД."""
+
+    chunk_size = 5000
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.graph = None
+        self._synced_at = None
+
+    def reset(self):
+        with self._lock:
+            self.graph = None
+            self._synced_at = None
+
+    def _apply(self, rows):
+        for proposal_id, sender, receiver, status in rows:
+            if status == chcs.Status.PENDING:
+                self.graph.add_edge(proposal_id, sender, receiver)
+            else:
+                self.graph.remove_edge(proposal_id, sender, receiver)
+
+    def sync(self):
+        started = timezone.now()
+        columns = ('id', 'sender_user_id', 'receiver_user_id', 'status')
+        if self.graph is None:
+            self.graph = BarterGraph()
+            queryset = ExchangeProposal.objects.filter(status=chcs.Status.PENDING)
+        else:
+            queryset = ExchangeProposal.objects.filter(
+                updated_at__gte=self._synced_at - timedelta(
+                    seconds=settings.BARTER_SYNC_OVERLAP
+                )
+            )
+        self._apply(
+            queryset.values_list(*columns).iterator(chunk_size=self.chunk_size)
+        )
+        self._synced_at = started
+
+    def remove(self, proposal):
+        with self._lock:
+            if self.graph is not None:
+                self.graph.remove_edge(
+                    proposal.id, proposal.sender_user_id, proposal.receiver_user_id
+                )
+
+    def find_cycles(self, user_id, max_length, limit):
+        """Циклы обмена через пользователя, все предложения которых
+        всё ещё ожидают ответа. Возвращает списки словарей предложений."""
+
+        with self._lock:
+            self.sync()
+            cycles = self.graph.find_cycles(user_id, max_length, limit)
+
+        ids = {proposal_id for cycle in cycles for *_, proposal_id in cycle}
+        proposals = {
+            proposal['id']: proposal
+            for proposal in ExchangeProposal.objects.filter(
+                id__in=ids, status=chcs.Status.PENDING
+            ).values(
+                'id', 'sender_user_id', 'receiver_user_id',
+                'ad_sender_id', 'ad_receiver_id',
+            )
+        }
+        stale = ids.difference(proposals)
+        if stale:
+            with self._lock:
+                for cycle in cycles:
+                    for sender, receiver, proposal_id in cycle:
+                        if proposal_id in stale:
+                            self.graph.remove_edge(proposal_id, sender, receiver)
+        return [
+            [proposals[proposal_id] for *_, proposal_id in cycle]
+            for cycle in cycles
+            if all(proposal_id in proposals for *_, proposal_id in cycle)
+        ]
+
+
+barter_index = BarterIndex()
+
+
+@receiver(post_delete, sender=ExchangeProposal)
+def remove_deleted_proposal(sender, instance, **kwargs):
+    """Убирает удалённое предложение из графа процесса."""
+
+    barter_index.remove(instance)
@@ -0,0 +1,90 @@
+"""Общие части команд benchmark_api и benchmark_concurrency: коммит
+прогона, квантили задержек, отчёт в JSON и тестовый клиент поверх
+ASGI-обработчика.
+"""
+import json
+import statistics
+import subprocess
+
+from asgiref.sync import async_to_sync
+from django.test import AsyncClient
+
+
+def current_commit():
+    """Короткий хеш текущего коммита или None вне git."""
+
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'],
+            capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def percentiles(timings, digits=3):
+    """p50/p95/p99 списка задержек в миллисекундах."""
+
+    if len(timings) < 2:
+        timings = timings * 2 or [0.0, 0.0]
+    quantiles = statistics.quantiles(timings, n=100)
+    return {
+        'p50_ms': round(quantiles[49], digits),
+        'p95_ms': round(quantiles[94], digits),
+        'p99_ms': round(quantiles[98], digits),
+    }
+
+
+def save_report(path, report):
+    with open(path, 'w', encoding='utf-8') as file:
+        json.dump(report, file, ensure_ascii=False, indent=2)
+
+
+class _AsyncClient(AsyncClient):
+    """AsyncClient с заголовком Host из ALLOWED_HOSTS: AsyncRequestFactory
+    всегда подставляет testserver."""
+
+    def __init__(self, host, **kwargs):
+        super().__init__(**kwargs)
+        self.host = host.encode()
+
+    def request(self, **request):
+        request['headers'] = [
+            (name, self.host if name == b'host' else value)
+            for name, value in request['headers']
+        ]
+        return super().request(**request)
+
+
+class AsgiClient:
+    """Синхронный интерфейс APIClient (get/post/patch/delete с
+    format='json') поверх AsyncClient: запрос проходит через
+    ASGI-обработчик и асинхронную цепочку middleware, а вьюха
+    выполняется в вызывающем потоке, поэтому работают
+    CaptureQueriesContext и откат транзакции."""
+
+    def __init__(self, token=None, host='localhost'):
+        self.client = _AsyncClient(host)
+        self.headers = {}
+        if token is not None:
+            self.headers['Authorization'] = f'Token {token.key}'
+
+    def _request(self, method, url, data=None):
+        kwargs = {}
+        if data is not None:
+            kwargs = {'data': data, 'content_type': 'application/json'}
+        return async_to_sync(getattr(self.client, method))(
+            url, headers=self.headers, **kwargs
+        )
+
+    def get(self, url):
+        return self._request('get', url)
+
+    def post(self, url, data=None, format=None):
+        return self._request('post', url, data)
+
+    def patch(self, url, data=None, format=None):
+        return self._request('patch', url, data)
+
+    def delete(self, url, data=None, format=None):
+        return self._request('delete', url, data)
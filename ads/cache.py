@@ -0,0 +1,83 @@
+import threading
+from uuid import uuid4
+
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from ads.models import Category
+
+CATEGORY_VERSION_KEY = 'ads:categories:version'
+
+
+class CategoryCache:
+    """Кэш категорий в памяти процесса.
+    Штамп версии хранится в кэше Django и меняется после коммита любого
+    изменения категории; снимок перечитывается из БД, только когда
+    версия отличается от загруженной."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._version = None
+        self._categories = []
+        self._by_id = {}
+        self._by_title = {}
+
+    @staticmethod
+    def get_version():
+        version = cache.get(CATEGORY_VERSION_KEY)
+        if version is None:
+            cache.add(CATEGORY_VERSION_KEY, uuid4().hex, None)
+            version = cache.get(CATEGORY_VERSION_KEY)
+        return version
+
+    @staticmethod
+    def bump_version():
+        cache.set(CATEGORY_VERSION_KEY, uuid4().hex, None)
+
+    def _snapshot(self):
+        version = self.get_version()
+        with self._lock:
+            if version != self._version:
+                categories = list(Category.objects.order_by('id'))
+                self._categories = categories
+                self._by_id = {category.id: category for category in categories}
+                self._by_title = {
+                    category.title: category for category in categories
+                }
+                self._version = version
+            return self._version
+
+    @property
+    def version(self):
+        return self._snapshot()
+
+    def all(self):
+        self._snapshot()
+        return list(self._categories)
+
+    def get(self, pk):
+        self._snapshot()
+        return self._by_id.get(pk)
+
+    def get_by_title(self, title):
+        self._snapshot()
+        return self._by_title.get(title)
+
+    def titles(self):
+        return [category.title for category in self.all()]
+
+
+category_cache = CategoryCache()
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def bump_category_version(sender, **kwargs):
+    """Меняет версию кэша категорий сразу и ещё раз после коммита:
+    иначе параллельный запрос мог бы закэшировать данные до коммита
+    под новой версией."""
+
+    CategoryCache.bump_version()
+    transaction.on_commit(CategoryCache.bump_version)
@@ -24,3 +24,8 @@ PROPOSAL_STATUS_CHOICES = (
     (Status.APPROVED, 'принята'),
     (Status.REJECTED, 'отклонена'),
 )
+
+PROPOSAL_DECISION_CHOICES = (
+    (Status.APPROVED, 'принята'),
+    (Status.REJECTED, 'отклонена'),
+)
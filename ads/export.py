@@ -0,0 +1,83 @@
+"""Потоковая выгрузка объявлений и предложений обмена в NDJSON и CSV.
+
+Строки читаются из БД итератором (на PostgreSQL — серверным курсором)
+порциями по EXPORT_CHUNK_SIZE, и каждая порция сразу отдаётся
+получателю: память не зависит от объёма выгрузки.
+"""
+import csv
+import io
+import json
+
+from config import constants
+
+EXPORT_FORMATS = ('ndjson', 'csv')
+
+CONTENT_TYPES = {
+    'ndjson': 'application/x-ndjson',
+    'csv': 'text/csv; charset=utf-8',
+}
+
+# колонка выгрузки -> путь поля в запросе
+AD_EXPORT_FIELDS = {
+    'id': 'id',
+    'user': 'user__username',
+    'title': 'title',
+    'description': 'description',
+    'category': 'category__title',
+    'condition': 'condition',
+    'image_url': 'image_url',
+    'created_at': 'created_at',
+    'updated_at': 'updated_at',
+}
+
+PROPOSAL_EXPORT_FIELDS = {
+    'id': 'id',
+    'ad_sender': 'ad_sender_id',
+    'ad_receiver': 'ad_receiver_id',
+    'sender_user': 'sender_user__username',
+    'receiver_user': 'receiver_user__username',
+    'comment': 'comment',
+    'status': 'status',
+    'created_at': 'created_at',
+    'updated_at': 'updated_at',
+}
+
+
+def _plain(value):
+    return value.isoformat() if hasattr(value, 'isoformat') else value
+
+
+def render_ndjson(columns, rows, chunk_size):
+    lines = []
+    for row in rows:
+        lines.append(json.dumps(
+            dict(zip(columns, map(_plain, row))), ensure_ascii=False
+        ))
+        if len(lines) >= chunk_size:
+            yield '\n'.join(lines) + '\n'
+            lines = []
+    if lines:
+        yield '\n'.join(lines) + '\n'
+
+
+def render_csv(columns, rows, chunk_size):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(columns)
+    for number, row in enumerate(rows, 1):
+        writer.writerow(map(_plain, row))
+        if number % chunk_size == 0:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue()
+
+
+def export_chunks(queryset, fields, file_format,
+                  chunk_size=constants.EXPORT_CHUNK_SIZE):
+    """Генератор текстовых кусков выгрузки queryset в формате
+    file_format. fields — колонки {имя: путь поля}, см. AD_EXPORT_FIELDS."""
+
+    rows = queryset.values_list(*fields.values()).iterator(chunk_size=chunk_size)
+    render = render_csv if file_format == 'csv' else render_ndjson
+    return render(list(fields), rows, chunk_size)
@@ -0,0 +1,167 @@
+"""Производные изображения объявлений (уменьшенные копии и WebP).
+
+После коммита сохранения объявления с новым изображением задача
+ставится в пул потоков; готовые рендиции записываются в
+Ad.image_renditions вида {"320": {"original": name, "webp": name}}.
+Тот же пул выполняет очередь удаления файлов (MediaCleanup).
+"""
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import connections, transaction
+from PIL import Image, ImageOps
+
+from config import constants
+
+logger = logging.getLogger(__name__)
+
+RENDITIONS_DIR = 'ad_images/renditions'
+
+PIL_FORMATS = {
+    'jpg': 'JPEG',
+    'jpeg': 'JPEG',
+    'png': 'PNG',
+}
+
+_executor = None
+
+
+def get_executor():
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=settings.MEDIA_TASK_WORKERS,
+            thread_name_prefix='ad-media',
+        )
+    return _executor
+
+
+def _run_in_thread(func, *args):
+    try:
+        func(*args)
+    finally:
+        connections.close_all()
+
+
+def run_in_background(func, *args):
+    """Выполняет медиа-задачу в пуле потоков (или сразу, если
+    MEDIA_TASKS_ASYNC выключен)."""
+
+    if settings.MEDIA_TASKS_ASYNC:
+        get_executor().submit(_run_in_thread, func, *args)
+    else:
+        func(*args)
+
+
+def rendition_name(image_name, width, extension):
+    """Имя рендиции строится из полного имени изображения (уникального
+    в хранилище) вместе с расширением: photo.jpg и photo.png разных
+    объявлений получают разные рендиции."""
+
+    return f'{RENDITIONS_DIR}/{image_name}_{width}.{extension}'
+
+
+def _encode(image, pil_format):
+    buffer = BytesIO()
+    if pil_format == 'JPEG':
+        image.convert('RGB').save(
+            buffer, 'JPEG', quality=85, optimize=True, progressive=True
+        )
+    elif pil_format == 'WEBP':
+        image.save(buffer, 'WEBP', quality=80, method=4)
+    else:
+        image.save(buffer, pil_format, optimize=True)
+    return ContentFile(buffer.getvalue())
+
+
+def render_image(image_name, storage=default_storage):
+    """Создаёт рендиции изображения фиксированной ширины (без увеличения)
+    в исходном формате и в WebP. Возвращает карту рендиций."""
+
+    extension = os.path.splitext(image_name)[1].lstrip('.').lower()
+    pil_format = PIL_FORMATS.get(extension)
+    if pil_format is None:
+        return {}
+
+    with storage.open(image_name, 'rb') as source:
+        with Image.open(source) as original:
+            original = ImageOps.exif_transpose(original)
+            original.load()
+
+    renditions = {}
+    for width in constants.IMAGE_RENDITION_WIDTHS:
+        if width >= original.width:
+            continue
+        height = max(1, round(original.height * width / original.width))
+        image = original.resize((width, height), Image.Resampling.LANCZOS)
+        variants = {}
+        for key, variant_format, variant_extension in (
+            ('original', pil_format, extension),
+            ('webp', 'WEBP', 'webp'),
+        ):
+            variants[key] = storage.save(
+                rendition_name(image_name, width, variant_extension),
+                _encode(image, variant_format),
+            )
+        renditions[str(width)] = variants
+    return renditions
+
+
+def delete_renditions(renditions, storage=default_storage):
+    """Удаляет файлы рендиций из хранилища."""
+
+    for variants in (renditions or {}).values():
+        for name in variants.values():
+            storage.delete(name)
+
+
+def generate_renditions(ad_model, ad_id, image_name):
+    """Строит рендиции и сохраняет их, только если изображение
+    объявления не сменилось за время обработки (иначе удаляет файлы)."""
+
+    try:
+        renditions = render_image(image_name)
+        with transaction.atomic():
+            ad = ad_model.objects.select_for_update().filter(
+                pk=ad_id, image_url=image_name
+            ).first()
+            if ad is None:
+                delete_renditions(renditions)
+                return
+            ad.image_renditions = renditions
+            ad.save(update_fields=['image_renditions', 'updated_at'])
+    except Exception:
+        logger.exception('Не удалось создать рендиции для %s', image_name)
+
+
+def schedule_renditions(ad):
+    """Ставит построение рендиций в фоновый пул после коммита."""
+
+    image_name = ad.image_url.name
+    model, ad_id = type(ad), ad.pk
+
+    transaction.on_commit(
+        lambda: run_in_background(generate_renditions, model, ad_id, image_name)
+    )
+
+
+def build_srcset(ad, request=None, storage=default_storage):
+    """Возвращает srcset-строки рендиций по форматам:
+    {"original": "url 320w, url 640w", "webp": "..."}."""
+
+    if not ad.image_url or not ad.image_renditions:
+        return None
+    srcset = {}
+    for width, variants in sorted(
+            ad.image_renditions.items(), key=lambda item: int(item[0])):
+        for key, name in variants.items():
+            url = storage.url(name)
+            if request is not None:
+                url = request.build_absolute_uri(url)
+            srcset.setdefault(key, []).append(f'{url} {width}w')
+    return {key: ', '.join(items) for key, items in srcset.items()}
@@ -0,0 +1,200 @@
+"""Массовый импорт объявлений из NDJSON или CSV (колонки выгрузки
+ads.export.AD_EXPORT_FIELDS: user, title, description, category,
+condition, image_url; остальные игнорируются).
+
+Строки обрабатываются пачками: пользователи пачки находятся одним
+запросом, категории — по category_cache (недостающие создаются одним
+bulk_create). На PostgreSQL пачка загружается COPY во временную
+таблицу и переносится в ads_ad одним INSERT ... ON CONFLICT DO NOTHING,
+на остальных СУБД вставляется bulk_create. Объявления с занятым
+заголовком пропускаются, поэтому повторный импорт файла ничего не меняет.
+"""
+import csv
+import io
+import json
+
+from django.db import IntegrityError, connection, transaction
+from django.utils import timezone
+
+from ads import choices as chcs
+from ads.cache import CategoryCache, category_cache
+from ads.models import Ad, AdFacetCount, Category, percolate_on_commit
+from users.models import User
+
+COPY_COLUMNS = ('title', 'description', 'user_id', 'category_id',
+                'condition', 'image_url')
+
+
+def read_rows(file, file_format):
+    """Пары (номер строки, словарь колонок или None для битой строки)."""
+
+    if file_format == 'csv':
+        reader = csv.DictReader(file)
+        for row in reader:
+            yield reader.line_num, row
+        return
+    for number, line in enumerate(file, 1):
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError:
+            row = None
+        yield number, row if isinstance(row, dict) else None
+
+
+class AdImporter:
+    """Импорт пачек строк в таблицу объявлений.
+
+    import_batch возвращает (созданные объявления, число пропущенных,
+    ошибки [(номер строки, {поле: [сообщения]}), ...]). Счётчики
+    AdFacetCount и сохранённые поиски обновляются в той же транзакции,
+    что и вставка."""
+
+    condition_values = {value for value, _ in chcs.AD_CONDITION_CHOICES}
+
+    def __init__(self):
+        self.max_lengths = {
+            'title': Ad._meta.get_field('title').max_length,
+            'category': Category._meta.get_field('title').max_length,
+            'image_url': Ad._meta.get_field('image_url').max_length,
+        }
+
+    def validate(self, row):
+        if row is None:
+            return {'non_field_errors': ['Строка не является объектом JSON.']}
+        errors = {}
+        for field in ('user', 'title', 'description', 'category'):
+            if not isinstance(row.get(field), str) or not row[field].strip():
+                errors[field] = ['Обязательное поле.']
+        for field, max_length in self.max_lengths.items():
+            value = row.get(field) or ''
+            if not isinstance(value, str):
+                errors.setdefault(field, ['Ожидается строка.'])
+            elif len(value) > max_length:
+                errors.setdefault(field, [f'Не больше {max_length} символов.'])
+        condition = row.get('condition') or chcs.AdCondition.NEW
+        if (not isinstance(condition, str)
+                or condition not in self.condition_values):
+            errors['condition'] = ['Недопустимое состояние товара.']
+        return errors
+
+    @staticmethod
+    def resolve_categories(titles):
+        """Id категорий по названиям; недостающие создаются."""
+
+        found = {}
+        for title in titles:
+            category = category_cache.get_by_title(title)
+            if category is not None:
+                found[title] = category.id
+        missing = titles - found.keys()
+        if missing:
+            Category.objects.bulk_create(
+                [Category(title=title, description='') for title in missing],
+                ignore_conflicts=True,
+            )
+            found.update(Category.objects.filter(
+                title__in=missing
+            ).values_list('title', 'id'))
+            CategoryCache.bump_version()
+            transaction.on_commit(CategoryCache.bump_version)
+        return found
+
+    def import_batch(self, batch):
+        rejects, valid = [], []
+        for line, row in batch:
+            errors = self.validate(row)
+            if errors:
+                rejects.append((line, errors))
+            else:
+                valid.append((line, row))
+
+        users = dict(User.objects.filter(
+            username__in={row['user'] for _, row in valid}
+        ).values_list('username', 'id'))
+        ads, titles, duplicates = [], set(), 0
+        with transaction.atomic():
+            categories = self.resolve_categories(
+                {row['category'] for _, row in valid}
+            )
+            for line, row in valid:
+                if row['user'] not in users:
+                    rejects.append((line, {'user': ['Пользователь не найден.']}))
+                elif row['title'] in titles:
+                    duplicates += 1
+                else:
+                    titles.add(row['title'])
+                    ads.append(Ad(
+                        user_id=users[row['user']],
+                        category_id=categories[row['category']],
+                        title=row['title'],
+                        description=row['description'],
+                        condition=row.get('condition') or chcs.AdCondition.NEW,
+                        image_url=row.get('image_url') or '',
+                    ))
+            if connection.vendor == 'postgresql':
+                created = self.copy_insert(ads)
+            else:
+                created = self.bulk_insert(ads)
+            AdFacetCount.objects.add_ads(created)
+            percolate_on_commit(created)
+        skipped = duplicates + len(ads) - len(created)
+        return created, skipped, sorted(rejects, key=lambda reject: reject[0])
+
+    @staticmethod
+    def bulk_insert(ads):
+        """bulk_create без объявлений с занятыми заголовками. При гонке
+        за заголовок (IntegrityError) проверка повторяется."""
+
+        for attempt in range(2):
+            taken = set(Ad.objects.filter(
+                title__in=[ad.title for ad in ads]
+            ).values_list('title', flat=True))
+            fresh = [ad for ad in ads if ad.title not in taken]
+            try:
+                with transaction.atomic():
+                    return Ad.objects.bulk_create(fresh)
+            except IntegrityError:
+                if attempt:
+                    raise
+
+    @staticmethod
+    def copy_insert(ads):
+        """COPY во временную таблицу и INSERT ... ON CONFLICT DO NOTHING;
+        RETURNING отдаёт только действительно вставленные строки."""
+
+        buffer = io.StringIO()
+        writer = csv.writer(buffer, quoting=csv.QUOTE_ALL)
+        for ad in ads:
+            writer.writerow([
+                ad.title, ad.description, ad.user_id, ad.category_id,
+                ad.condition, ad.image_url.name,
+            ])
+        buffer.seek(0)
+        columns = ', '.join(COPY_COLUMNS)
+        now = timezone.now()
+        with connection.cursor() as cursor:
+            cursor.execute(
+                'CREATE TEMP TABLE ads_ad_import (line serial, title text, '
+                'description text, user_id bigint, category_id bigint, '
+                'condition varchar(50), image_url varchar(100)) ON COMMIT DROP'
+            )
+            cursor.copy_expert(
+                f'COPY ads_ad_import ({columns}) FROM STDIN WITH (FORMAT csv)',
+                buffer,
+            )
+            cursor.execute(
+                f'INSERT INTO ads_ad ({columns}, image_renditions, '
+                f'created_at, updated_at) '
+                f"SELECT {columns}, '{{}}'::jsonb, %s, %s FROM ads_ad_import "
+                f'ORDER BY line ON CONFLICT (title) DO NOTHING '
+                f'RETURNING id, {columns}',
+                [now, now],
+            )
+            rows = cursor.fetchall()
+        return [
+            Ad(id=row[0], created_at=now, updated_at=now,
+               **dict(zip(COPY_COLUMNS, row[1:])))
+            for row in rows
+        ]
@@ -0,0 +1,297 @@
+import json
+import logging
+import statistics
+import time
+import tracemalloc
+from urllib.parse import urlencode
+
+from django.core.management import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.db.models import Count
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+from ads import choices as chcs
+from ads.benchmark import AsgiClient, current_commit, percentiles, save_report
+from ads.models import Ad, Category, ExchangeProposal
+from users.models import User
+
+
+class Command(BaseCommand):
+    """Прогоняет все эндпоинты api/urls.py в процессе через тестовый
+    клиент DRF (полный стек middleware) на данных generate_fake_data.
+
+    Для каждого сценария выводит p50/p95/p99 задержки, число SQL-запросов
+    и пик выделенной памяти на запрос. Изменяющие запросы выполняются
+    в транзакции с откатом, поэтому данные между прогонами не меняются.
+    С --handler asgi запросы проходят через ASGI-обработчик config.asgi.
+    Результаты сохраняются в JSON для сравнения коммитов и обработчиков
+    (--baseline)."""
+
+    help = 'Нагрузочный прогон эндпоинтов API.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=50)
+        parser.add_argument('--warmup', type=int, default=5)
+        parser.add_argument(
+            '--alloc-samples', type=int, default=3,
+            help='Запросов на сценарий под tracemalloc (0 — не измерять).',
+        )
+        parser.add_argument(
+            '--only', help='Запускать сценарии, в имени которых есть подстрока.'
+        )
+        parser.add_argument(
+            '--handler', choices=('wsgi', 'asgi'), default='wsgi',
+            help='Обработчик запросов Django, через который идут запросы.',
+        )
+        parser.add_argument('--output', help='Файл для результатов в JSON.')
+        parser.add_argument(
+            '--baseline', help='JSON прошлого прогона для сравнения p95.'
+        )
+
+    def handle(self, *args, **options):
+        if options['requests'] < 2:
+            raise CommandError('Нужно не меньше 2 запросов на сценарий.')
+        self.handler = options['handler']
+        context = self._context()
+        scenarios = [
+            scenario for scenario in self._scenarios(context)
+            if not options['only'] or options['only'] in scenario[0]
+        ]
+        baseline = {}
+        if options['baseline']:
+            with open(options['baseline'], encoding='utf-8') as file:
+                baseline = json.load(file)['results']
+
+        # ответы 4xx сценариев попадают в отчёт, а не в лог
+        logging.getLogger('django.request').setLevel(logging.ERROR)
+        results = {}
+        for name, client, method, url, data in scenarios:
+            result = self._measure(client, method, url, data, options)
+            results[name] = result
+            line = (
+                f'{name:<32} {result["status"]!s:<10} '
+                f'p50 {result["p50_ms"]:8.2f}  p95 {result["p95_ms"]:8.2f}  '
+                f'p99 {result["p99_ms"]:8.2f} мс  '
+                f'запросов {result["queries"]:3}  '
+                f'память {result["alloc_peak_kb"]} КБ'
+            )
+            if name in baseline:
+                change = result['p95_ms'] / max(baseline[name]['p95_ms'], 1e-6) - 1
+                line += f'  p95 {change:+.0%}'
+            self.stdout.write(line)
+
+        report = {
+            'commit': current_commit(),
+            'created_at': timezone.now().isoformat(),
+            'database': connection.vendor,
+            'handler': self.handler,
+            'dataset': context['dataset'],
+            'requests': options['requests'],
+            'results': results,
+        }
+        if options['output']:
+            save_report(options['output'], report)
+            self.stdout.write(self.style.SUCCESS(
+                f'Результаты сохранены в {options["output"]}.'
+            ))
+
+    def _client(self, user=None):
+        token = None
+        if user is not None:
+            token, _ = Token.objects.get_or_create(user=user)
+        if self.handler == 'asgi':
+            return AsgiClient(token)
+        client = APIClient(SERVER_NAME='localhost')
+        if token is not None:
+            client.credentials(HTTP_AUTHORIZATION=f'Token {token.key}')
+        return client
+
+    def _context(self):
+        """Пользователи и объекты, на которых строятся сценарии:
+        самый активный автор и пользователь с самым большим входящим."""
+
+        owner = User.objects.annotate(
+            ads_count=Count('ads')
+        ).order_by('-ads_count').first()
+        if owner is None or not owner.ads_count:
+            raise CommandError(
+                'Нет объявлений: сначала выполните generate_fake_data.'
+            )
+        receiver = User.objects.annotate(
+            inbox=Count('received_proposals')
+        ).order_by('-inbox').first()
+        ad = owner.ads.order_by('-created_at').first()
+        other_ad = Ad.objects.exclude(user=owner).exclude(
+            receiver_ads__ad_sender=ad
+        ).order_by('-created_at').first()
+        proposal = ExchangeProposal.objects.filter(
+            receiver_user=receiver, status=chcs.Status.PENDING
+        ).first()
+        sent_proposal = ExchangeProposal.objects.filter(sender_user=owner).first()
+        category = Category.objects.annotate(
+            ads_count=Count('categories')
+        ).order_by('-ads_count').first()
+        dataset = {
+            'users': User.objects.count(),
+            'categories': Category.objects.count(),
+            'ads': Ad.objects.count(),
+            'proposals': ExchangeProposal.objects.count(),
+        }
+
+        client = self._client(owner)
+        url = '/api/ads/?cursor=&limit=20'
+        for _ in range(50):
+            next_url = client.get(url).json().get('next')
+            if not next_url:
+                break
+            url = next_url
+
+        return {
+            'owner': owner,
+            'receiver': receiver,
+            'ad': ad,
+            'other_ad': other_ad,
+            'proposal': proposal,
+            'sent_proposal': sent_proposal,
+            'category': category,
+            'deep_offset': max(dataset['ads'] - 40, 0),
+            'deep_cursor': url,
+            'dataset': dataset,
+        }
+
+    def _scenarios(self, context):
+        """Сценарии (имя, клиент, метод, адрес, тело запроса)."""
+
+        anonymous = self._client()
+        owner = self._client(context['owner'])
+        receiver = self._client(context['receiver'])
+        ad, other_ad = context['ad'], context['other_ad']
+        proposal = context['proposal']
+        category = context['category']
+        ad_data = {
+            'title': 'Объявление нагрузочного теста', 'description': '...',
+            'category': category.id, 'condition': chcs.AdCondition.USED,
+        }
+
+        scenarios = [
+            ('ads.list.anonymous', anonymous, 'get', '/api/ads/', None),
+            ('ads.list', owner, 'get', '/api/ads/', None),
+            ('ads.list.filters', owner, 'get',
+             '/api/ads/?' + urlencode({
+                 'category': category.title, 'condition': 'used'
+             }), None),
+            ('ads.list.search', owner, 'get',
+             '/api/ads/?' + urlencode({'search': 'велосипед'}), None),
+            ('ads.list.facets', owner, 'get', '/api/ads/?facets=true', None),
+            ('ads.list.deep_offset', owner, 'get',
+             f'/api/ads/?offset={context["deep_offset"]}&limit=20', None),
+            ('ads.list.deep_cursor', owner, 'get', context['deep_cursor'], None),
+            ('ads.retrieve', anonymous, 'get', f'/api/ads/{ad.id}/', None),
+            ('ads.matches', owner, 'get', f'/api/ads/{ad.id}/matches/', None),
+            ('ads.export', owner, 'get',
+             '/api/ads/export/?' + urlencode({'category': category.title}),
+             None),
+            ('ads.create', owner, 'post', '/api/ads/', ad_data),
+            ('ads.batch', owner, 'post', '/api/ads/batch/', [
+                {**ad_data, 'title': f'Пакетное объявление {number}'}
+                for number in range(20)
+            ]),
+            ('ads.partial_update', owner, 'patch', f'/api/ads/{ad.id}/',
+             {'description': 'Обновлено'}),
+            ('ads.destroy', owner, 'delete', f'/api/ads/{ad.id}/', None),
+            ('categories.list', anonymous, 'get', '/api/categories/', None),
+            ('categories.retrieve', anonymous, 'get',
+             f'/api/categories/{category.id}/', None),
+            ('proposals.list', owner, 'get', '/api/proposals/', None),
+            ('proposals.inbox', receiver, 'get',
+             f'/api/proposals/?receiver_user={context["receiver"].id}'
+             f'&status=pending', None),
+            ('proposals.cycles', receiver, 'get', '/api/proposals/cycles/', None),
+            ('proposals.export', receiver, 'get', '/api/proposals/export/', None),
+            ('saved_searches.list', owner, 'get', '/api/saved-searches/', None),
+            ('saved_searches.feed', owner, 'get', '/api/saved-searches/feed/', None),
+            ('saved_searches.create', owner, 'post', '/api/saved-searches/',
+             {'keywords': 'велосипед'}),
+            ('users.me', owner, 'get', '/api/me/', None),
+            ('users.registration', anonymous, 'post', '/api/registration/', {
+                'username': 'benchmark_user', 'email': 'benchmark@example.com',
+                'password': 'Benchmark-Pass-123',
+            }),
+            ('users.login', anonymous, 'post', '/api/login/', {
+                'username': context['owner'].username, 'password': 'password',
+            }),
+            ('users.logout', self._client(context['receiver']), 'post',
+             '/api/logout/', None),
+        ]
+        if other_ad is not None:
+            scenarios.append(('proposals.create', owner, 'post', '/api/proposals/', {
+                'ad_sender': ad.id, 'ad_receiver': other_ad.id,
+                'comment': 'Обменяемся?',
+            }))
+        if proposal is not None:
+            scenarios.extend([
+                ('proposals.retrieve', receiver, 'get',
+                 f'/api/proposals/{proposal.id}/', None),
+                ('proposals.partial_update', receiver, 'patch',
+                 f'/api/proposals/{proposal.id}/',
+                 {'status': chcs.Status.APPROVED}),
+                ('proposals.bulk_status', receiver, 'post',
+                 '/api/proposals/bulk-status/',
+                 {'ids': [proposal.id], 'status': chcs.Status.REJECTED}),
+            ])
+        if context['sent_proposal'] is not None:
+            scenarios.append((
+                'proposals.destroy', owner, 'delete',
+                f'/api/proposals/{context["sent_proposal"].id}/', None,
+            ))
+        return scenarios
+
+    @staticmethod
+    def _send(client, method, url, data):
+        """Выполняет запрос; изменяющие запросы откатываются."""
+
+        if method == 'get':
+            response = client.get(url)
+            if response.streaming:
+                for _ in response.streaming_content:
+                    pass
+            return response
+        with transaction.atomic():
+            response = getattr(client, method)(url, data, format='json')
+            transaction.set_rollback(True)
+        return response
+
+    def _measure(self, client, method, url, data, options):
+        for _ in range(options['warmup']):
+            self._send(client, method, url, data)
+
+        timings, queries, statuses = [], [], set()
+        for _ in range(options['requests']):
+            with CaptureQueriesContext(connection) as captured:
+                started = time.perf_counter()
+                response = self._send(client, method, url, data)
+                timings.append((time.perf_counter() - started) * 1000)
+            queries.append(len(captured.captured_queries))
+            statuses.add(response.status_code)
+
+        peaks = []
+        for _ in range(options['alloc_samples']):
+            tracemalloc.start()
+            self._send(client, method, url, data)
+            peaks.append(tracemalloc.get_traced_memory()[1])
+            tracemalloc.stop()
+
+        return {
+            'method': method.upper(),
+            'url': url,
+            'status': sorted(statuses),
+            **percentiles(timings),
+            'mean_ms': round(statistics.fmean(timings), 3),
+            'queries': round(statistics.median(queries)),
+            'alloc_peak_kb': (
+                round(statistics.median(peaks) / 1024) if peaks else None
+            ),
+        }
@@ -0,0 +1,73 @@
+import random
+import resource
+import statistics
+import time
+
+from django.conf import settings
+from django.core.management import BaseCommand
+
+from ads.barter import BarterGraph
+
+
+class Command(BaseCommand):
+    """Замеряет движок поиска многосторонних обменов на синтетическом
+    графе: построение, инкрементальные изменения и поиск циклов.
+    БД не используется."""
+
+    help = 'Нагрузочный тест BarterGraph на синтетическом графе.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=200_000)
+        parser.add_argument('--edges', type=int, default=1_000_000)
+        parser.add_argument(
+            '--max-length', type=int, default=settings.BARTER_MAX_CYCLE_LENGTH
+        )
+        parser.add_argument('--queries', type=int, default=1000)
+        parser.add_argument('--limit', type=int, default=20)
+        parser.add_argument('--seed', type=int, default=42)
+
+    def handle(self, *args, **options):
+        rng = random.Random(options['seed'])
+        users, edges = options['users'], options['edges']
+        graph = BarterGraph()
+
+        started = time.perf_counter()
+        for proposal_id in range(edges):
+            graph.add_edge(
+                proposal_id, rng.randrange(users), rng.randrange(users)
+            )
+        build = time.perf_counter() - started
+        self.stdout.write(
+            f'Построение: {graph.edge_count} рёбер за {build:.2f} с '
+            f'({graph.edge_count / build:,.0f} рёбер/с), '
+            f'пик памяти процесса: '
+            f'{resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024:.0f} МБ.'
+        )
+
+        changes = min(edges, 100_000)
+        started = time.perf_counter()
+        for offset in range(changes):
+            sender, receiver = rng.randrange(users), rng.randrange(users)
+            graph.add_edge(edges + offset, sender, receiver)
+            graph.remove_edge(edges + offset, sender, receiver)
+        elapsed = time.perf_counter() - started
+        self.stdout.write(
+            f'Инкрементальные изменения: {2 * changes / elapsed:,.0f} операций/с.'
+        )
+
+        timings, found = [], 0
+        for _ in range(options['queries']):
+            user = rng.randrange(users)
+            started = time.perf_counter()
+            found += len(graph.find_cycles(
+                user, options['max_length'], options['limit']
+            ))
+            timings.append((time.perf_counter() - started) * 1000)
+        timings.sort()
+        quantiles = statistics.quantiles(timings, n=100)
+        self.stdout.write(self.style.SUCCESS(
+            f'Поиск циклов (до {options["max_length"]} участников): '
+            f'{options["queries"]} запросов, найдено {found}, '
+            f'p50 {quantiles[49]:.2f} мс, p95 {quantiles[94]:.2f} мс, '
+            f'p99 {quantiles[98]:.2f} мс, max {timings[-1]:.2f} мс.'
+        ))
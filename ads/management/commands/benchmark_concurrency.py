@@ -0,0 +1,184 @@
+import asyncio
+import time
+from urllib.parse import urlsplit
+
+from django.core.management import BaseCommand, CommandError
+from django.db.models import Count
+from django.utils import timezone
+from rest_framework.authtoken.models import Token
+
+from ads.benchmark import current_commit, percentiles, save_report
+from ads.models import Ad
+from users.models import User
+
+
+class Command(BaseCommand):
+    """Нагрузка на запущенный сервер при высокой конкурентности:
+    горячие эндпоинты чтения на данных generate_fake_data. Настройки
+    сервера (например, SERVER_WORKERS) сравниваются запуском команды
+    до и после изменения.
+
+    Каждый из --concurrency клиентов держит keep-alive соединение
+    (если сервер его поддерживает) и шлёт запросы подряд в течение
+    --duration секунд. Выводятся запросы в секунду, p50/p95/p99 и
+    число ошибок (не 2xx, обрывы соединения, таймауты). Клиент —
+    asyncio без сторонних библиотек, поэтому одна машина даёт сотни
+    одновременных соединений."""
+
+    help = 'Пропускная способность сервера при высокой конкурентности.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--url', default='http://127.0.0.1:8000',
+            help='Адрес запущенного сервера.',
+        )
+        parser.add_argument(
+            '--concurrency', type=int, nargs='+', default=[1, 16, 64, 256],
+            help='Уровни конкурентности (одновременных клиентов).',
+        )
+        parser.add_argument('--duration', type=float, default=10)
+        parser.add_argument('--warmup', type=float, default=1)
+        parser.add_argument('--timeout', type=float, default=30)
+        parser.add_argument(
+            '--only', help='Запускать сценарии, в имени которых есть подстрока.'
+        )
+        parser.add_argument('--output', help='Файл для результатов в JSON.')
+
+    def handle(self, *args, **options):
+        url = urlsplit(options['url'])
+        if url.scheme != 'http' or not url.hostname:
+            raise CommandError('Нужен адрес вида http://host:port.')
+        self.host, self.port = url.hostname, url.port or 80
+        self.timeout = options['timeout']
+        scenarios = [
+            scenario for scenario in self._scenarios()
+            if not options['only'] or options['only'] in scenario[0]
+        ]
+
+        results = {}
+        for concurrency in options['concurrency']:
+            for name, path, headers in scenarios:
+                asyncio.run(self._load(
+                    path, headers, concurrency, options['warmup']
+                ))
+                result = asyncio.run(self._load(
+                    path, headers, concurrency, options['duration']
+                ))
+                results.setdefault(name, {})[concurrency] = result
+                self.stdout.write(
+                    f'{name:<24} c={concurrency:<4} '
+                    f'{result["rps"]:8.1f} зап/с  '
+                    f'p50 {result["p50_ms"]:8.2f}  p95 {result["p95_ms"]:8.2f}  '
+                    f'p99 {result["p99_ms"]:8.2f} мс  '
+                    f'ошибок {result["errors"]}'
+                )
+
+        if options['output']:
+            save_report(options['output'], {
+                'commit': current_commit(),
+                'created_at': timezone.now().isoformat(),
+                'url': options['url'],
+                'duration': options['duration'],
+                'results': results,
+            })
+            self.stdout.write(self.style.SUCCESS(
+                f'Результаты сохранены в {options["output"]}.'
+            ))
+
+    def _scenarios(self):
+        """Сценарии (имя, путь, заголовки)."""
+
+        receiver = User.objects.annotate(
+            inbox=Count('received_proposals')
+        ).order_by('-inbox').first()
+        ad = Ad.objects.order_by('-created_at').first()
+        if receiver is None or ad is None:
+            raise CommandError(
+                'Нет данных: сначала выполните generate_fake_data.'
+            )
+        token, _ = Token.objects.get_or_create(user=receiver)
+        auth = {'Authorization': f'Token {token.key}'}
+
+        scenarios = [
+            ('ads.list', '/api/ads/?limit=20', auth),
+            ('ads.list.cursor', '/api/ads/?cursor=&limit=20', auth),
+            ('ads.retrieve', f'/api/ads/{ad.id}/', {}),
+            ('categories.list', '/api/categories/', {}),
+            ('proposals.inbox',
+             f'/api/proposals/?receiver_user={receiver.id}&status=pending',
+             auth),
+        ]
+        return [
+            (name, path, {**headers, 'Accept': 'application/json'})
+            for name, path, headers in scenarios
+        ]
+
+    async def _load(self, path, headers, concurrency, duration):
+        deadline = time.perf_counter() + duration
+        started = time.perf_counter()
+        timings, statuses = [], []
+        await asyncio.gather(*(
+            self._client(path, headers, deadline, timings, statuses)
+            for _ in range(concurrency)
+        ))
+        elapsed = time.perf_counter() - started
+        return {
+            'requests': len(statuses),
+            'rps': round(len(statuses) / elapsed, 1),
+            **percentiles(timings, digits=2),
+            'errors': sum(1 for status in statuses if not 200 <= status < 300),
+        }
+
+    async def _client(self, path, headers, deadline, timings, statuses):
+        """Один клиент: запросы подряд до deadline. Ошибка соединения
+        учитывается как статус 0, соединение открывается заново."""
+
+        connection = None
+        request = (
+            f'GET {path} HTTP/1.1\r\nHost: {self.host}:{self.port}\r\n'
+            + ''.join(f'{name}: {value}\r\n' for name, value in headers.items())
+            + '\r\n'
+        ).encode()
+        while time.perf_counter() < deadline:
+            started = time.perf_counter()
+            try:
+                if connection is None:
+                    connection = await asyncio.open_connection(self.host, self.port)
+                status, keep_alive = await asyncio.wait_for(
+                    self._request(*connection, request), self.timeout
+                )
+            except (OSError, asyncio.TimeoutError, asyncio.IncompleteReadError,
+                    ValueError):
+                status, keep_alive = 0, False
+            timings.append((time.perf_counter() - started) * 1000)
+            statuses.append(status)
+            if not keep_alive and connection is not None:
+                connection[1].close()
+                connection = None
+        if connection is not None:
+            connection[1].close()
+
+    @staticmethod
+    async def _request(reader, writer, request):
+        """Отправляет запрос и дочитывает ответ (Content-Length или
+        chunked); возвращает статус и можно ли переиспользовать
+        соединение."""
+
+        writer.write(request)
+        await writer.drain()
+        status = int((await reader.readuntil(b'\r\n')).split()[1])
+        headers = {}
+        while (line := await reader.readuntil(b'\r\n')) != b'\r\n':
+            name, _, value = line.decode('latin-1').partition(':')
+            headers[name.strip().lower()] = value.strip().lower()
+
+        if headers.get('transfer-encoding') == 'chunked':
+            while size := int((await reader.readuntil(b'\r\n')).split(b';')[0], 16):
+                await reader.readexactly(size + 2)
+            await reader.readuntil(b'\r\n')
+        elif 'content-length' in headers:
+            await reader.readexactly(int(headers['content-length']))
+        else:
+            await reader.read()
+            return status, False
+        return status, headers.get('connection') != 'close'
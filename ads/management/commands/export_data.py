@@ -0,0 +1,89 @@
+import time
+
+from django.core.management import BaseCommand, CommandError
+from django.db.models import Q
+
+from ads.export import (AD_EXPORT_FIELDS, EXPORT_FORMATS,
+                        PROPOSAL_EXPORT_FIELDS, export_chunks)
+from ads.models import Ad, ExchangeProposal
+from api.filters import AdFilter, ExchangeProposalFilter
+from config import constants
+from users.models import User
+
+
+class Command(BaseCommand):
+    """Выгружает объявления или предложения пользователя потоком в
+    NDJSON или CSV (в файл или stdout). Фильтры те же, что у API."""
+
+    help = 'Потоковая выгрузка объявлений или предложений обмена.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('kind', choices=('ads', 'proposals'))
+        parser.add_argument('--format', choices=EXPORT_FORMATS, default='ndjson')
+        parser.add_argument(
+            '--output', default='-', help='Путь к файлу, «-» — stdout.'
+        )
+        parser.add_argument('--category', help='Название категории.')
+        parser.add_argument('--condition')
+        parser.add_argument(
+            '--user', help='Имя пользователя (обязательно для proposals).'
+        )
+        parser.add_argument('--status')
+        parser.add_argument(
+            '--chunk-size', type=int, default=constants.EXPORT_CHUNK_SIZE
+        )
+
+    def handle(self, *args, **options):
+        if options['kind'] == 'ads':
+            queryset, fields = self._ads(options), AD_EXPORT_FIELDS
+        else:
+            queryset, fields = self._proposals(options), PROPOSAL_EXPORT_FIELDS
+        chunks = export_chunks(
+            queryset.order_by('id'), fields, options['format'],
+            options['chunk_size'],
+        )
+
+        started = time.monotonic()
+        written = 0
+        if options['output'] == '-':
+            for chunk in chunks:
+                written += len(chunk)
+                self.stdout.write(chunk, ending='')
+        else:
+            with open(options['output'], 'w', encoding='utf-8', newline='') as file:
+                for chunk in chunks:
+                    written += len(chunk)
+                    file.write(chunk)
+        elapsed = time.monotonic() - started
+        self.stderr.write(self.style.SUCCESS(
+            f'Выгружено {written / 1024 / 1024:.1f} МБ за {elapsed:.2f} с '
+            f'({written / 1024 / 1024 / max(elapsed, 1e-6):.1f} МБ/с).'
+        ))
+
+    @staticmethod
+    def _filtered(filterset):
+        if not filterset.is_valid():
+            raise CommandError(filterset.errors.as_text())
+        return filterset.qs
+
+    def _ads(self, options):
+        return self._filtered(AdFilter(
+            data={
+                'category': options['category'],
+                'condition': options['condition'],
+            },
+            queryset=Ad.objects.all(),
+        ))
+
+    def _proposals(self, options):
+        if not options['user']:
+            raise CommandError('Для выгрузки предложений укажите --user.')
+        user = User.objects.filter(username=options['user']).first()
+        if user is None:
+            raise CommandError(f'Пользователь "{options["user"]}" не найден.')
+        return self._filtered(ExchangeProposalFilter(
+            data={'status': options['status']},
+            queryset=ExchangeProposal.objects.filter(
+                Q(sender_user=user) | Q(receiver_user=user)
+            ),
+        ))
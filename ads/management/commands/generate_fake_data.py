@@ -0,0 +1,219 @@
+import bisect
+import itertools
+import random
+import time
+from datetime import timedelta
+
+from django.contrib.auth.hashers import make_password
+from django.core.management import BaseCommand
+from django.db import transaction
+from django.db.models import Max
+from django.utils import timezone
+
+from ads import choices as chcs
+from ads.models import Ad, AdFacetCount, Category, ExchangeProposal
+from api.cache import invalidate_listing
+from users.models import User
+
+CATEGORY_TITLES = (
+    'Книги', 'Смартфоны', 'Садовый инвентарь', 'Одежда', 'Обувь',
+    'Детские товары', 'Мебель', 'Бытовая техника', 'Спорт и отдых',
+    'Велосипеды', 'Инструменты', 'Компьютеры', 'Игры и приставки',
+    'Музыкальные инструменты', 'Посуда', 'Коллекционирование',
+    'Фототехника', 'Животные', 'Автозапчасти', 'Растения',
+)
+
+NOUNS = (
+    'велосипед', 'самокат', 'телефон', 'ноутбук', 'книга', 'куртка',
+    'кресло', 'стол', 'гитара', 'фотоаппарат', 'чайник', 'палатка',
+    'дрель', 'коляска', 'монитор', 'рюкзак', 'лампа', 'ковёр',
+    'приставка', 'пылесос', 'сервиз', 'лыжи', 'ботинки', 'диван',
+)
+
+ADJECTIVES = (
+    'старый', 'новый', 'детский', 'складной', 'электрический', 'горный',
+    'кожаный', 'деревянный', 'винтажный', 'компактный', 'большой',
+    'удобный', 'редкий', 'походный', 'японский', 'домашний',
+)
+
+FILLER = (
+    'в', 'хорошем', 'состоянии', 'почти', 'не', 'использовался', 'есть',
+    'следы', 'эксплуатации', 'полный', 'комплект', 'коробка', 'документы',
+    'самовывоз', 'обмен', 'на', 'равноценное', 'предложение', 'рассмотрю',
+    'варианты', 'работает', 'отлично', 'без', 'царапин', 'торг',
+)
+
+
+def zipf_weights(count, exponent):
+    """Накопленные веса распределения Ципфа: первые элементы («горячие»
+    категории, активные пользователи) выбираются намного чаще."""
+
+    return list(itertools.accumulate(
+        1 / rank ** exponent for rank in range(1, count + 1)
+    ))
+
+
+class Command(BaseCommand):
+    """Наполняет БД синтетическими пользователями, категориями,
+    объявлениями и предложениями обмена с перекосом, как в реальных
+    данных: популярность категорий и активность пользователей
+    распределены по Ципфу. Вставка пачками через bulk_create."""
+
+    help = 'Генерирует синтетические данные для нагрузочного тестирования.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=1000)
+        parser.add_argument('--categories', type=int, default=20)
+        parser.add_argument('--ads', type=int, default=10_000)
+        parser.add_argument('--proposals', type=int, default=5000)
+        parser.add_argument(
+            '--skew', type=float, default=1.1,
+            help='Показатель распределения Ципфа для категорий и пользователей.',
+        )
+        parser.add_argument(
+            '--days', type=int, default=180,
+            help='Период, на который распределяются даты публикации.',
+        )
+        parser.add_argument('--batch-size', type=int, default=5000)
+        parser.add_argument('--seed', type=int, default=42)
+
+    def handle(self, *args, **options):
+        self.rng = random.Random(options['seed'])
+        self.batch_size = options['batch_size']
+        self.skew = options['skew']
+        started = time.monotonic()
+
+        users = self._users(options['users'])
+        categories = self._categories(options['categories'])
+        ads = self._ads(options['ads'], users, categories, options['days'])
+        proposals = self._proposals(options['proposals'], ads)
+        invalidate_listing(*categories)
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Создано: пользователей {len(users)}, категорий '
+            f'{len(categories)}, объявлений {len(ads)}, предложений '
+            f'{proposals}, время: {time.monotonic() - started:.2f} с.'
+        ))
+
+    def _batches(self, items):
+        iterator = iter(items)
+        while batch := list(itertools.islice(iterator, self.batch_size)):
+            yield batch
+
+    def _users(self, count):
+        """Новые пользователи с общим паролем 'password'; возвращает id."""
+
+        offset = (User.objects.aggregate(last=Max('id'))['last'] or 0) + 1
+        password = make_password('password')
+        ids = []
+        for batch in self._batches(range(offset, offset + count)):
+            created = User.objects.bulk_create([
+                User(
+                    username=f'fake_user_{number}',
+                    email=f'fake_user_{number}@example.com',
+                    password=password,
+                )
+                for number in batch
+            ])
+            ids.extend(user.id for user in created)
+        self.rng.shuffle(ids)
+        return ids
+
+    def _categories(self, count):
+        """Id категорий (существующие переиспользуются); порядок задаёт
+        популярность."""
+
+        titles = [
+            CATEGORY_TITLES[number] if number < len(CATEGORY_TITLES)
+            else f'{CATEGORY_TITLES[number % len(CATEGORY_TITLES)]} {number}'
+            for number in range(count)
+        ]
+        Category.objects.bulk_create(
+            [Category(title=title, description=f'Раздел «{title}»')
+             for title in titles],
+            ignore_conflicts=True,
+        )
+        found = dict(Category.objects.filter(
+            title__in=titles
+        ).values_list('title', 'id'))
+        return [found[title] for title in titles]
+
+    def _pick(self, items, weights):
+        return items[bisect.bisect(weights, self.rng.random() * weights[-1])]
+
+    def _ads(self, count, users, categories, days):
+        """Объявления в хронологическом порядке; возвращает
+        [(id, user_id), ...]. Дата изменения остаётся текущей, чтобы
+        индексы процессов (ads.matches) подхватили новые объявления."""
+
+        user_weights = zipf_weights(len(users), self.skew)
+        category_weights = zipf_weights(len(categories), self.skew)
+        offset = (Ad.objects.aggregate(last=Max('id'))['last'] or 0) + 1
+        now = timezone.now()
+        moments = sorted(
+            now - timedelta(seconds=self.rng.uniform(0, days * 86400))
+            for _ in range(count)
+        )
+        result = []
+        for batch in self._batches(range(count)):
+            ads = []
+            for index in batch:
+                ads.append(Ad(
+                    user_id=self._pick(users, user_weights),
+                    category_id=self._pick(categories, category_weights),
+                    title=(f'{self.rng.choice(ADJECTIVES).capitalize()} '
+                           f'{self.rng.choice(NOUNS)} №{offset + index}'),
+                    description=' '.join(self.rng.choices(
+                        FILLER + NOUNS, k=self.rng.randint(8, 40)
+                    )),
+                    condition=(chcs.AdCondition.NEW if self.rng.random() < 0.4
+                               else chcs.AdCondition.USED),
+                ))
+            with transaction.atomic():
+                created = Ad.objects.bulk_create(ads)
+                for ad, index in zip(created, batch):
+                    ad.created_at = moments[index]
+                Ad.objects.bulk_update(created, ['created_at'])
+                AdFacetCount.objects.add_ads(created)
+            result.extend((ad.id, ad.user_id) for ad in created)
+        return result
+
+    def _proposals(self, count, ads):
+        """Предложения между объявлениями разных пользователей: свежие
+        объявления получают больше предложений. Принятым становится не
+        больше одного предложения на объявление."""
+
+        if len(ads) < 2:
+            return 0
+        ad_weights = zipf_weights(len(ads), 0.5)
+        newest_first = ads[::-1]
+        pairs, busy, proposals = set(), set(), []
+        for _ in range(count * 3):
+            if len(proposals) >= count:
+                break
+            sender_id, sender_user = self.rng.choice(ads)
+            receiver_id, receiver_user = self._pick(newest_first, ad_weights)
+            if sender_user == receiver_user or (sender_id, receiver_id) in pairs:
+                continue
+            pairs.add((sender_id, receiver_id))
+            roll = self.rng.random()
+            if roll < 0.1 and not busy & {sender_id, receiver_id}:
+                status = chcs.Status.APPROVED
+                busy.update((sender_id, receiver_id))
+            elif roll < 0.25:
+                status = chcs.Status.REJECTED
+            else:
+                status = chcs.Status.PENDING
+            proposals.append(ExchangeProposal(
+                ad_sender_id=sender_id, ad_receiver_id=receiver_id,
+                sender_user_id=sender_user, receiver_user_id=receiver_user,
+                comment=self.rng.choice(('Обменяемся?', 'Интересует обмен', '')),
+                status=status,
+            ))
+        for proposal in proposals:
+            if (proposal.status == chcs.Status.PENDING
+                    and busy & {proposal.ad_sender_id, proposal.ad_receiver_id}):
+                proposal.status = chcs.Status.REJECTED
+        for batch in self._batches(proposals):
+            ExchangeProposal.objects.bulk_create(batch)
+        return len(proposals)
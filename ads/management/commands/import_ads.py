@@ -0,0 +1,68 @@
+import json
+import sys
+import time
+from itertools import islice
+
+from django.core.management import BaseCommand
+
+from ads.export import EXPORT_FORMATS
+from ads.importer import AdImporter, read_rows
+from api.cache import invalidate_listing
+from config import constants
+
+
+class Command(BaseCommand):
+    """Импортирует объявления из NDJSON или CSV пачками (формат выгрузки
+    export_data). Выводит отклонённые строки с ошибками и скорость
+    импорта; объявления с занятым заголовком пропускаются."""
+
+    help = 'Массовый импорт объявлений из NDJSON или CSV.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='Путь к файлу, «-» — stdin.')
+        parser.add_argument(
+            '--format', choices=EXPORT_FORMATS,
+            help='Формат файла (по умолчанию — по расширению, иначе ndjson).',
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=constants.IMPORT_BATCH_SIZE
+        )
+
+    def handle(self, *args, **options):
+        path = options['path']
+        file_format = options['format'] or (
+            'csv' if path.endswith('.csv') else 'ndjson'
+        )
+        if path == '-':
+            self._import(sys.stdin, file_format, options)
+        else:
+            with open(path, encoding='utf-8', newline='') as file:
+                self._import(file, file_format, options)
+
+    def _import(self, file, file_format, options):
+        importer = AdImporter()
+        rows = read_rows(file, file_format)
+        started = time.monotonic()
+        total = created = skipped = rejected = 0
+
+        while batch := list(islice(rows, options['batch_size'])):
+            ads, batch_skipped, rejects = importer.import_batch(batch)
+            if ads:
+                invalidate_listing(*{ad.category_id for ad in ads})
+            for line, errors in rejects:
+                self.stderr.write(
+                    f'Строка {line}: {json.dumps(errors, ensure_ascii=False)}'
+                )
+            total += len(batch)
+            created += len(ads)
+            skipped += batch_skipped
+            rejected += len(rejects)
+            if options['verbosity'] > 1:
+                self.stdout.write(f'Обработано строк: {total}.')
+
+        elapsed = time.monotonic() - started
+        self.stdout.write(self.style.SUCCESS(
+            f'Строк: {total}, создано: {created}, пропущено (заголовок '
+            f'занят): {skipped}, отклонено: {rejected}, время: {elapsed:.2f} с, '
+            f'{total / max(elapsed, 1e-6):,.0f} строк/с.'
+        ))
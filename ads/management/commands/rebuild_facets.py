@@ -0,0 +1,25 @@
+import time
+
+from django.core.management import BaseCommand
+
+from ads.models import AdFacetCount
+
+
+class Command(BaseCommand):
+    """Пересчитывает счётчики объявлений по (категория, состояние)
+    с нуля и выводит найденные расхождения."""
+
+    help = 'Пересчитывает счётчики объявлений для фильтров.'
+
+    def handle(self, *args, **options):
+        started = time.monotonic()
+        drift = AdFacetCount.objects.rebuild()
+        for (category_id, condition), (stored, actual) in sorted(drift.items()):
+            self.stdout.write(
+                f'Категория {category_id}, состояние {condition}: '
+                f'{stored} -> {actual}'
+            )
+        self.stdout.write(self.style.SUCCESS(
+            f'Счётчики пересчитаны, расхождений: {len(drift)}, '
+            f'время: {time.monotonic() - started:.2f} с.'
+        ))
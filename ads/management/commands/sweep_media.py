@@ -0,0 +1,98 @@
+import os
+import time
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management import BaseCommand
+
+from ads.models import Ad, MediaCleanup
+
+
+class Command(BaseCommand):
+    """Обрабатывает очередь удаления файлов и удаляет из
+    MEDIA_ROOT/ad_images файлы, на которые не ссылается ни одно
+    объявление (с --dry-run только выводит их)."""
+
+    help = 'Удаляет осиротевшие изображения объявлений.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dry-run', action='store_true',
+            help='Только показать осиротевшие файлы, ничего не удаляя.',
+        )
+        parser.add_argument(
+            '--min-age', type=int, default=3600,
+            help='Не трогать файлы моложе указанного числа секунд '
+                 '(загрузки, ещё не сохранённые в БД).',
+        )
+        parser.add_argument(
+            '--chunk-size', type=int, default=2000,
+            help='Размер порции при потоковом чтении объявлений.',
+        )
+
+    def handle(self, *args, **options):
+        dry_run = options['dry_run']
+        started = time.monotonic()
+
+        if not dry_run:
+            deleted, skipped, failed = MediaCleanup.objects.process()
+            self.stdout.write(
+                f'Очередь удаления: удалено {deleted}, пропущено {skipped}, '
+                f'отложено после ошибки {failed}.'
+            )
+
+        referenced = self._referenced_names(options['chunk_size'])
+        root = Path(settings.MEDIA_ROOT)
+        threshold = time.time() - options['min_age']
+        scanned = orphans = freed = 0
+
+        for entry in self._walk(root / 'ad_images'):
+            scanned += 1
+            name = Path(entry.path).relative_to(root).as_posix()
+            if name in referenced:
+                continue
+            stat = entry.stat()
+            if stat.st_mtime > threshold:
+                continue
+            orphans += 1
+            freed += stat.st_size
+            if dry_run:
+                self.stdout.write(name)
+            else:
+                Path(entry.path).unlink(missing_ok=True)
+
+        elapsed = time.monotonic() - started
+        action = 'найдено' if dry_run else 'удалено'
+        self.stdout.write(self.style.SUCCESS(
+            f'Проверено файлов: {scanned}, осиротевших {action}: {orphans} '
+            f'({freed / 1024 / 1024:.1f} МБ), ссылок в БД: {len(referenced)}, '
+            f'время: {elapsed:.2f} с, {scanned / max(elapsed, 1e-6):.0f} файлов/с.'
+        ))
+
+    @staticmethod
+    def _referenced_names(chunk_size):
+        """Имена изображений и рендиций, читаемые из БД потоком."""
+
+        referenced = set()
+        rows = Ad.objects.exclude(image_url='').values_list(
+            'image_url', 'image_renditions'
+        ).iterator(chunk_size=chunk_size)
+        for image, renditions in rows:
+            referenced.add(image)
+            for variants in (renditions or {}).values():
+                referenced.update(variants.values())
+        return referenced
+
+    def _walk(self, directory):
+        """Рекурсивно перебирает файлы каталога."""
+
+        try:
+            entries = os.scandir(directory)
+        except FileNotFoundError:
+            return
+        with entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    yield from self._walk(entry.path)
+                elif entry.is_file(follow_symlinks=False):
+                    yield entry
@@ -0,0 +1,218 @@
+"""Индекс кандидатов для подбора встречных объявлений («возможные обмены»).
+
+Для каждой категории в памяти процесса хранится отсортированный по
+свежести список последних объявлений. Ранжирование кандидатов для
+объявления X: близость категорий (та же категория и история
+предложений между категориями), совпадение состояния и свежесть.
+"""
+import bisect
+import threading
+import time
+from collections import defaultdict
+from datetime import timedelta
+from uuid import uuid4
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count
+from django.db.models.signals import post_delete
+from django.dispatch import receiver
+from django.utils import timezone
+
+from ads.models import Ad, Category, ExchangeProposal
+from config import constants
+
+MATCH_DELETED_VERSION_KEY = 'ads:matches:deleted:version'
+
+
+class MatchIndex:
+    """Индекс кандидатов по категориям с инкрементальным обновлением.
+
+    Списки загружаются один раз (по индексу категории и даты), затем
+    перед каждым подбором дочитываются только объявления, изменённые
+    после последней синхронизации (по updated_at). Удалённые объявления
+    убираются сигналом в своём процессе; остальные процессы узнают об
+    удалении по штампу в кэше Django и одним запросом отбрасывают
+    объявления индекса, которых уже нет в БД. Список категории,
+    потерявший объявления, дочитывается из БД, только если стал короче
+    MATCH_CANDIDATES_PER_CATEGORY (хранится вдвое больше).
+    Матрица истории предложений между категориями пересчитывается
+    не чаще раза в MATCH_AFFINITY_TTL."""
+
+    same_category_weight = 1.0
+    history_weight = 1.0
+    condition_weight = 0.3
+    recency_weight = 0.5
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self._categories = None
+            self._located = {}
+            self._short = set()
+            self._synced_at = None
+            self._deleted_version = None
+            self._history = {}
+            self._history_at = None
+
+    @staticmethod
+    def get_deleted_version():
+        version = cache.get(MATCH_DELETED_VERSION_KEY)
+        if version is None:
+            cache.add(MATCH_DELETED_VERSION_KEY, uuid4().hex, None)
+            version = cache.get(MATCH_DELETED_VERSION_KEY)
+        return version
+
+    @staticmethod
+    def bump_deleted_version():
+        cache.set(MATCH_DELETED_VERSION_KEY, uuid4().hex, None)
+
+    @property
+    def capacity(self):
+        return 2 * constants.MATCH_CANDIDATES_PER_CATEGORY
+
+    @staticmethod
+    def _entry(ad):
+        return (-ad.created_at.timestamp(), ad.id, ad.user_id, ad.condition)
+
+    def _load_category(self, category_id):
+        entries = [
+            self._entry(ad) for ad in Ad.objects.filter(
+                category_id=category_id
+            ).order_by('-created_at', '-id').only(
+                'id', 'user_id', 'category_id', 'condition', 'created_at'
+            )[:self.capacity]
+        ]
+        for old in self._categories.get(category_id, ()):
+            self._located.pop(old[1], None)
+        self._categories[category_id] = entries
+        for entry in entries:
+            self._located[entry[1]] = category_id
+
+    def _discard(self, ad_id):
+        category_id = self._located.pop(ad_id, None)
+        if category_id is None:
+            return
+        entries = self._categories[category_id]
+        entries[:] = [entry for entry in entries if entry[1] != ad_id]
+        self._short.add(category_id)
+
+    def _insert(self, ad):
+        entries = self._categories.setdefault(ad.category_id, [])
+        entry = self._entry(ad)
+        if len(entries) >= self.capacity and entry > entries[-1]:
+            return
+        bisect.insort(entries, entry)
+        self._located[ad.id] = ad.category_id
+        if len(entries) > self.capacity:
+            self._located.pop(entries.pop()[1], None)
+
+    def _prune_deleted(self):
+        existing = set(Ad.objects.filter(
+            id__in=list(self._located)
+        ).values_list('id', flat=True))
+        for ad_id in set(self._located) - existing:
+            self._discard(ad_id)
+
+    def sync(self):
+        started = timezone.now()
+        deleted_version = self.get_deleted_version()
+        fields = ('id', 'user_id', 'category_id', 'condition', 'created_at')
+        if self._categories is None:
+            self._categories = {}
+            self._located = {}
+            for category_id in Category.objects.values_list('id', flat=True):
+                self._load_category(category_id)
+        else:
+            changed = Ad.objects.filter(
+                updated_at__gte=self._synced_at - timedelta(
+                    seconds=settings.MATCH_SYNC_OVERLAP
+                )
+            ).only(*fields)
+            for ad in changed:
+                self._discard(ad.id)
+                self._insert(ad)
+            if deleted_version != self._deleted_version:
+                self._prune_deleted()
+            for category_id in self._short:
+                entries = self._categories.get(category_id, ())
+                if len(entries) < constants.MATCH_CANDIDATES_PER_CATEGORY:
+                    self._load_category(category_id)
+        self._short = set()
+        self._synced_at = started
+        self._deleted_version = deleted_version
+
+        if (self._history_at is None
+                or time.monotonic() - self._history_at > settings.MATCH_AFFINITY_TTL):
+            history = defaultdict(dict)
+            for row in ExchangeProposal.objects.order_by().values(
+                    'ad_sender__category_id', 'ad_receiver__category_id'
+            ).annotate(count=Count('id')):
+                history[row['ad_sender__category_id']][
+                    row['ad_receiver__category_id']] = row['count']
+            self._history = dict(history)
+            self._history_at = time.monotonic()
+
+    def remove(self, ad_id):
+        with self._lock:
+            if self._categories is not None:
+                self._discard(ad_id)
+
+    def category_affinity(self, category_id):
+        """Веса категорий-кандидатов для объявления категории category_id."""
+
+        history = self._history.get(category_id, {})
+        top = max(history.values(), default=0)
+        affinity = {
+            target: self.history_weight * count / top
+            for target, count in history.items()
+        }
+        affinity[category_id] = (
+            affinity.get(category_id, 0) + self.same_category_weight
+        )
+        return dict(sorted(
+            affinity.items(), key=lambda item: item[1], reverse=True
+        )[:constants.MATCH_CATEGORY_FANOUT])
+
+    def candidates(self, ad, exclude_ids, limit):
+        """Ранжированные пары (id объявления, оценка) для объявления ad
+        без объявлений его владельца и exclude_ids."""
+
+        now = time.time()
+        half_life = constants.MATCH_RECENCY_HALF_LIFE_DAYS * 86400
+        with self._lock:
+            self.sync()
+            scored = []
+            for category_id, affinity in self.category_affinity(
+                    ad.category_id).items():
+                for created, ad_id, user_id, condition in self._categories.get(
+                        category_id, ()):
+                    if user_id == ad.user_id or ad_id in exclude_ids:
+                        continue
+                    age = max(0.0, now + created)
+                    score = (
+                        affinity
+                        + self.condition_weight * (condition == ad.condition)
+                        + self.recency_weight * 0.5 ** (age / half_life)
+                    )
+                    scored.append((score, ad_id))
+        scored.sort(key=lambda item: (-item[0], -item[1]))
+        return scored[:limit]
+
+
+match_index = MatchIndex()
+
+
+@receiver(post_delete, sender=Ad)
+def remove_deleted_ad(sender, instance, **kwargs):
+    """Убирает удалённое объявление из индекса кандидатов процесса и
+    меняет штамп удалений сразу и ещё раз после коммита, чтобы остальные
+    процессы сверили свои индексы с БД."""
+
+    match_index.remove(instance.id)
+    MatchIndex.bump_deleted_version()
+    transaction.on_commit(MatchIndex.bump_deleted_version)
@@ -0,0 +1,19 @@
+# Generated by Django 5.1.1 on 2026-10-18 10:20
+
+import django.contrib.postgres.search
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ads', '0003_alter_ad_image_url'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='ad',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(blank=True, editable=False, null=True, verbose_name='Поисковый вектор'),
+        ),
+    ]
@@ -0,0 +1,47 @@
+# Generated by Django 5.1.1 on 2026-10-18 10:23
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ads', '0004_ad_search_vector'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='ad',
+            index=models.Index(fields=['-created_at', '-id'], name='ad_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='ad',
+            index=models.Index(fields=['category', '-created_at', '-id'], name='ad_category_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='ad',
+            index=models.Index(fields=['condition', '-created_at', '-id'], name='ad_condition_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='ad',
+            index=models.Index(fields=['category', 'condition', '-created_at', '-id'], name='ad_cat_cond_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='exchangeproposal',
+            index=models.Index(fields=['-created_at', '-id'], name='proposal_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='exchangeproposal',
+            index=models.Index(fields=['status', '-created_at', '-id'], name='proposal_status_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='exchangeproposal',
+            index=models.Index(condition=models.Q(('status', 'pending')), fields=['ad_sender', '-created_at', '-id'], name='proposal_sender_pending_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='exchangeproposal',
+            index=models.Index(condition=models.Q(('status', 'pending')), fields=['ad_receiver', '-created_at', '-id'], name='proposal_receiver_pending_idx'),
+        ),
+    ]
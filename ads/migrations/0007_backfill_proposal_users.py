@@ -0,0 +1,51 @@
+from django.db import migrations, transaction
+from django.db.models import Max, Min, OuterRef, Subquery
+
+BATCH_SIZE = 5000
+
+
+def backfill_proposal_users(apps, schema_editor):
+    """Заполняет sender_user/receiver_user пачками по диапазонам id,
+    каждая пачка — в отдельной транзакции."""
+
+    Ad = apps.get_model('ads', 'Ad')
+    ExchangeProposal = apps.get_model('ads', 'ExchangeProposal')
+    db_alias = schema_editor.connection.alias
+    proposals = ExchangeProposal.objects.using(db_alias)
+
+    bounds = proposals.filter(sender_user__isnull=True).aggregate(
+        first=Min('id'), last=Max('id')
+    )
+    if bounds['first'] is None:
+        return
+
+    ads = Ad.objects.using(db_alias)
+    for start in range(bounds['first'], bounds['last'] + 1, BATCH_SIZE):
+        with transaction.atomic(using=db_alias):
+            proposals.filter(
+                id__gte=start,
+                id__lt=start + BATCH_SIZE,
+                sender_user__isnull=True,
+            ).update(
+                sender_user=Subquery(
+                    ads.filter(pk=OuterRef('ad_sender')).values('user')[:1]
+                ),
+                receiver_user=Subquery(
+                    ads.filter(pk=OuterRef('ad_receiver')).values('user')[:1]
+                ),
+            )
+
+
+class Migration(migrations.Migration):
+
+    atomic = False
+
+    dependencies = [
+        ('ads', '0006_exchangeproposal_sender_receiver_user'),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            backfill_proposal_users, migrations.RunPython.noop
+        ),
+    ]
@@ -0,0 +1,50 @@
+# Generated by Django 5.1.1 on 2026-10-18 10:24
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ads', '0007_backfill_proposal_users'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='exchangeproposal',
+            name='proposal_sender_pending_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='exchangeproposal',
+            name='proposal_receiver_pending_idx',
+        ),
+        migrations.AlterField(
+            model_name='exchangeproposal',
+            name='receiver_user',
+            field=models.ForeignKey(db_index=False, editable=False, on_delete=django.db.models.deletion.CASCADE, related_name='received_proposals', to=settings.AUTH_USER_MODEL, verbose_name='Получатель'),
+        ),
+        migrations.AlterField(
+            model_name='exchangeproposal',
+            name='sender_user',
+            field=models.ForeignKey(db_index=False, editable=False, on_delete=django.db.models.deletion.CASCADE, related_name='sent_proposals', to=settings.AUTH_USER_MODEL, verbose_name='Отправитель'),
+        ),
+        migrations.AddIndex(
+            model_name='exchangeproposal',
+            index=models.Index(fields=['sender_user', '-created_at', '-id'], name='proposal_sender_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='exchangeproposal',
+            index=models.Index(fields=['receiver_user', '-created_at', '-id'], name='proposal_receiver_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='exchangeproposal',
+            index=models.Index(condition=models.Q(('status', 'pending')), fields=['sender_user', '-created_at', '-id'], name='proposal_sender_pending_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='exchangeproposal',
+            index=models.Index(condition=models.Q(('status', 'pending')), fields=['receiver_user', '-created_at', '-id'], name='proposal_receiver_pending_idx'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.1.1 on 2026-10-18 10:36
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ads', '0009_updated_at'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='ad',
+            name='image_renditions',
+            field=models.JSONField(blank=True, default=dict, editable=False, verbose_name='Рендиции изображения'),
+        ),
+    ]
@@ -0,0 +1,26 @@
+# Generated by Django 5.1.1 on 2026-10-18 10:41
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ads', '0010_ad_image_renditions'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MediaCleanup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=255, verbose_name='Файл')),
+                ('image', models.CharField(max_length=255, verbose_name='Исходное изображение')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Дата постановки в очередь')),
+            ],
+            options={
+                'verbose_name': 'Файл к удалению',
+                'verbose_name_plural': 'Очередь удаления файлов',
+            },
+        ),
+    ]
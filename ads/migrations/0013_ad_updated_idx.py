@@ -0,0 +1,19 @@
+# Generated by Django 5.1.1 on 2026-10-18 10:55
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ads', '0012_proposal_updated_idx'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='ad',
+            index=models.Index(fields=['updated_at'], name='ad_updated_idx'),
+        ),
+    ]
@@ -0,0 +1,49 @@
+# Generated by Django 5.1.1 on 2026-10-18 10:58
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ads', '0013_ad_updated_idx'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SavedSearch',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('condition', models.CharField(blank=True, choices=[('new', 'новый'), ('used', 'б/у')], max_length=50, verbose_name='Состояние товара')),
+                ('keywords', models.CharField(blank=True, max_length=255, verbose_name='Ключевые слова')),
+                ('terms', models.CharField(blank=True, editable=False, max_length=255, verbose_name='Нормализованные слова')),
+                ('anchor', models.CharField(db_index=True, editable=False, max_length=255, verbose_name='Ключ обратного индекса')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Дата создания')),
+                ('category', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, to='ads.category', verbose_name='Категория')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='saved_searches', to=settings.AUTH_USER_MODEL, verbose_name='Пользователь')),
+            ],
+            options={
+                'verbose_name': 'Сохранённый поиск',
+                'verbose_name_plural': 'Сохранённые поиски',
+            },
+        ),
+        migrations.CreateModel(
+            name='SavedSearchMatch',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Дата совпадения')),
+                ('ad', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='search_matches', to='ads.ad', verbose_name='Объявление')),
+                ('saved_search', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='matches', to='ads.savedsearch', verbose_name='Сохранённый поиск')),
+                ('user', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='search_matches', to=settings.AUTH_USER_MODEL, verbose_name='Пользователь')),
+            ],
+            options={
+                'verbose_name': 'Совпадение поиска',
+                'verbose_name_plural': 'Совпадения поисков',
+                'indexes': [models.Index(fields=['user', '-created_at', '-id'], name='search_match_feed_idx')],
+                'constraints': [models.UniqueConstraint(fields=('saved_search', 'ad'), name='unique_saved_search_ad')],
+            },
+        ),
+    ]
@@ -0,0 +1,48 @@
+# Generated by Django 5.1.1 on 2026-10-18 11:00
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def fill_facet_counts(apps, schema_editor):
+    """Заполняет счётчики по существующим объявлениям."""
+
+    Ad = apps.get_model('ads', 'Ad')
+    AdFacetCount = apps.get_model('ads', 'AdFacetCount')
+    db_alias = schema_editor.connection.alias
+    AdFacetCount.objects.using(db_alias).bulk_create([
+        AdFacetCount(
+            category_id=row['category_id'],
+            condition=row['condition'],
+            count=row['count'],
+        )
+        for row in Ad.objects.using(db_alias).order_by().values(
+            'category_id', 'condition'
+        ).annotate(count=Count('id'))
+    ])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ads', '0014_saved_searches'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AdFacetCount',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('condition', models.CharField(choices=[('new', 'новый'), ('used', 'б/у')], max_length=50, verbose_name='Состояние товара')),
+                ('count', models.IntegerField(default=0, verbose_name='Число объявлений')),
+                ('category', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='facet_counts', to='ads.category', verbose_name='Категория')),
+            ],
+            options={
+                'verbose_name': 'Счётчик объявлений',
+                'verbose_name_plural': 'Счётчики объявлений',
+                'constraints': [models.UniqueConstraint(fields=('category', 'condition'), name='unique_facet_category_condition')],
+            },
+        ),
+        migrations.RunPython(fill_facet_counts, migrations.RunPython.noop),
+    ]
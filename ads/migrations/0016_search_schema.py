@@ -0,0 +1,119 @@
+# Generated by Django 5.1.1 on 2026-10-18 12:00
+
+from django.db import migrations
+
+
+class VendorRunSQL(migrations.RunSQL):
+    """RunSQL, который выполняется только на указанной СУБД."""
+
+    def __init__(self, vendor, *args, **kwargs):
+        self.vendor = vendor
+        super().__init__(*args, **kwargs)
+
+    def deconstruct(self):
+        name, args, kwargs = super().deconstruct()
+        return name, [self.vendor, *args], kwargs
+
+    def database_forwards(self, app_label, schema_editor, from_state, to_state):
+        if schema_editor.connection.vendor == self.vendor:
+            super().database_forwards(app_label, schema_editor, from_state, to_state)
+
+    def database_backwards(self, app_label, schema_editor, from_state, to_state):
+        if schema_editor.connection.vendor == self.vendor:
+            super().database_backwards(app_label, schema_editor, from_state, to_state)
+
+
+POSTGRES_SQL = [
+    """
+    CREATE OR REPLACE FUNCTION ads_ad_search_vector_update()
+    RETURNS trigger AS $$
+    BEGIN
+        NEW.search_vector :=
+            setweight(to_tsvector('russian', coalesce(NEW.title, '')), 'A')
+            || setweight(to_tsvector('russian', coalesce(NEW.description, '')), 'B');
+        RETURN NEW;
+    END
+    $$ LANGUAGE plpgsql;
+    """,
+    'DROP TRIGGER IF EXISTS ads_ad_search_vector_trigger ON ads_ad;',
+    """
+    CREATE TRIGGER ads_ad_search_vector_trigger
+    BEFORE INSERT OR UPDATE OF title, description ON ads_ad
+    FOR EACH ROW EXECUTE FUNCTION ads_ad_search_vector_update();
+    """,
+    """
+    CREATE INDEX IF NOT EXISTS ads_ad_search_vector_gin
+    ON ads_ad USING gin (search_vector);
+    """,
+    """
+    UPDATE ads_ad SET search_vector =
+        setweight(to_tsvector('russian', coalesce(title, '')), 'A')
+        || setweight(to_tsvector('russian', coalesce(description, '')), 'B')
+    WHERE search_vector IS NULL;
+    """,
+]
+
+POSTGRES_REVERSE_SQL = [
+    'DROP INDEX IF EXISTS ads_ad_search_vector_gin;',
+    'DROP TRIGGER IF EXISTS ads_ad_search_vector_trigger ON ads_ad;',
+    'DROP FUNCTION IF EXISTS ads_ad_search_vector_update();',
+    'UPDATE ads_ad SET search_vector = NULL;',
+]
+
+SQLITE_SQL = [
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS ads_ad_fts USING fts5(
+        title, description,
+        content='ads_ad', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2'
+    );
+    """,
+    "INSERT INTO ads_ad_fts(ads_ad_fts) VALUES ('rebuild');",
+    """
+    CREATE TRIGGER IF NOT EXISTS ads_ad_fts_insert AFTER INSERT ON ads_ad
+    BEGIN
+        INSERT INTO ads_ad_fts(rowid, title, description)
+        VALUES (new.id, new.title, new.description);
+    END;
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS ads_ad_fts_delete AFTER DELETE ON ads_ad
+    BEGIN
+        INSERT INTO ads_ad_fts(ads_ad_fts, rowid, title, description)
+        VALUES ('delete', old.id, old.title, old.description);
+    END;
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS ads_ad_fts_update
+    AFTER UPDATE OF title, description ON ads_ad
+    BEGIN
+        INSERT INTO ads_ad_fts(ads_ad_fts, rowid, title, description)
+        VALUES ('delete', old.id, old.title, old.description);
+        INSERT INTO ads_ad_fts(rowid, title, description)
+        VALUES (new.id, new.title, new.description);
+    END;
+    """,
+]
+
+SQLITE_REVERSE_SQL = [
+    'DROP TRIGGER IF EXISTS ads_ad_fts_update;',
+    'DROP TRIGGER IF EXISTS ads_ad_fts_delete;',
+    'DROP TRIGGER IF EXISTS ads_ad_fts_insert;',
+    'DROP TABLE IF EXISTS ads_ad_fts;',
+]
+
+
+class Migration(migrations.Migration):
+    """Триггеры и индексы полнотекстового поиска (ads.search).
+
+    На SQLite миграции, пересоздающие таблицу ads_ad, удаляют её
+    триггеры: после такой миграции нужно повторить SQLITE_SQL."""
+
+    dependencies = [
+        ('ads', '0015_ad_facet_counts'),
+    ]
+
+    operations = [
+        VendorRunSQL('postgresql', POSTGRES_SQL, POSTGRES_REVERSE_SQL),
+        VendorRunSQL('sqlite', SQLITE_SQL, SQLITE_REVERSE_SQL),
+    ]
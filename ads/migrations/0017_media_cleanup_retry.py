@@ -0,0 +1,23 @@
+# Generated by Django 5.1.1 on 2026-10-18 12:09
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ads', '0016_search_schema'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='mediacleanup',
+            name='attempts',
+            field=models.PositiveSmallIntegerField(default=0, verbose_name='Неудачных попыток удаления'),
+        ),
+        migrations.AddField(
+            model_name='mediacleanup',
+            name='retry_at',
+            field=models.DateTimeField(blank=True, null=True, verbose_name='Следующая попытка'),
+        ),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 5.1.1 on 2026-10-18 12:20
+
+from django.db import migrations
+
+from ads import percolator
+
+
+def renormalize_terms(apps, schema_editor):
+    """Пересчитывает слова и ключ индекса сохранённых поисков
+    в нормализации полнотекстового поиска (стемминг на PostgreSQL)."""
+
+    SavedSearch = apps.get_model('ads', 'SavedSearch')
+    db_alias = schema_editor.connection.alias
+    searches = list(SavedSearch.objects.using(db_alias).exclude(keywords=''))
+    words = percolator.normalize(
+        [search.keywords for search in searches], db_alias
+    )
+    for search, search_words in zip(searches, words):
+        search.terms = ' '.join(sorted(search_words))
+        search.anchor = percolator.search_anchor(search)
+    SavedSearch.objects.using(db_alias).bulk_update(
+        searches, ['terms', 'anchor'], batch_size=1000
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ads', '0017_media_cleanup_retry'),
+    ]
+
+    operations = [
+        migrations.RunPython(renormalize_terms, migrations.RunPython.noop),
+    ]
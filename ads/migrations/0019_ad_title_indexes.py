@@ -0,0 +1,31 @@
+# Generated by Django 5.1.1 on 2026-10-18 12:40
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ads', '0018_saved_search_terms'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='ad',
+            index=models.Index(fields=['title', 'id'], name='ad_title_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='ad',
+            index=models.Index(fields=['category', 'title', 'id'], name='ad_category_title_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='ad',
+            index=models.Index(fields=['condition', 'title', 'id'], name='ad_condition_title_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='ad',
+            index=models.Index(fields=['category', 'condition', 'title', 'id'], name='ad_cat_cond_title_idx'),
+        ),
+    ]
@@ -1,14 +1,27 @@
-import os
+import logging
+import threading
+from collections import Counter, defaultdict
+from datetime import timedelta
 
+from django.contrib.postgres.search import SearchVectorField
+from django.core.files.storage import default_storage
 from django.core.validators import FileExtensionValidator
-from django.db import models
-from django.db.models.signals import pre_save, post_delete
+from django.db import IntegrityError, connections, models, router, transaction
+from django.db.models import Count, F
+from django.db.models.sql import UpdateQuery
+from django.db.models.fields.files import FieldFile
+from django.db.models.signals import pre_save, post_delete, post_save
 from django.dispatch import receiver
+from django.utils import timezone
 
 from config import constants
 from ads import choices as chcs
+from ads import images
+from ads import percolator
 from users.models import User
 
+logger = logging.getLogger(__name__)
+
 
 class AbstractModel(models.Model):
     """Абстрактная модель.
@@ -50,6 +63,12 @@ class Ad(AbstractModel):
             )
         ],
     )
+    image_renditions = models.JSONField(
+        default=dict,
+        blank=True,
+        editable=False,
+        verbose_name='Рендиции изображения'
+    )
     category = models.ForeignKey(
         'Category',
         verbose_name='Категория ',
@@ -66,14 +85,106 @@ class Ad(AbstractModel):
         verbose_name='Дата публикации',
         auto_now_add=True
     )
+    updated_at = models.DateTimeField(
+        verbose_name='Дата изменения',
+        auto_now=True
+    )
+    search_vector = SearchVectorField(
+        **constants.NULLABLE,
+        editable=False,
+        verbose_name='Поисковый вектор'
+    )
 
     class Meta:
         verbose_name = 'Объявление'
         verbose_name_plural = 'Объявления'
+        indexes = [
+            models.Index(
+                fields=['-created_at', '-id'],
+                name='ad_created_idx'),
+            models.Index(
+                fields=['category', '-created_at', '-id'],
+                name='ad_category_created_idx'),
+            models.Index(
+                fields=['condition', '-created_at', '-id'],
+                name='ad_condition_created_idx'),
+            models.Index(
+                fields=['category', 'condition', '-created_at', '-id'],
+                name='ad_cat_cond_created_idx'),
+            models.Index(
+                fields=['title', 'id'],
+                name='ad_title_idx'),
+            models.Index(
+                fields=['category', 'title', 'id'],
+                name='ad_category_title_idx'),
+            models.Index(
+                fields=['condition', 'title', 'id'],
+                name='ad_condition_title_idx'),
+            models.Index(
+                fields=['category', 'condition', 'title', 'id'],
+                name='ad_cat_cond_title_idx'),
+            models.Index(
+                fields=['updated_at'],
+                name='ad_updated_idx'),
+        ]
 
     def __str__(self):
         return f'Товар: {self.title}, категория: {self.category.title}'
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        """Запоминает значения полей на момент загрузки из БД."""
+
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_values = dict(zip(field_names, values))
+        return instance
+
+    def save(self, *args, **kwargs):
+        """Сохраняет объявление в одной транзакции с обработчиками
+        post_save (счётчики фасетов), даже вне transaction.atomic()."""
+
+        using = kwargs.get('using') or router.db_for_write(
+            type(self), instance=self
+        )
+        with transaction.atomic(using=using):
+            super().save(*args, **kwargs)
+        update_fields = kwargs.get('update_fields')
+        if update_fields is None:
+            self.remember_loaded_values()
+        else:
+            self.remember_loaded_values(
+                self._meta.get_field(name).attname for name in update_fields
+            )
+
+    def refresh_from_db(self, using=None, fields=None, **kwargs):
+        super().refresh_from_db(using=using, fields=fields, **kwargs)
+        self.remember_loaded_values(
+            None if fields is None
+            else (self._meta.get_field(name).attname for name in fields)
+        )
+
+    def remember_loaded_values(self, attnames=None):
+        """Считает текущие значения полей сохранёнными в БД
+        (после save и refresh_from_db)."""
+
+        if attnames is None:
+            attnames = [field.attname for field in self._meta.concrete_fields]
+        deferred = self.get_deferred_fields()
+        loaded = getattr(self, '_loaded_values', {})
+        for attname in attnames:
+            if attname in deferred:
+                continue
+            value = getattr(self, attname)
+            loaded[attname] = value.name if isinstance(value, FieldFile) else value
+        self._loaded_values = loaded
+
+    def get_loaded_value(self, attname, default=None):
+        """Значение поля на момент загрузки из БД (default для новых
+        и отложенных полей)."""
+
+        value = getattr(self, '_loaded_values', {}).get(attname, default)
+        return default if value is models.DEFERRED else value
+
 
 class Category(AbstractModel):
     """Модель категории."""
@@ -83,6 +194,74 @@ class Category(AbstractModel):
         verbose_name_plural = 'Категории'
 
 
+class ExchangeProposalManager(models.Manager):
+    """Менеджер предложений обмена."""
+
+    def update_returning_ids(self, queryset, **values):
+        """queryset.update(**values) одним UPDATE ... RETURNING id:
+        возвращает отсортированные id изменённых строк (PostgreSQL,
+        SQLite 3.35+)."""
+
+        query = queryset.order_by().query.chain(UpdateQuery)
+        query.add_update_values(values)
+        query.annotations = {}
+        sql, params = query.get_compiler(queryset.db).as_sql()
+        connection = connections[queryset.db]
+        pk = connection.ops.quote_name(self.model._meta.pk.column)
+        with transaction.mark_for_rollback_on_error(using=queryset.db):
+            with connection.cursor() as cursor:
+                cursor.execute(f'{sql} RETURNING {pk}', params)
+                return sorted(row[0] for row in cursor.fetchall())
+
+    def approve(self, proposals):
+        """Принимает предложения в одной транзакции: блокирует их
+        объявления, пропускает предложения с объявлениями из уже принятых
+        обменов и одним UPDATE отклоняет прочие ожидающие предложения
+        с объявлениями принятых. Возвращает id принятых и пропущенных."""
+
+        proposals = list(proposals)
+        ids = [proposal.id for proposal in proposals]
+        ad_ids = sorted({
+            ad_id for proposal in proposals
+            for ad_id in (proposal.ad_sender_id, proposal.ad_receiver_id)
+        })
+        with transaction.atomic():
+            list(
+                Ad.objects.select_for_update().filter(id__in=ad_ids)
+                .order_by('id').values_list('id', flat=True)
+            )
+            busy = set()
+            for pair in self.filter(
+                models.Q(ad_sender__in=ad_ids) | models.Q(ad_receiver__in=ad_ids),
+                status=chcs.Status.APPROVED,
+            ).exclude(id__in=ids).values_list('ad_sender_id', 'ad_receiver_id'):
+                busy.update(pair)
+
+            approved, conflicts, approved_ads = [], [], set()
+            for proposal in proposals:
+                pair = {proposal.ad_sender_id, proposal.ad_receiver_id}
+                if pair & busy:
+                    conflicts.append(proposal.id)
+                    continue
+                approved.append(proposal.id)
+                approved_ads.update(pair)
+                busy.update(pair)
+
+            if approved:
+                now = timezone.now()
+                self.filter(id__in=approved).update(
+                    status=chcs.Status.APPROVED, updated_at=now
+                )
+                self.filter(
+                    models.Q(ad_sender__in=approved_ads)
+                    | models.Q(ad_receiver__in=approved_ads),
+                    status=chcs.Status.PENDING,
+                ).exclude(id__in=approved).update(
+                    status=chcs.Status.REJECTED, updated_at=now
+                )
+        return approved, conflicts
+
+
 class ExchangeProposal(models.Model):
     """Модель предложения обмена."""
 
@@ -98,6 +277,22 @@ class ExchangeProposal(models.Model):
         on_delete=models.CASCADE,
         related_name='receiver_ads'
     )
+    sender_user = models.ForeignKey(
+        User,
+        verbose_name='Отправитель',
+        on_delete=models.CASCADE,
+        related_name='sent_proposals',
+        editable=False,
+        db_index=False,
+    )
+    receiver_user = models.ForeignKey(
+        User,
+        verbose_name='Получатель',
+        on_delete=models.CASCADE,
+        related_name='received_proposals',
+        editable=False,
+        db_index=False,
+    )
     comment = models.TextField(
         **constants.NULLABLE,
         verbose_name='Комментарий'
@@ -112,6 +307,12 @@ class ExchangeProposal(models.Model):
         verbose_name='Дата публикации',
         auto_now_add=True
     )
+    updated_at = models.DateTimeField(
+        verbose_name='Дата изменения',
+        auto_now=True
+    )
+
+    objects = ExchangeProposalManager()
 
     class Meta:
         verbose_name = 'Предложение обмена'
@@ -121,35 +322,506 @@ class ExchangeProposal(models.Model):
                 fields=['ad_sender', 'ad_receiver'],
                 name='unique_ad_sender_ad_receiver'),
         ]
+        indexes = [
+            models.Index(
+                fields=['-created_at', '-id'],
+                name='proposal_created_idx'),
+            models.Index(
+                fields=['status', '-created_at', '-id'],
+                name='proposal_status_created_idx'),
+            models.Index(
+                fields=['sender_user', '-created_at', '-id'],
+                name='proposal_sender_created_idx'),
+            models.Index(
+                fields=['receiver_user', '-created_at', '-id'],
+                name='proposal_receiver_created_idx'),
+            models.Index(
+                fields=['updated_at'],
+                name='proposal_updated_idx'),
+            models.Index(
+                fields=['sender_user', '-created_at', '-id'],
+                condition=models.Q(status=chcs.Status.PENDING),
+                name='proposal_sender_pending_idx'),
+            models.Index(
+                fields=['receiver_user', '-created_at', '-id'],
+                condition=models.Q(status=chcs.Status.PENDING),
+                name='proposal_receiver_pending_idx'),
+        ]
 
     def __str__(self):
         return (f'Объявление отправителя: {self.ad_sender.title},'
                 f'объявление получателя: {self.ad_receiver.title}')
 
+    def save(self, *args, **kwargs):
+        """Копирует владельцев объявлений в sender_user/receiver_user."""
+
+        if self.sender_user_id is None:
+            self.sender_user_id = self.ad_sender.user_id
+        if self.receiver_user_id is None:
+            self.receiver_user_id = self.ad_receiver.user_id
+        super().save(*args, **kwargs)
+
+
+class AdFacetCountManager(models.Manager):
+    """Менеджер счётчиков объявлений по (категория, состояние)."""
+
+    def apply(self, deltas):
+        """Применяет изменения счётчиков {(category_id, condition): delta}
+        в текущей транзакции."""
+
+        for (category_id, condition), delta in deltas.items():
+            if not delta:
+                continue
+            counter = self.filter(category_id=category_id, condition=condition)
+            if counter.update(count=F('count') + delta):
+                continue
+            try:
+                with transaction.atomic():
+                    self.create(
+                        category_id=category_id, condition=condition, count=delta
+                    )
+            except IntegrityError:
+                counter.update(count=F('count') + delta)
+
+    def add_ads(self, ads, sign=1):
+        """Учитывает созданные (sign=1) или удалённые (sign=-1) объявления."""
+
+        deltas = Counter()
+        for ad in ads:
+            deltas[(ad.category_id, ad.condition)] += sign
+        self.apply(deltas)
+
+    def rebuild(self):
+        """Пересчитывает счётчики по таблице объявлений.
+        Возвращает расхождения {(category_id, condition): (было, стало)}."""
+
+        with transaction.atomic():
+            actual = {
+                (row['category_id'], row['condition']): row['count']
+                for row in Ad.objects.order_by().values(
+                    'category_id', 'condition'
+                ).annotate(count=Count('id'))
+            }
+            stored = {
+                (row.category_id, row.condition): row.count
+                for row in self.select_for_update()
+            }
+            self.all().delete()
+            self.bulk_create([
+                self.model(category_id=category_id, condition=condition, count=count)
+                for (category_id, condition), count in actual.items()
+            ])
+        return {
+            key: (stored.get(key, 0), actual.get(key, 0))
+            for key in stored.keys() | actual.keys()
+            if stored.get(key, 0) != actual.get(key, 0)
+        }
+
+    def facets(self, category_id=None, condition=None, rows=None):
+        """Счётчики для фильтров: по категориям — с учётом фильтра
+        состояния, по состояниям — с учётом фильтра категории.
+        rows — строки (category_id, condition, count), если считать
+        нужно не по всем объявлениям (например, по результатам поиска)."""
+
+        if rows is None:
+            rows = self.values_list('category_id', 'condition', 'count')
+        categories, conditions = Counter(), Counter()
+        for row_category_id, row_condition, count in rows:
+            if condition in (None, row_condition):
+                categories[row_category_id] += count
+            if category_id in (None, row_category_id):
+                conditions[row_condition] += count
+        return categories, conditions
+
+
+class AdFacetCount(models.Model):
+    """Модель счётчика объявлений по категории и состоянию.
+    Обновляется в той же транзакции, что и объявления."""
+
+    category = models.ForeignKey(
+        'Category',
+        verbose_name='Категория',
+        on_delete=models.CASCADE,
+        related_name='facet_counts'
+    )
+    condition = models.CharField(
+        max_length=constants.MAX_CHOICES_LENGTH,
+        choices=chcs.AD_CONDITION_CHOICES,
+        verbose_name='Состояние товара'
+    )
+    count = models.IntegerField(
+        default=0,
+        verbose_name='Число объявлений'
+    )
+
+    objects = AdFacetCountManager()
+
+    class Meta:
+        verbose_name = 'Счётчик объявлений'
+        verbose_name_plural = 'Счётчики объявлений'
+        constraints = [
+            models.UniqueConstraint(
+                fields=['category', 'condition'],
+                name='unique_facet_category_condition'),
+        ]
+
+    def __str__(self):
+        return f'{self.category_id}/{self.condition}: {self.count}'
+
+
+class SavedSearchManager(models.Manager):
+    """Менеджер сохранённых поисков."""
+
+    def percolate(self, ads):
+        """Находит сохранённые поиски для новых объявлений через обратный
+        индекс и записывает совпадения в ленты пользователей.
+        Возвращает число найденных совпадений."""
+
+        ads = list(ads)
+        if not ads:
+            return 0
+        words = percolator.normalize(
+            [percolator.ad_text(ad) for ad in ads], self.db
+        )
+        keys = {
+            ad.id: percolator.ad_keys(ad, ad_words, self.db)
+            for ad, ad_words in zip(ads, words)
+        }
+        by_anchor = defaultdict(list)
+        for search in self.filter(
+                anchor__in=set().union(*keys.values())
+        ).only('id', 'user_id', 'category_id', 'condition', 'terms', 'anchor'):
+            by_anchor[search.anchor].append(search)
+
+        matches = [
+            SavedSearchMatch(saved_search=search, ad=ad, user_id=search.user_id)
+            for ad in ads
+            for key in keys[ad.id]
+            for search in by_anchor.get(key, ())
+            if search.user_id != ad.user_id
+            and percolator.search_matches(search, ad, keys[ad.id])
+        ]
+        SavedSearchMatch.objects.bulk_create(matches, ignore_conflicts=True)
+        return len(matches)
+
+
+class SavedSearch(models.Model):
+    """Модель сохранённого поиска пользователя.
+    anchor — ключ, по которому поиск находится в обратном индексе
+    при появлении нового объявления (см. ads.percolator)."""
+
+    user = models.ForeignKey(
+        User,
+        verbose_name='Пользователь',
+        on_delete=models.CASCADE,
+        related_name='saved_searches'
+    )
+    category = models.ForeignKey(
+        'Category',
+        verbose_name='Категория',
+        on_delete=models.CASCADE,
+        **constants.NULLABLE
+    )
+    condition = models.CharField(
+        max_length=constants.MAX_CHOICES_LENGTH,
+        choices=chcs.AD_CONDITION_CHOICES,
+        blank=True,
+        verbose_name='Состояние товара'
+    )
+    keywords = models.CharField(
+        max_length=constants.MAX_CHAR_LENGTH,
+        blank=True,
+        verbose_name='Ключевые слова'
+    )
+    terms = models.CharField(
+        max_length=constants.MAX_CHAR_LENGTH,
+        blank=True,
+        editable=False,
+        verbose_name='Нормализованные слова'
+    )
+    anchor = models.CharField(
+        max_length=constants.MAX_CHAR_LENGTH,
+        db_index=True,
+        editable=False,
+        verbose_name='Ключ обратного индекса'
+    )
+    created_at = models.DateTimeField(
+        verbose_name='Дата создания',
+        auto_now_add=True
+    )
+
+    objects = SavedSearchManager()
+
+    class Meta:
+        verbose_name = 'Сохранённый поиск'
+        verbose_name_plural = 'Сохранённые поиски'
+
+    def __str__(self):
+        return f'Поиск {self.keywords or "без слов"} пользователя {self.user_id}'
+
+    def save(self, *args, **kwargs):
+        """Заполняет terms и anchor для обратного индекса."""
+
+        using = kwargs.get('using') or router.db_for_write(
+            type(self), instance=self
+        )
+        self.terms = ' '.join(sorted(
+            percolator.normalize([self.keywords], using)[0]
+        ))
+        self.anchor = percolator.search_anchor(self)
+        super().save(*args, **kwargs)
+
+
+class SavedSearchMatch(models.Model):
+    """Модель совпадения нового объявления с сохранённым поиском
+    (лента новых совпадений пользователя)."""
+
+    saved_search = models.ForeignKey(
+        SavedSearch,
+        verbose_name='Сохранённый поиск',
+        on_delete=models.CASCADE,
+        related_name='matches'
+    )
+    ad = models.ForeignKey(
+        Ad,
+        verbose_name='Объявление',
+        on_delete=models.CASCADE,
+        related_name='search_matches'
+    )
+    user = models.ForeignKey(
+        User,
+        verbose_name='Пользователь',
+        on_delete=models.CASCADE,
+        related_name='search_matches',
+        db_index=False,
+    )
+    created_at = models.DateTimeField(
+        verbose_name='Дата совпадения',
+        auto_now_add=True
+    )
+
+    class Meta:
+        verbose_name = 'Совпадение поиска'
+        verbose_name_plural = 'Совпадения поисков'
+        constraints = [
+            models.UniqueConstraint(
+                fields=['saved_search', 'ad'],
+                name='unique_saved_search_ad'),
+        ]
+        indexes = [
+            models.Index(
+                fields=['user', '-created_at', '-id'],
+                name='search_match_feed_idx'),
+        ]
+
+
+class MediaCleanupManager(models.Manager):
+    """Очередь удаления медиа-файлов."""
+
+    def enqueue(self, image_name, renditions=None):
+        """Ставит изображение и его рендиции в очередь одним INSERT;
+        файлы удаляются пачками после коммита."""
+
+        names = [image_name, *(
+            name for variants in (renditions or {}).values()
+            for name in variants.values()
+        )]
+        self.bulk_create(
+            [self.model(name=name, image=image_name) for name in names]
+        )
+        transaction.on_commit(schedule_media_cleanup, robust=True)
+
+    def process(self, batch_size=constants.MEDIA_CLEANUP_BATCH_SIZE,
+                storage=default_storage):
+        """Удаляет файлы очереди пачками. Файлы изображений, на которые
+        снова ссылается объявление, пропускаются. Если удалить файл
+        не удалось (кроме «файл уже удалён»), запись остаётся в очереди
+        и повторяется не раньше retry_at с удвоением задержки.
+        Возвращает число удалённых, пропущенных и неудавшихся файлов."""
+
+        deleted = skipped = failed = 0
+        while True:
+            with transaction.atomic():
+                now = timezone.now()
+                batch = list(
+                    self.select_for_update(skip_locked=True)
+                    .filter(
+                        models.Q(retry_at__isnull=True)
+                        | models.Q(retry_at__lte=now)
+                    )
+                    .order_by('id')[:batch_size]
+                )
+                if not batch:
+                    return deleted, skipped, failed
+                referenced = set(
+                    Ad.objects.filter(
+                        image_url__in={row.image for row in batch}
+                    ).values_list('image_url', flat=True)
+                )
+                done, retries = [], []
+                for row in batch:
+                    if row.image in referenced:
+                        skipped += 1
+                        done.append(row.id)
+                        continue
+                    try:
+                        storage.delete(row.name)
+                    except FileNotFoundError:
+                        pass
+                    except OSError:
+                        logger.exception('Не удалось удалить файл %s', row.name)
+                        row.attempts += 1
+                        row.retry_at = now + timedelta(seconds=min(
+                            constants.MEDIA_CLEANUP_RETRY_DELAY
+                            * 2 ** (row.attempts - 1),
+                            constants.MEDIA_CLEANUP_MAX_RETRY_DELAY,
+                        ))
+                        retries.append(row)
+                        failed += 1
+                        continue
+                    deleted += 1
+                    done.append(row.id)
+                self.filter(id__in=done).delete()
+                self.bulk_update(retries, ['attempts', 'retry_at'])
+
+
+class MediaCleanup(models.Model):
+    """Файл, ожидающий удаления из медиа-хранилища."""
+
+    name = models.CharField(
+        max_length=constants.MAX_CHAR_LENGTH,
+        verbose_name='Файл'
+    )
+    image = models.CharField(
+        max_length=constants.MAX_CHAR_LENGTH,
+        verbose_name='Исходное изображение'
+    )
+    created_at = models.DateTimeField(
+        verbose_name='Дата постановки в очередь',
+        auto_now_add=True
+    )
+    attempts = models.PositiveSmallIntegerField(
+        verbose_name='Неудачных попыток удаления',
+        default=0
+    )
+    retry_at = models.DateTimeField(
+        verbose_name='Следующая попытка',
+        **constants.NULLABLE
+    )
+
+    objects = MediaCleanupManager()
+
+    class Meta:
+        verbose_name = 'Файл к удалению'
+        verbose_name_plural = 'Очередь удаления файлов'
+
+    def __str__(self):
+        return self.name
+
+
+_cleanup_scheduled = threading.Event()
+
+
+def _drain_media_cleanup():
+    _cleanup_scheduled.clear()
+    MediaCleanup.objects.process()
+
+
+def schedule_media_cleanup():
+    """Запускает обработку очереди удаления в фоне, если она ещё
+    не запланирована (одна обработка на много удалённых объявлений)."""
+
+    if not _cleanup_scheduled.is_set():
+        _cleanup_scheduled.set()
+        images.run_in_background(_drain_media_cleanup)
+
 
 @receiver(post_delete, sender=Ad)
 def delete_ad_image_file(sender, instance, **kwargs):
-    """Удаляет изображения объявления из медиа-папки."""
+    """Ставит изображение объявления и его рендиции в очередь удаления."""
 
     if instance.image_url:
-        instance.image_url.delete(save=False)
+        MediaCleanup.objects.enqueue(
+            instance.image_url.name, instance.image_renditions
+        )
+
+
+@receiver(post_save, sender=Ad)
+def schedule_image_renditions(sender, instance, created, **kwargs):
+    """Ставит построение рендиций нового изображения в фоновую очередь."""
+
+    if not instance.image_url:
+        return
+    if created or instance.get_loaded_value('image_url') != instance.image_url.name:
+        images.schedule_renditions(instance)
 
 
 @receiver(pre_save, sender=Ad)
-def delete_old_image_on_change(sender, instance, **kwargs):
-    """Удаляет старое изображение при замене нового."""
+def clear_renditions_on_image_change(sender, instance, **kwargs):
+    """Сбрасывает рендиции при замене изображения: новые построит
+    фоновая задача."""
+
+    old_name = instance.get_loaded_value('image_url')
+    if old_name and old_name != instance.image_url.name:
+        instance.image_renditions = {}
 
-    if not instance.pk:
+
+@receiver(post_save, sender=Ad)
+def delete_old_image_on_change(sender, instance, created, **kwargs):
+    """Ставит старое изображение и его рендиции в очередь удаления
+    при замене изображения. Очередь заполняется после UPDATE: при
+    автокоммите обработка запускается сразу и не должна застать
+    в строке старое имя. Загруженные значения обновляются только
+    после post_save, поэтому здесь они ещё старые."""
+
+    old_name = instance.get_loaded_value('image_url')
+    if created or not old_name or old_name == instance.image_url.name:
         return
 
-    try:
-        old_instance = Ad.objects.get(pk=instance.pk)
-    except Ad.DoesNotExist:
+    MediaCleanup.objects.enqueue(
+        old_name, instance.get_loaded_value('image_renditions')
+    )
+
+
+def percolate_on_commit(ads):
+    """Сопоставляет новые объявления с сохранёнными поисками после коммита."""
+
+    ads = list(ads)
+    transaction.on_commit(
+        lambda: SavedSearch.objects.percolate(ads), robust=True
+    )
+
+
+@receiver(post_save, sender=Ad)
+def percolate_new_ad(sender, instance, created, **kwargs):
+    """Ставит новое объявление в проверку по сохранённым поискам."""
+
+    if created:
+        percolate_on_commit([instance])
+
+
+@receiver(post_save, sender=Ad)
+def count_saved_ad(sender, instance, created, **kwargs):
+    """Обновляет счётчики при создании объявления и смене его
+    категории или состояния. Ad.save() отправляет post_save внутри своей
+    транзакции, поэтому запись объявления и счётчика атомарна и при
+    автокоммите."""
+
+    key = (instance.category_id, instance.condition)
+    if created:
+        AdFacetCount.objects.apply({key: 1})
         return
+    loaded = (
+        instance.get_loaded_value('category_id', instance.category_id),
+        instance.get_loaded_value('condition', instance.condition),
+    )
+    if loaded != key:
+        AdFacetCount.objects.apply({loaded: -1, key: 1})
 
-    old_image = old_instance.image_url
-    new_image = instance.image_url
 
-    if old_image and old_image != new_image:
-        if os.path.isfile(old_image.path):
-            old_image.delete(save=False)
+@receiver(post_delete, sender=Ad)
+def count_deleted_ad(sender, instance, **kwargs):
+    """Уменьшает счётчик удалённого объявления. post_delete отправляется
+    внутри транзакции удаления, поэтому счётчик атомарен с ним."""
+
+    AdFacetCount.objects.apply({(instance.category_id, instance.condition): -1})
@@ -0,0 +1,114 @@
+"""Обратный индекс сохранённых поисков (перколятор).
+
+Каждый сохранённый поиск индексируется по одному ключу (anchor):
+самому длинному слову запроса, иначе категории, иначе состоянию.
+Для нового объявления строится множество его ключей; кандидаты —
+поиски, чей anchor входит в это множество (выборка по индексу
+anchor), и только они проверяются полностью. Стоимость зависит от
+размера списков по ключам объявления, а не от числа всех поисков.
+
+Слова нормализуются так же, как в полнотекстовом поиске ads.search,
+поэтому сохранённый поиск срабатывает на те объявления, которые
+вернул бы /api/ads/?search=: на PostgreSQL это лексемы to_tsvector
+с конфигурацией SEARCH_CONFIG (стемминг, без стоп-слов), на SQLite —
+слова токенизатора FTS5, а слово запроса совпадает с началом слова
+объявления (префиксный поиск), поэтому ключи объявления включают
+префиксы его слов.
+"""
+import re
+
+from django.db import DEFAULT_DB_ALIAS, connections
+
+from ads.search import SEARCH_CONFIG
+
+WORD_RE = re.compile(r'\w+')
+MIN_WORD_LENGTH = 2
+ANY = '*'
+
+
+def tokenize(text):
+    """Множество нормализованных слов текста."""
+
+    return {
+        word for word in WORD_RE.findall((text or '').lower().replace('ё', 'е'))
+        if len(word) >= MIN_WORD_LENGTH
+    }
+
+
+def uses_stemming(using=DEFAULT_DB_ALIAS):
+    """Нормализует ли поиск на этой БД слова стеммингом (PostgreSQL)."""
+
+    return connections[using].vendor == 'postgresql'
+
+
+def normalize(texts, using=DEFAULT_DB_ALIAS):
+    """Множества слов для каждого текста в нормализации поиска ads.search.
+    На PostgreSQL — один запрос для всех текстов."""
+
+    texts = [text or '' for text in texts]
+    if not uses_stemming(using) or not texts:
+        return [tokenize(text) for text in texts]
+    with connections[using].cursor() as cursor:
+        cursor.execute(
+            'SELECT array(SELECT lexeme FROM unnest(to_tsvector(%s::regconfig, body))) '
+            'FROM unnest(%s::text[]) WITH ORDINALITY AS texts(body, position) '
+            'ORDER BY position',
+            [SEARCH_CONFIG, texts],
+        )
+        return [set(row[0]) for row in cursor.fetchall()]
+
+
+def prefixes(words):
+    """Слова и все их префиксы не короче MIN_WORD_LENGTH."""
+
+    return {
+        word[:length]
+        for word in words
+        for length in range(MIN_WORD_LENGTH, len(word) + 1)
+    }
+
+
+def category_key(category_id):
+    return f'cat:{category_id}'
+
+
+def condition_key(condition):
+    return f'cond:{condition}'
+
+
+def search_anchor(search):
+    """Ключ обратного индекса для сохранённого поиска."""
+
+    terms = search.terms.split()
+    if terms:
+        return max(terms, key=lambda term: (len(term), term))
+    if search.category_id:
+        return category_key(search.category_id)
+    if search.condition:
+        return condition_key(search.condition)
+    return ANY
+
+
+def ad_text(ad):
+    return f'{ad.title} {ad.description}'
+
+
+def ad_keys(ad, words, using=DEFAULT_DB_ALIAS):
+    """Ключи объявления: нормализованные слова words его текста
+    (без стемминга — с префиксами), категория и состояние."""
+
+    if not uses_stemming(using):
+        words = prefixes(words)
+    return words | {
+        ANY, category_key(ad.category_id), condition_key(ad.condition),
+    }
+
+
+def search_matches(search, ad, keys):
+    """Проверяет все условия поиска для объявления с ключами keys."""
+
+    return (
+        (not search.category_id or search.category_id == ad.category_id)
+        and (not search.condition or search.condition == ad.condition)
+        and keys.issuperset(search.terms.split())
+    )
@@ -0,0 +1,57 @@
+"""Полнотекстовый поиск по объявлениям.
+
+PostgreSQL: колонка ads_ad.search_vector (tsvector) поддерживается
+триггером, поиск идёт по GIN-индексу с русской морфологией.
+SQLite: внешняя FTS5-таблица ads_ad_fts, синхронизируемая триггерами.
+Триггеры, индекс и таблица FTS5 создаются миграцией 0016_search_schema.
+"""
+from django.contrib.postgres.search import SearchQuery, SearchRank
+from django.db import connections
+from django.db.models import F, FloatField
+from django.db.models.functions import Cast
+from django.db.models.expressions import RawSQL
+
+SEARCH_CONFIG = 'russian'
+
+
+def _fts5_query(text):
+    """Экранирует слова запроса для синтаксиса FTS5 (префиксный поиск)."""
+
+    words = text.split()
+    return ' '.join('"{}"*'.format(word.replace('"', '""')) for word in words)
+
+
+def search_ads(queryset, text):
+    """Фильтрует объявления по поисковому запросу и сортирует
+    по релевантности (аннотация rank, больше — релевантнее).
+    rank — double precision, чтобы значение из курсора пагинации
+    совпадало с вычисленным в БД точно."""
+
+    text = text.strip()
+    if not text:
+        return queryset
+
+    vendor = connections[queryset.db].vendor
+    if vendor == 'postgresql':
+        query = SearchQuery(text, config=SEARCH_CONFIG, search_type='websearch')
+        queryset = queryset.filter(search_vector=query).annotate(
+            rank=Cast(SearchRank(F('search_vector'), query), FloatField())
+        )
+    elif vendor == 'sqlite':
+        match = _fts5_query(text)
+        queryset = queryset.filter(
+            id__in=RawSQL(
+                'SELECT rowid FROM ads_ad_fts WHERE ads_ad_fts MATCH %s',
+                [match],
+            )
+        ).annotate(
+            rank=RawSQL(
+                'SELECT -bm25(ads_ad_fts, 10.0, 1.0) FROM ads_ad_fts '
+                'WHERE ads_ad_fts MATCH %s AND rowid = ads_ad.id',
+                [match],
+                output_field=FloatField(),
+            )
+        )
+    else:
+        return queryset.filter(title__icontains=text)
+    return queryset.order_by('-rank', '-id')
@@ -0,0 +1,81 @@
+import pytest
+
+from ads.barter import BarterGraph
+from ads.models import Ad, ExchangeProposal
+from users.models import User
+
+
+def test_graph_finds_cycles_up_to_length():
+    """Проверяет поиск циклов с ограничением длины и удаление рёбер."""
+
+    graph = BarterGraph()
+    for proposal_id, (sender, receiver) in enumerate(
+            [(1, 2), (2, 3), (3, 1), (2, 1), (3, 4), (4, 1)], start=1):
+        graph.add_edge(proposal_id, sender, receiver)
+    graph.add_edge(1, 1, 2)
+
+    cycles = graph.find_cycles(1, max_length=3, limit=10)
+    assert sorted(len(cycle) for cycle in cycles) == [2, 3]
+    assert len(graph.find_cycles(1, max_length=4, limit=10)) == 3
+    assert len(graph.find_cycles(1, max_length=4, limit=1)) == 1
+
+    graph.remove_edge(2, 2, 3)
+    graph.remove_edge(2, 2, 3)
+    assert graph.edge_count == 5
+    assert [len(cycle) for cycle in graph.find_cycles(1, 4, 10)] == [2]
+
+
+@pytest.fixture
+def triangle(user, another_user, category):
+    """Создаёт цикл предложений user → another_user → third → user."""
+
+    third = User.objects.create_user(
+        username='thirduser', email='third@mail.com', password='12345678'
+    )
+    ads = [
+        Ad.objects.create(
+            title=f'Вещь {owner.username}', description='...',
+            user=owner, category=category, condition='new'
+        )
+        for owner in (user, another_user, third)
+    ]
+    return [
+        ExchangeProposal.objects.create(
+            ad_sender=ads[number], ad_receiver=ads[(number + 1) % 3]
+        )
+        for number in range(3)
+    ]
+
+
+@pytest.mark.django_db
+def test_cycles_endpoint(auth_client, another_auth_client, triangle):
+    """Проверяет выдачу цикла из трёх участников и его исчезновение
+    после отклонения одного из предложений."""
+
+    response = auth_client.get('/api/proposals/cycles/')
+    assert response.status_code == 200
+    assert len(response.data) == 1
+    assert response.data[0]['length'] == 3
+    assert [step['id'] for step in response.data[0]['proposals']] == [
+        proposal.id for proposal in triangle
+    ]
+
+    another_auth_client.post(
+        '/api/proposals/bulk-status/',
+        {'ids': [triangle[0].id], 'status': 'rejected'}, format='json'
+    )
+    assert auth_client.get('/api/proposals/cycles/').data == []
+
+
+@pytest.mark.django_db
+def test_cycles_skip_deleted_proposals(auth_client, triangle, settings):
+    """Проверяет, что удалённое предложение не попадает в цикл,
+    и ограничение длины цикла настройкой."""
+
+    assert len(auth_client.get('/api/proposals/cycles/').data) == 1
+    ExchangeProposal.objects.filter(id=triangle[1].id).delete()
+    assert auth_client.get('/api/proposals/cycles/').data == []
+
+    settings.BARTER_MAX_CYCLE_LENGTH = 3
+    response = auth_client.get('/api/proposals/cycles/', {'max_length': 4})
+    assert response.status_code == 400
@@ -0,0 +1,67 @@
+import json
+
+import pytest
+from django.core.management import call_command
+from django.db.models import Count, F
+
+from ads import choices as chcs
+from ads.models import Ad, AdFacetCount, Category, ExchangeProposal
+from users.models import User
+
+
+@pytest.mark.django_db
+def test_generate_fake_data():
+    """Проверяет объёмы, перекос по категориям и согласованность данных."""
+
+    call_command(
+        'generate_fake_data', '--users', '20', '--categories', '5',
+        '--ads', '300', '--proposals', '100', '--batch-size', '64',
+    )
+    assert User.objects.count() == 20
+    assert Ad.objects.count() == 300
+    assert ExchangeProposal.objects.count() == 100
+
+    counts = list(Category.objects.annotate(
+        ads_count=Count('categories')
+    ).order_by('-ads_count').values_list('ads_count', flat=True))
+    assert counts[0] > 2 * counts[-1]
+    assert sum(AdFacetCount.objects.values_list('count', flat=True)) == 300
+    assert not ExchangeProposal.objects.filter(
+        sender_user=F('receiver_user')
+    ).exists()
+    assert not ExchangeProposal.objects.exclude(
+        sender_user=F('ad_sender__user')
+    ).exists()
+    approved = ExchangeProposal.objects.filter(status=chcs.Status.APPROVED)
+    busy = set(approved.values_list('ad_sender_id', flat=True)) | set(
+        approved.values_list('ad_receiver_id', flat=True)
+    )
+    assert not ExchangeProposal.objects.filter(
+        status=chcs.Status.PENDING, ad_sender_id__in=busy
+    ).exists()
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('handler', ['wsgi', 'asgi'])
+def test_benchmark_api(tmp_path, capsys, handler):
+    """Проверяет прогон всех сценариев через WSGI- и ASGI-обработчик
+    и отчёт без изменения данных."""
+
+    call_command(
+        'generate_fake_data', '--users', '10', '--ads', '100',
+        '--proposals', '60',
+    )
+    ads_before = Ad.objects.count()
+    path = tmp_path / 'benchmark.json'
+    call_command(
+        'benchmark_api', '--requests', '2', '--warmup', '0',
+        '--alloc-samples', '1', '--handler', handler, '--output', str(path),
+    )
+    report = json.loads(path.read_text(encoding='utf-8'))
+    assert report['handler'] == handler
+    assert report['dataset']['ads'] == ads_before == Ad.objects.count()
+    assert {'ads.list', 'ads.batch', 'proposals.inbox',
+            'users.login'} <= report['results'].keys()
+    for name, result in report['results'].items():
+        assert all(code < 400 for code in result['status']), name
+        assert result['p50_ms'] <= result['p99_ms']
@@ -0,0 +1,151 @@
+from io import BytesIO
+
+import pytest
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+from PIL import Image
+
+from ads.models import Ad
+from api.serializers import AdReadSerializer
+
+
+def make_image(name, width=1000, height=500, color='red'):
+    """Возвращает загружаемый PNG-файл заданного размера."""
+
+    buffer = BytesIO()
+    Image.new('RGB', (width, height), color).save(buffer, 'PNG')
+    return SimpleUploadedFile(name, buffer.getvalue(), content_type='image/png')
+
+
+@pytest.fixture
+def ad_with_image(media, user, category, django_capture_on_commit_callbacks):
+    """Создаёт объявление с изображением 1000x500 и строит рендиции."""
+
+    with django_capture_on_commit_callbacks(execute=True):
+        ad = Ad.objects.create(
+            title='Картина', description='Масло', user=user,
+            category=category, condition='new',
+            image_url=make_image('picture.png'),
+        )
+    ad.refresh_from_db()
+    return ad
+
+
+@pytest.mark.django_db
+def test_renditions_are_generated(ad_with_image):
+    """Проверяет рендиции 320 и 640 px в PNG и WebP без увеличения до 1280."""
+
+    assert sorted(ad_with_image.image_renditions) == ['320', '640']
+    webp = ad_with_image.image_renditions['320']['webp']
+    with default_storage.open(webp) as file, Image.open(file) as image:
+        assert image.format == 'WEBP'
+        assert image.size == (320, 160)
+
+
+@pytest.mark.django_db
+def test_read_serializer_returns_srcset(ad_with_image):
+    """Проверяет srcset-строки рендиций в AdReadSerializer."""
+
+    srcset = AdReadSerializer(instance=ad_with_image).data['image_srcset']
+    assert srcset['webp'].endswith('640w')
+    assert '_320.png 320w' in srcset['original']
+
+
+@pytest.mark.django_db
+def test_renditions_are_deleted_with_ad(
+        ad_with_image, django_capture_on_commit_callbacks):
+    """Проверяет удаление рендиций вместе с объявлением."""
+
+    names = [
+        name for variants in ad_with_image.image_renditions.values()
+        for name in variants.values()
+    ]
+    with django_capture_on_commit_callbacks(execute=True):
+        ad_with_image.delete()
+    assert not any(default_storage.exists(name) for name in names)
+
+
+@pytest.mark.django_db
+def test_renditions_are_replaced_on_image_change(
+        ad_with_image, django_capture_on_commit_callbacks):
+    """Проверяет замену рендиций при смене изображения."""
+
+    old = ad_with_image.image_renditions['320']['webp']
+    with django_capture_on_commit_callbacks(execute=True):
+        ad_with_image.image_url = make_image('photo.png', width=700)
+        ad_with_image.save()
+    ad_with_image.refresh_from_db()
+
+    assert not default_storage.exists(old)
+    assert sorted(ad_with_image.image_renditions) == ['320', '640']
+    assert 'photo' in ad_with_image.image_renditions['320']['webp']
+
+
+@pytest.mark.django_db
+def test_renditions_of_images_with_same_stem(
+        media, user, category, django_capture_on_commit_callbacks):
+    """Проверяет, что изображения photo.jpg и photo.png разных объявлений
+    получают свои рендиции, и удаление одного объявления не трогает
+    рендиции другого."""
+
+    ads = {}
+    with django_capture_on_commit_callbacks(execute=True):
+        for name, color in (('photo.jpg', 'red'), ('photo.png', 'blue')):
+            ads[color] = Ad.objects.create(
+                title=name, description='...', user=user,
+                category=category, condition='new',
+                image_url=make_image(name, color=color),
+            )
+    for ad in ads.values():
+        ad.refresh_from_db()
+
+    red = ads['red'].image_renditions['320']['webp']
+    blue = ads['blue'].image_renditions['320']['webp']
+    assert red != blue
+    for name, color in ((red, (255, 0, 0)), (blue, (0, 0, 255))):
+        with default_storage.open(name) as file, Image.open(file) as image:
+            pixel = image.convert('RGB').getpixel((10, 10))
+        assert max(abs(a - b) for a, b in zip(pixel, color)) < 10
+
+    with django_capture_on_commit_callbacks(execute=True):
+        ads['red'].delete()
+    assert not default_storage.exists(red)
+    assert all(
+        default_storage.exists(name)
+        for variants in ads['blue'].image_renditions.values()
+        for name in variants.values()
+    )
+
+
+@pytest.mark.django_db
+def test_title_patch_costs_one_update(auth_client, ad_with_image):
+    """Проверяет, что правка заголовка — один UPDATE без повторного
+    чтения объявления и без удаления изображения."""
+
+    with CaptureQueriesContext(connection) as context:
+        response = auth_client.patch(
+            f'/api/ads/{ad_with_image.id}/', {'title': 'Натюрморт'}
+        )
+    assert response.status_code == 200
+    queries = [query['sql'] for query in context.captured_queries]
+    assert sum(sql.startswith('UPDATE') for sql in queries) == 1
+    assert sum(sql.startswith('SELECT "ads_ad"."id"') for sql in queries) == 1
+    assert default_storage.exists(ad_with_image.image_url.name)
+
+
+@pytest.mark.django_db
+def test_rolled_back_image_change_keeps_file(
+        ad_with_image, django_capture_on_commit_callbacks):
+    """Проверяет, что откат смены изображения не удаляет старый файл."""
+
+    old = ad_with_image.image_url.name
+    with django_capture_on_commit_callbacks(execute=True) as callbacks:
+        with pytest.raises(RuntimeError):
+            with transaction.atomic():
+                ad_with_image.image_url = make_image('photo.png')
+                ad_with_image.save()
+                raise RuntimeError
+    assert not callbacks
+    assert default_storage.exists(old)
@@ -0,0 +1,105 @@
+import json
+
+import pytest
+from django.core.management import call_command
+
+from ads.models import Ad, AdFacetCount, Category, SavedSearchMatch
+
+
+@pytest.mark.django_db
+def test_import_ads(
+        user, another_user, category, tmp_path, capsys,
+        django_capture_on_commit_callbacks):
+    """Проверяет импорт NDJSON: создание категорий, ошибки по строкам,
+    счётчики, сохранённые поиски и повторный запуск без изменений."""
+
+    another_user.saved_searches.create(keywords='велосипед')
+    rows = [
+        {'user': user.username, 'title': 'Велосипед', 'description': '...',
+         'category': category.title, 'condition': 'used'},
+        {'user': user.username, 'title': 'Мяч', 'description': '...',
+         'category': 'Спорт'},
+        {'user': 'nobody', 'title': 'Ракетка', 'description': '...',
+         'category': 'Спорт'},
+        {'user': user.username, 'title': 'Мяч', 'description': 'дубль',
+         'category': 'Спорт'},
+        {'user': user.username, 'title': 'Гиря', 'description': '...',
+         'category': 'Спорт', 'condition': 'broken'},
+    ]
+    path = tmp_path / 'ads.ndjson'
+    path.write_text(
+        '\n'.join(json.dumps(row, ensure_ascii=False) for row in rows)
+        + '\nне json\n',
+        encoding='utf-8',
+    )
+
+    with django_capture_on_commit_callbacks(execute=True):
+        call_command('import_ads', str(path), '--batch-size', '2')
+    out, err = capsys.readouterr()
+    assert 'создано: 2, пропущено (заголовок занят): 1, отклонено: 3' in out
+    assert [line.split(':')[0] for line in err.splitlines()] == [
+        'Строка 3', 'Строка 5', 'Строка 6'
+    ]
+    sport = Category.objects.get(title='Спорт')
+    assert Ad.objects.get(title='Мяч').category == sport
+    assert Ad.objects.get(title='Велосипед').condition == 'used'
+    assert set(AdFacetCount.objects.values_list(
+        'category_id', 'condition', 'count'
+    )) == {(category.id, 'used', 1), (sport.id, 'new', 1)}
+    assert SavedSearchMatch.objects.filter(
+        user=another_user, ad__title='Велосипед'
+    ).exists()
+
+    call_command('import_ads', str(path))
+    out, _ = capsys.readouterr()
+    assert 'создано: 0, пропущено (заголовок занят): 3' in out
+    assert Ad.objects.count() == 2
+
+
+@pytest.mark.django_db
+def test_import_rejects_non_string_condition(
+        user, category, tmp_path, capsys):
+    """Проверяет, что список или объект в поле condition отклоняет
+    строку, а не прерывает импорт."""
+
+    rows = [
+        {'user': user.username, 'title': 'Мяч', 'description': '...',
+         'category': category.title, 'condition': ['used']},
+        {'user': user.username, 'title': 'Гиря', 'description': '...',
+         'category': category.title, 'condition': {'value': 'new'}},
+        {'user': user.username, 'title': 'Ракетка', 'description': '...',
+         'category': category.title},
+    ]
+    path = tmp_path / 'ads.ndjson'
+    path.write_text(
+        '\n'.join(json.dumps(row, ensure_ascii=False) for row in rows),
+        encoding='utf-8',
+    )
+
+    call_command('import_ads', str(path))
+    out, err = capsys.readouterr()
+    assert 'создано: 1, пропущено (заголовок занят): 0, отклонено: 2' in out
+    assert [line.split(':')[0] for line in err.splitlines()] == [
+        'Строка 1', 'Строка 2'
+    ]
+    assert list(Ad.objects.values_list('title', flat=True)) == ['Ракетка']
+
+
+@pytest.mark.django_db
+def test_import_exported_csv(user, category, tmp_path, capsys):
+    """Проверяет импорт CSV, полученного командой export_data."""
+
+    Ad.objects.create(
+        user=user, title='Книга', description='Строка 1\nстрока 2, "цитата"',
+        category=category, condition='used',
+    )
+    path = tmp_path / 'ads.csv'
+    call_command('export_data', 'ads', '--format', 'csv', '--output', str(path))
+    Ad.objects.all().delete()
+
+    call_command('import_ads', str(path))
+    assert 'создано: 1' in capsys.readouterr().out
+    ad = Ad.objects.get()
+    assert (ad.description, ad.condition, ad.user) == (
+        'Строка 1\nстрока 2, "цитата"', 'used', user
+    )
@@ -0,0 +1,142 @@
+from io import StringIO
+
+import pytest
+from django.core.files.storage import default_storage
+from django.core.management import call_command
+from django.utils import timezone
+
+from ads.models import Ad, MediaCleanup
+
+
+def write_file(media, name):
+    """Создаёт файл в медиа-папке и возвращает его имя."""
+
+    path = media / name
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(b'image')
+    return name
+
+
+@pytest.fixture
+def ads_with_files(media, user, category):
+    """Создаёт три объявления пользователя с файлами изображений."""
+
+    return [
+        Ad.objects.create(
+            title=f'Картина {number}', description='Масло', user=user,
+            category=category, condition='new',
+            image_url=write_file(media, f'ad_images/picture_{number}.png'),
+            image_renditions={'320': {
+                'webp': write_file(
+                    media, f'ad_images/renditions/picture_{number}_320.webp'
+                ),
+            }},
+        )
+        for number in range(3)
+    ]
+
+
+@pytest.mark.django_db
+def test_files_are_deleted_after_commit(
+        media, user, ads_with_files, django_capture_on_commit_callbacks):
+    """Проверяет, что удаление пользователя только ставит файлы в очередь,
+    а сами файлы удаляются после коммита."""
+
+    with django_capture_on_commit_callbacks(execute=True):
+        user.delete()
+        assert MediaCleanup.objects.count() == 6
+        assert len(list((media / 'ad_images').rglob('*.*'))) == 6
+
+    assert not MediaCleanup.objects.exists()
+    assert not list((media / 'ad_images').rglob('*.*'))
+
+
+@pytest.mark.django_db
+def test_queue_skips_referenced_image(media, ads_with_files):
+    """Проверяет, что очередь не удаляет изображение, на которое
+    снова ссылается объявление."""
+
+    ad = ads_with_files[0]
+    MediaCleanup.objects.enqueue(ad.image_url.name)
+
+    assert MediaCleanup.objects.process() == (0, 1, 0)
+    assert (media / ad.image_url.name).exists()
+    assert not MediaCleanup.objects.exists()
+
+
+@pytest.mark.django_db
+def test_sweep_media(media, ads_with_files):
+    """Проверяет поиск осиротевших файлов с --dry-run и их удаление."""
+
+    orphans = [
+        write_file(media, 'ad_images/lost.png'),
+        write_file(media, 'ad_images/renditions/lost_320.webp'),
+    ]
+
+    out = StringIO()
+    call_command('sweep_media', '--dry-run', '--min-age=0', stdout=out)
+    assert sorted(out.getvalue().splitlines()[:2]) == sorted(orphans)
+    assert all((media / name).exists() for name in orphans)
+
+    call_command('sweep_media', '--min-age=0', stdout=StringIO())
+    assert not any((media / name).exists() for name in orphans)
+    assert len(list((media / 'ad_images').rglob('*.*'))) == 6
+
+
+class FailingStorage:
+    """Хранилище, в котором удаление файла временно не работает."""
+
+    def __init__(self, error):
+        self.error = error
+
+    def delete(self, name):
+        raise self.error
+
+
+@pytest.mark.django_db
+def test_failed_deletion_is_retried(media, ads_with_files):
+    """Проверяет, что при временной ошибке запись остаётся в очереди
+    с отложенной повторной попыткой, а отсутствующий файл удаляет её."""
+
+    name = ads_with_files[0].image_url.name
+    ads_with_files[0].delete()
+    MediaCleanup.objects.all().delete()
+    MediaCleanup.objects.enqueue(name)
+
+    denied = FailingStorage(PermissionError('EACCES'))
+    assert MediaCleanup.objects.process(storage=denied) == (0, 0, 1)
+    row = MediaCleanup.objects.get()
+    assert row.attempts == 1
+    assert row.retry_at > timezone.now()
+    assert MediaCleanup.objects.process(storage=denied) == (0, 0, 0)
+
+    MediaCleanup.objects.update(retry_at=timezone.now())
+    assert MediaCleanup.objects.process(storage=denied) == (0, 0, 1)
+    assert MediaCleanup.objects.get().attempts == 2
+
+    MediaCleanup.objects.update(retry_at=None)
+    assert MediaCleanup.objects.process(storage=default_storage) == (1, 0, 0)
+    assert not (media / name).exists()
+
+    MediaCleanup.objects.enqueue(name)
+    missing = FailingStorage(FileNotFoundError(name))
+    assert MediaCleanup.objects.process(storage=missing) == (1, 0, 0)
+    assert not MediaCleanup.objects.exists()
+
+
+@pytest.mark.django_db(transaction=True)
+def test_replaced_image_is_deleted_in_autocommit(media, ads_with_files):
+    """Проверяет, что старое изображение и его рендиции удаляются при
+    замене изображения вне transaction.atomic(), когда очередь
+    обрабатывается сразу."""
+
+    ad = ads_with_files[0]
+    old_image = ad.image_url.name
+    old_rendition = ad.image_renditions['320']['webp']
+    ad.image_url = write_file(media, 'ad_images/new_picture.png')
+    ad.save()
+
+    assert not (media / old_image).exists()
+    assert not (media / old_rendition).exists()
+    assert (media / 'ad_images/new_picture.png').exists()
+    assert not MediaCleanup.objects.exists()
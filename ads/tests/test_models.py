@@ -56,3 +56,20 @@ def test_exchange_proposal_uniqueness(user, another_user, category):
 
     with pytest.raises(Exception):
         ExchangeProposal.objects.create(ad_sender=ad1, ad_receiver=ad2)
+
+
+@pytest.mark.django_db
+def test_exchange_proposal_copies_ad_owners(user, another_user, category):
+    """Проверяет заполнение sender_user/receiver_user при создании предложения."""
+
+    ad1 = Ad.objects.create(
+        title='Гитара', description='...',
+        user=user, category=category, condition='used'
+    )
+    ad2 = Ad.objects.create(
+        title='Барабан', description='...',
+        user=another_user, category=category, condition='new'
+    )
+    proposal = ExchangeProposal.objects.create(ad_sender=ad1, ad_receiver=ad2)
+    assert proposal.sender_user == user
+    assert proposal.receiver_user == another_user
@@ -0,0 +1,78 @@
+import pytest
+
+from ads.models import Ad, SavedSearch, SavedSearchMatch
+from ads.percolator import tokenize
+from ads.search import search_ads
+
+
+def test_tokenize_normalizes_words():
+    """Проверяет нормализацию слов (регистр, ё, короткие слова)."""
+
+    assert tokenize('Зелёный Велосипед, и самокат!') == {
+        'зеленый', 'велосипед', 'самокат'
+    }
+
+
+@pytest.mark.django_db
+def test_saved_search_anchor(user, category):
+    """Проверяет выбор ключа обратного индекса."""
+
+    by_words = SavedSearch.objects.create(user=user, keywords='Красный велосипед')
+    by_category = SavedSearch.objects.create(user=user, category=category)
+    by_condition = SavedSearch.objects.create(user=user, condition='used')
+
+    assert by_words.terms == 'велосипед красный'
+    assert by_words.anchor == 'велосипед'
+    assert by_category.anchor == f'cat:{category.id}'
+    assert by_condition.anchor == 'cond:used'
+
+
+@pytest.mark.django_db
+def test_percolate_uses_constant_queries(
+        user, another_user, category, django_assert_num_queries):
+    """Проверяет, что сопоставление — один запрос к индексу и одна
+    вставка при любом числе сохранённых поисков."""
+
+    SavedSearch.objects.bulk_create([
+        SavedSearch(user=user, keywords=f'слово{number}', anchor=f'слово{number}',
+                    terms=f'слово{number}')
+        for number in range(200)
+    ])
+    wanted = SavedSearch.objects.create(
+        user=user, category=category, condition='new', keywords='старый велосипед'
+    )
+    SavedSearch.objects.create(user=user, keywords='велосипед самокат')
+    ad = Ad.objects.create(
+        title='Велосипед', description='Старый, но надёжный',
+        user=another_user, category=category, condition='new'
+    )
+
+    with django_assert_num_queries(2):
+        assert SavedSearch.objects.percolate([ad]) == 1
+    assert SavedSearchMatch.objects.get().saved_search == wanted
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('keywords', [
+    'велосипед', 'велос', 'книги', 'горный велосипед', 'самокат',
+])
+def test_percolate_agrees_with_search(user, another_user, category, keywords):
+    """Проверяет, что сохранённый поиск срабатывает ровно на те
+    объявления, которые находит поиск /api/ads/?search=."""
+
+    search = SavedSearch.objects.create(user=user, keywords=keywords)
+    ads = [
+        Ad.objects.create(
+            title=title, description='...', user=another_user,
+            category=category, condition='new'
+        )
+        for title in ('Велосипед горный', 'Книга', 'Книги детские')
+    ]
+    SavedSearchMatch.objects.all().delete()
+
+    SavedSearch.objects.percolate(ads)
+    matched = set(SavedSearchMatch.objects.filter(
+        saved_search=search
+    ).values_list('ad_id', flat=True))
+    found = set(search_ads(Ad.objects.all(), keywords).values_list('id', flat=True))
+    assert matched == found
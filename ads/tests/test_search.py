@@ -0,0 +1,130 @@
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.db.migrations.executor import MigrationExecutor
+
+from ads.models import Ad
+from ads.search import search_ads
+
+
+@pytest.fixture
+def ads(user, category):
+    """Создаёт объявления для проверки поиска."""
+
+    return [
+        Ad.objects.create(
+            title='Велосипед горный', description='Почти не ездил',
+            user=user, category=category, condition='used'
+        ),
+        Ad.objects.create(
+            title='Шлем', description='Подойдёт для велосипед прогулок',
+            user=user, category=category, condition='new'
+        ),
+        Ad.objects.create(
+            title='Книга', description='Роман',
+            user=user, category=category, condition='new'
+        ),
+    ]
+
+
+@pytest.mark.django_db
+def test_search_ranks_title_above_description(ads):
+    """Проверяет, что совпадение в заголовке релевантнее совпадения в описании."""
+
+    found = list(search_ads(Ad.objects.all(), 'велосипед'))
+    assert [ad.title for ad in found] == ['Велосипед горный', 'Шлем']
+
+
+@pytest.mark.django_db
+def test_search_index_follows_updates_and_deletes(ads):
+    """Проверяет, что поисковый индекс обновляется при изменении и удалении."""
+
+    bike, _, book = ads
+    book.title = 'Самокат'
+    book.save()
+    bike.delete()
+
+    assert list(search_ads(Ad.objects.all(), 'самокат')) == [book]
+    assert not search_ads(Ad.objects.all(), 'горный').exists()
+
+
+@pytest.mark.django_db
+def test_search_view(api_client, ads):
+    """Проверяет полнотекстовый поиск через параметр search в API."""
+
+    response = api_client.get('/api/ads/', {'search': 'велос'})
+    assert response.status_code == 200
+    assert [ad['title'] for ad in response.data['results']] == [
+        'Велосипед горный', 'Шлем'
+    ]
+
+
+def _search_objects():
+    with connection.cursor() as cursor:
+        if connection.vendor == 'postgresql':
+            cursor.execute(
+                "SELECT tgname FROM pg_trigger WHERE tgname LIKE 'ads_ad_%%'"
+            )
+        else:
+            cursor.execute(
+                "SELECT name FROM sqlite_master WHERE name LIKE 'ads_ad_fts%%'"
+                " AND type IN ('table', 'trigger')"
+            )
+        return {row[0] for row in cursor.fetchall()}
+
+
+@pytest.mark.django_db(transaction=True)
+def test_search_schema_migration_is_reversible():
+    """Проверяет, что объекты поиска создаются миграцией, видны
+    в sqlmigrate и удаляются при откате."""
+
+    output = StringIO()
+    call_command('sqlmigrate', 'ads', '0016', stdout=output)
+    assert 'ads_ad_' in output.getvalue()
+    assert _search_objects()
+
+    executor = MigrationExecutor(connection)
+    latest = executor.loader.graph.leaf_nodes('ads')
+    executor.migrate([('ads', '0015_ad_facet_counts')])
+    assert not _search_objects()
+
+    executor = MigrationExecutor(connection)
+    executor.migrate(latest)
+    assert _search_objects()
+
+
+@pytest.mark.django_db
+def test_search_cursor_pagination(api_client, ads, user, category):
+    """Проверяет обход результатов поиска курсором: порядок по
+    релевантности как у limit/offset, без пропусков и повторов
+    среди объявлений с одинаковым rank, и возврат по previous."""
+
+    for number in range(4):
+        Ad.objects.create(
+            title=f'Велосипед {number}', description='...',
+            user=user, category=category, condition='used'
+        )
+    expected = [
+        ad['id'] for ad in
+        api_client.get(
+            '/api/ads/', {'search': 'велос', 'limit': 10}
+        ).data['results']
+    ]
+    assert len(expected) == 6
+
+    pages = []
+    response = api_client.get(
+        '/api/ads/', {'search': 'велос', 'cursor': '', 'limit': 2}
+    )
+    while True:
+        assert response.status_code == 200
+        pages.append([ad['id'] for ad in response.data['results']])
+        if not response.data['next']:
+            break
+        response = api_client.get(response.data['next'])
+    assert sum(pages, []) == expected
+
+    previous = api_client.get(response.data['previous'])
+    assert [ad['id'] for ad in previous.data['results']] == pages[-2]
@@ -0,0 +1,174 @@
+import threading
+import time
+from collections import OrderedDict
+from uuid import uuid4
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from rest_framework.authentication import TokenAuthentication
+from rest_framework.authtoken.models import Token
+
+from api.metrics import metrics
+from api.perf import phase
+from users.models import User
+
+TOKEN_VERSION_KEY = 'auth:token:{}:version'
+
+
+class TokenCache:
+    """Потокобезопасный LRU-кэш токен → токен с пользователем
+    с ограничением размера и временем жизни записи.
+
+    Вместе с записью хранится штамп версии токена из кэша Django
+    (общего для воркеров, как у CategoryCache). Выход, изменение
+    токена или пользователя в любом воркере меняют штамп, и запись
+    с устаревшим штампом не возвращается. Штамп живёт ttl секунд:
+    пропавший штамп создаётся заново и тоже не совпадает с записью."""
+
+    def __init__(self, max_size, ttl, timer=time.monotonic):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.timer = timer
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._keys_by_user = {}
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+        if entry is not None and entry[2] != self.get_version(key):
+            entry = None
+        with self._lock:
+            if entry is None or entry[1] <= self.timer():
+                self._pop(key)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def set(self, key, token, version):
+        """Кэширует токен; version — штамп, прочитанный get_version()
+        до загрузки токена из БД."""
+
+        with self._lock:
+            self._pop(key)
+            self._entries[key] = (token, self.timer() + self.ttl, version)
+            self._keys_by_user.setdefault(token.user_id, set()).add(key)
+            while len(self._entries) > self.max_size:
+                self._pop(next(iter(self._entries)))
+
+    def get_version(self, key):
+        cache_key = TOKEN_VERSION_KEY.format(key)
+        version = cache.get(cache_key)
+        if version is None:
+            cache.add(cache_key, uuid4().hex, self.ttl)
+            version = cache.get(cache_key)
+        return version
+
+    def bump_version(self, key):
+        cache.set(TOKEN_VERSION_KEY.format(key), uuid4().hex, self.ttl)
+
+    def invalidate(self, key):
+        with self._lock:
+            self._pop(key)
+
+    def invalidate_user(self, user_id):
+        with self._lock:
+            for key in list(self._keys_by_user.get(user_id, ())):
+                self._pop(key)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._keys_by_user.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self):
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'size': len(self._entries),
+            }
+
+    def _pop(self, key):
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        user_id = entry[0].user_id
+        keys = self._keys_by_user.get(user_id)
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._keys_by_user[user_id]
+
+
+token_cache = TokenCache(
+    max_size=settings.TOKEN_CACHE_MAX_SIZE,
+    ttl=settings.TOKEN_CACHE_TTL,
+)
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+    """TokenAuthentication с кэшированием токена и пользователя в памяти
+    процесса. Запись удаляется сразу при удалении/изменении токена
+    или пользователя в этом процессе, остальные воркеры отбрасывают её
+    по штампу версии токена при следующем обращении. Попадания, промахи
+    и размер кэша публикуются в /metrics (auth_token_cache_*)."""
+
+    def authenticate(self, request):
+        with phase('auth'):
+            return super().authenticate(request)
+
+    def authenticate_credentials(self, key):
+        try:
+            token = token_cache.get(key)
+            if token is not None and token.user.is_active:
+                return (token.user, token)
+
+            version = token_cache.get_version(key)
+            user, token = super().authenticate_credentials(key)
+            token_cache.set(key, token, version)
+            return (user, token)
+        finally:
+            if settings.METRICS_ENABLED:
+                metrics.observe_token_cache(token_cache.stats())
+
+
+def revoke_cached_token(key):
+    """Сбрасывает токен в кэше этого процесса и меняет его штамп
+    версии для остальных воркеров — сразу и ещё раз после коммита:
+    иначе параллельный запрос мог бы закэшировать данные до коммита
+    под новым штампом."""
+
+    token_cache.invalidate(key)
+    token_cache.bump_version(key)
+    transaction.on_commit(lambda: token_cache.bump_version(key))
+
+
+@receiver(post_save, sender=Token)
+@receiver(post_delete, sender=Token)
+def invalidate_cached_token(sender, instance, **kwargs):
+    """Удаляет токен из кэша при его изменении или удалении (выход)."""
+
+    revoke_cached_token(instance.key)
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidate_cached_user_tokens(sender, instance, **kwargs):
+    """Удаляет токены пользователя из кэша при его изменении,
+    деактивации или удалении."""
+
+    token_cache.invalidate_user(instance.pk)
+    for key in Token.objects.filter(user_id=instance.pk).values_list(
+        'key', flat=True
+    ):
+        revoke_cached_token(key)
@@ -0,0 +1,148 @@
+import hashlib
+import time
+from uuid import uuid4
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from ads.cache import category_cache
+from ads.models import Ad
+
+ALL_CATEGORIES = 'all'
+
+
+class ListingCache:
+    """Кэш ответов списка объявлений для анонимных запросов.
+
+    Ключ строится из нормализованной строки запроса и поколения
+    категории: изменение объявления меняет поколение его категории
+    и поколение ALL_CATEGORIES (списки без фильтра по категории),
+    остальные записи остаются валидными.
+    Защита от «стампиды»: устаревшую запись перестраивает только
+    воркер, взявший блокировку, остальные отдают устаревшую запись
+    или ждут новую."""
+
+    key_prefix = 'ads:listing'
+    query_params = (
+        'category', 'condition', 'search', 'ordering',
+        'cursor', 'limit', 'offset', 'facets',
+    )
+
+    def __init__(self, ttl, stale_ttl, lock_timeout, poll_interval=0.05):
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.lock_timeout = lock_timeout
+        self.poll_interval = poll_interval
+
+    def generation_key(self, category_id):
+        return f'{self.key_prefix}:generation:{category_id}'
+
+    def get_generation(self, category_id):
+        key = self.generation_key(category_id)
+        generation = cache.get(key)
+        if generation is None:
+            cache.add(key, uuid4().hex, None)
+            generation = cache.get(key)
+        return generation
+
+    def invalidate(self, *category_ids):
+        cache.set_many(
+            {
+                self.generation_key(category_id): uuid4().hex
+                for category_id in {*category_ids, ALL_CATEGORIES}
+            },
+            None,
+        )
+
+    def make_key(self, request):
+        """Ключ из хоста (ссылки пагинации абсолютные), известных
+        параметров запроса и поколения категории. Счётчики facets
+        зависят от всех категорий, поэтому для них берётся поколение
+        ALL_CATEGORIES."""
+
+        query_params = request.query_params
+        params = sorted(
+            (name, value)
+            for name in self.query_params
+            for value in query_params.getlist(name)
+        )
+        category_id = ALL_CATEGORIES
+        title = query_params.get('category')
+        if title and 'facets' not in query_params:
+            category = category_cache.get_by_title(title)
+            category_id = category.id if category else ALL_CATEGORIES
+        digest = hashlib.md5(
+            repr((
+                request.build_absolute_uri('/'),
+                params,
+                self.get_generation(category_id),
+                category_cache.version,
+            )).encode(),
+            usedforsecurity=False,
+        ).hexdigest()
+        return f'{self.key_prefix}:{digest}'
+
+    def get_or_build(self, key, build):
+        """Возвращает запись (словарь) из кэша или строит её через build()."""
+
+        entry = cache.get(key)
+        if entry is not None and entry['fresh_until'] > time.time():
+            return entry
+
+        lock_key = f'{key}:lock'
+        if cache.add(lock_key, 1, self.lock_timeout):
+            try:
+                return self._build_and_store(key, build)
+            finally:
+                cache.delete(lock_key)
+
+        if entry is not None:
+            return entry
+
+        deadline = time.time() + self.lock_timeout
+        while time.time() < deadline:
+            time.sleep(self.poll_interval)
+            entry = cache.get(key)
+            if entry is not None:
+                return entry
+        return build()
+
+    def _build_and_store(self, key, build):
+        entry = build()
+        entry['fresh_until'] = time.time() + self.ttl
+        cache.set(key, entry, self.ttl + self.stale_ttl)
+        return entry
+
+
+listing_cache = ListingCache(
+    ttl=settings.ADS_LISTING_CACHE_TTL,
+    stale_ttl=settings.ADS_LISTING_CACHE_STALE_TTL,
+    lock_timeout=settings.ADS_LISTING_CACHE_LOCK_TIMEOUT,
+)
+
+
+def invalidate_listing(*category_ids):
+    """Сбрасывает списки по категориям сразу и ещё раз после коммита."""
+
+    listing_cache.invalidate(*category_ids)
+    transaction.on_commit(lambda: listing_cache.invalidate(*category_ids))
+
+
+@receiver(post_save, sender=Ad)
+def invalidate_listing_on_save(sender, instance, **kwargs):
+    """Сбрасывает кэш списков старой и новой категории объявления."""
+
+    invalidate_listing(
+        instance.category_id,
+        instance.get_loaded_value('category_id', instance.category_id),
+    )
+
+
+@receiver(post_delete, sender=Ad)
+def invalidate_listing_on_delete(sender, instance, **kwargs):
+    """Сбрасывает кэш списков категории удалённого объявления."""
+
+    invalidate_listing(instance.category_id)
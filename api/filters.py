@@ -1,7 +1,11 @@
 import django_filters
 from django.utils.functional import lazy
+from rest_framework.exceptions import ValidationError
+from rest_framework.filters import BaseFilterBackend, SearchFilter
 
-from ads.models import Ad, Category, ExchangeProposal
+from ads.cache import category_cache
+from ads.models import Ad, ExchangeProposal
+from ads.search import search_ads
 from users.models import User
 from ads import choices as chcs
 
@@ -11,8 +15,7 @@ def generate_ads_categories_label():
     для AdFilter (отложенный вызов через lazy)."""
 
     try:
-        categories = Category.objects.all()
-        titles = [category.title for category in categories]
+        titles = category_cache.titles()
         return (
             "Для фильтрации по категории выберите один из доступных заголовков"
             "и вставьте его в поле 'category'.<br>"
@@ -22,14 +25,20 @@ def generate_ads_categories_label():
         return "Чтобы выполнить фильтрацию по категории, выберите один из доступных заголовков."
 
 
+def category_title_choices():
+    """Варианты фильтра по категории из кэша категорий."""
+
+    return [(title, title) for title in category_cache.titles()]
+
+
 class AdFilter(django_filters.FilterSet):
     """Кастомный фильтр для модели Ad.
     Фильтрация по полям category и condition."""
 
-    category = django_filters.ModelChoiceFilter(
-        field_name='category__title',
-        to_field_name='title',
-        queryset=Category.objects.all(),
+    category = django_filters.ChoiceFilter(
+        field_name='category',
+        choices=category_title_choices,
+        method='filter_category',
         label=lazy(generate_ads_categories_label, str)()
     )
     condition = django_filters.ChoiceFilter(
@@ -44,18 +53,38 @@ class AdFilter(django_filters.FilterSet):
             'condition',
             ]
 
+    def filter_category(self, queryset, name, value):
+        category = category_cache.get_by_title(value)
+        if category is None:
+            return queryset.none()
+        return queryset.filter(category_id=category.id)
+
+
+class AdSearchFilter(SearchFilter):
+    """Полнотекстовый поиск по заголовку и описанию объявления
+    с сортировкой по релевантности. Курсорная пагинация результатов
+    ведётся по ключу (rank, id)."""
+
+    search_description = 'Поиск по заголовку и описанию объявления.'
+
+    def filter_queryset(self, request, queryset, view):
+        terms = self.get_search_terms(request)
+        if not terms:
+            return queryset
+        return search_ads(queryset, ' '.join(terms))
+
 
 class ExchangeProposalFilter(django_filters.FilterSet):
     """Кастомный фильтр для модели ExchangeProposal.
     Фильтрация по отправителю, получателю и полю status."""
 
     sender_user = django_filters.ModelChoiceFilter(
-        field_name='ad_sender__user',
+        field_name='sender_user',
         queryset=User.objects.all(),
         label='Пользователь, отправивший предложение'
     )
     receiver_user = django_filters.ModelChoiceFilter(
-        field_name='ad_receiver__user',
+        field_name='receiver_user',
         queryset=User.objects.all(),
         label='Пользователь, получивший предложение'
     )
@@ -71,3 +100,50 @@ class ExchangeProposalFilter(django_filters.FilterSet):
             'receiver_user',
             'status',
             ]
+
+
+class ChoiceOrderingFilter(BaseFilterBackend):
+    """Сортировка по именованным вариантам из view.ordering_choices,
+    например ?ordering=newest. Каждый вариант заканчивается уникальным
+    полем (id), поэтому порядок детерминирован, а для каждого варианта
+    в модели есть соответствующий индекс.
+    Без параметра сохраняется сортировка по релевантности поиска
+    (она же ключ курсорной пагинации), иначе применяется
+    view.default_ordering."""
+
+    ordering_param = 'ordering'
+
+    def get_ordering(self, request, queryset, view):
+        choices = view.ordering_choices
+        value = request.query_params.get(self.ordering_param)
+        if not value:
+            if queryset.query.order_by:
+                return tuple(queryset.query.order_by)
+            return choices[view.default_ordering]
+        if value not in choices:
+            raise ValidationError({
+                self.ordering_param: (
+                    f'Недопустимое значение. Доступны: {", ".join(choices)}.'
+                )
+            })
+        return choices[value]
+
+    def filter_queryset(self, request, queryset, view):
+        return queryset.order_by(*self.get_ordering(request, queryset, view))
+
+    def get_schema_operation_parameters(self, view):
+        return [
+            {
+                'name': self.ordering_param,
+                'required': False,
+                'in': 'query',
+                'description': (
+                    'Сортировка (по умолчанию '
+                    f'{view.default_ordering}).'
+                ),
+                'schema': {
+                    'type': 'string',
+                    'enum': list(view.ordering_choices),
+                },
+            },
+        ]
@@ -0,0 +1,293 @@
+"""Метрики запросов в текстовом формате Prometheus (/metrics).
+
+Каждый процесс (воркер gunicorn) пишет значения в свой файл
+METRICS_DIR/metrics_<pid>.db, отображённый в память (mmap): увеличение
+счётчика — запись восьми байт без системных вызовов. Эндпоинт /metrics
+читает файлы всех процессов и суммирует значения, поэтому ответ любого
+воркера содержит метрики всего сервиса. Файлы завершившихся воркеров
+не удаляются: их счётчики остаются в сумме. Каталог очищается при
+запуске контейнера (entrypoint.sh).
+
+Значения gauge (размер кэша токенов) берутся только из файлов
+работающих процессов.
+
+Метки view вида AdViewSet.list берутся из resolver_match (api.perf.view_label),
+поэтому новые вьюсеты попадают в метрики без дополнительного кода.
+"""
+import json
+import mmap
+import os
+import struct
+import threading
+import time
+from collections import defaultdict
+from pathlib import Path
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.http import HttpResponse
+
+from api.perf import AsyncCapableMiddleware, view_label
+from config import constants
+
+METRICS = {
+    'http_requests_total': (
+        'counter', 'Число обработанных запросов.'),
+    'http_request_errors_total': (
+        'counter', 'Число ответов 5xx и необработанных исключений.'),
+    'http_request_duration_seconds': (
+        'histogram', 'Время обработки запроса.'),
+    'http_request_db_queries_total': (
+        'counter', 'Число SQL-запросов при обработке запросов.'),
+    'http_request_db_duration_seconds_total': (
+        'counter', 'Суммарное время SQL-запросов.'),
+    'auth_token_cache_hits_total': (
+        'counter', 'Аутентификации по токену из кэша процесса.'),
+    'auth_token_cache_misses_total': (
+        'counter', 'Аутентификации по токену с загрузкой из БД.'),
+    'auth_token_cache_entries': (
+        'gauge', 'Число токенов в кэшах работающих воркеров.'),
+}
+
+_HEADER = struct.Struct('<i')
+_LENGTH = struct.Struct('<i')
+_VALUE = struct.Struct('<d')
+
+
+class MmapStore:
+    """Словарь «ключ → float» процесса в файле, отображённом в память.
+
+    Формат: 4 байта — занятая длина, далее записи
+    [длина ключа][ключ, выровненный до 8 байт][double]. Запись
+    дописывается целиком до обновления занятой длины, поэтому читатель
+    видит только законченные записи."""
+
+    initial_size = 64 * 1024
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._file = open(self.path, 'a+b')
+        if os.fstat(self._file.fileno()).st_size < self.initial_size:
+            self._file.truncate(self.initial_size)
+        self._map = mmap.mmap(self._file.fileno(), 0)
+        self._used = _HEADER.unpack_from(self._map, 0)[0] or 8
+        self._positions = {
+            key: position for key, position, _ in self._entries(self._map, self._used)
+        }
+
+    @staticmethod
+    def _entries(data, used):
+        position = 8
+        while position < used:
+            length = _LENGTH.unpack_from(data, position)[0]
+            key_start = position + _LENGTH.size
+            value_position = key_start + length + (-(_LENGTH.size + length) % 8)
+            key = bytes(data[key_start:key_start + length]).decode()
+            yield key, value_position, _VALUE.unpack_from(data, value_position)[0]
+            position = value_position + _VALUE.size
+
+    def _add_key(self, key):
+        encoded = key.encode()
+        padding = -(_LENGTH.size + len(encoded)) % 8
+        entry = _LENGTH.pack(len(encoded)) + encoded + b'\0' * padding
+        size = len(entry) + _VALUE.size
+        if self._used + size > len(self._map):
+            new_size = len(self._map)
+            while self._used + size > new_size:
+                new_size *= 2
+            self._map.close()
+            self._file.truncate(new_size)
+            self._map = mmap.mmap(self._file.fileno(), 0)
+        self._map[self._used:self._used + len(entry)] = entry
+        position = self._used + len(entry)
+        _VALUE.pack_into(self._map, position, 0.0)
+        self._used += size
+        _HEADER.pack_into(self._map, 0, self._used)
+        self._positions[key] = position
+        return position
+
+    def inc(self, key, amount=1.0):
+        position = self._positions.get(key)
+        if position is None:
+            position = self._add_key(key)
+        value = _VALUE.unpack_from(self._map, position)[0]
+        _VALUE.pack_into(self._map, position, value + amount)
+
+    def set(self, key, value):
+        position = self._positions.get(key)
+        if position is None:
+            position = self._add_key(key)
+        _VALUE.pack_into(self._map, position, value)
+
+    @classmethod
+    def read(cls, path):
+        data = Path(path).read_bytes()
+        if len(data) < 8:
+            return []
+        return [
+            (key, value)
+            for key, _, value in cls._entries(data, _HEADER.unpack_from(data, 0)[0])
+        ]
+
+
+class Metrics:
+    """Метрики процесса; файл хранилища создаётся заново после fork."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._store = None
+        self._pid = None
+
+    @property
+    def directory(self):
+        return Path(settings.METRICS_DIR)
+
+    def _get_store(self):
+        if self._pid != os.getpid() or self._store is None:
+            self._store = MmapStore(self.directory / f'metrics_{os.getpid()}.db')
+            self._pid = os.getpid()
+        return self._store
+
+    def reset(self):
+        with self._lock:
+            self._store = None
+            self._pid = None
+
+    @staticmethod
+    def key(name, **labels):
+        return json.dumps([name, sorted(labels.items())], ensure_ascii=False)
+
+    def observe_request(self, view, method, status, duration, queries, db_time):
+        buckets = constants.METRICS_LATENCY_BUCKETS
+        bucket = next(
+            (str(bound) for bound in buckets if duration <= bound), '+Inf'
+        )
+        with self._lock:
+            store = self._get_store()
+            store.inc(self.key(
+                'http_requests_total', view=view, method=method, status=str(status)
+            ))
+            if status >= 500:
+                store.inc(self.key('http_request_errors_total', view=view))
+            store.inc(self.key(
+                'http_request_duration_seconds_bucket', view=view, le=bucket
+            ))
+            store.inc(self.key('http_request_duration_seconds_sum', view=view), duration)
+            store.inc(self.key('http_request_duration_seconds_count', view=view))
+            store.inc(self.key('http_request_db_queries_total', view=view), queries)
+            store.inc(self.key(
+                'http_request_db_duration_seconds_total', view=view
+            ), db_time)
+
+    def observe_token_cache(self, stats):
+        """Снимок TokenCache.stats() процесса."""
+
+        with self._lock:
+            store = self._get_store()
+            store.set(self.key('auth_token_cache_hits_total'), stats['hits'])
+            store.set(self.key('auth_token_cache_misses_total'), stats['misses'])
+            store.set(self.key('auth_token_cache_entries'), stats['size'])
+
+    def collect(self):
+        """Сумма значений по файлам всех процессов: {ключ: значение}.
+        Gauge завершившихся процессов не учитываются."""
+
+        gauges = {name for name, (kind, _) in METRICS.items() if kind == 'gauge'}
+        totals = defaultdict(float)
+        for path in self.directory.glob('metrics_*.db'):
+            alive = _process_alive(path)
+            for key, value in MmapStore.read(path):
+                if not alive and json.loads(key)[0] in gauges:
+                    continue
+                totals[key] += value
+        return totals
+
+    def render(self):
+        """Текстовый формат Prometheus; бакеты гистограмм накопительные."""
+
+        samples = defaultdict(list)
+        for key, value in self.collect().items():
+            name, labels = json.loads(key)
+            samples[name].append((dict(labels), value))
+
+        bounds = [str(bound) for bound in constants.METRICS_LATENCY_BUCKETS]
+        lines = []
+        for name, (kind, help_text) in METRICS.items():
+            lines.append(f'# HELP {name} {help_text}')
+            lines.append(f'# TYPE {name} {kind}')
+            if kind != 'histogram':
+                for labels, value in sorted(samples[name], key=_sort_key):
+                    lines.append(_sample(name, labels, value))
+                continue
+            per_view = defaultdict(dict)
+            for labels, value in samples[f'{name}_bucket']:
+                per_view[labels['view']][labels['le']] = value
+            for view in sorted(per_view):
+                cumulative = 0.0
+                for bound in [*bounds, '+Inf']:
+                    cumulative += per_view[view].get(bound, 0.0)
+                    lines.append(_sample(
+                        f'{name}_bucket', {'view': view, 'le': bound}, cumulative
+                    ))
+            for suffix in ('_sum', '_count'):
+                for labels, value in sorted(samples[name + suffix], key=_sort_key):
+                    lines.append(_sample(name + suffix, labels, value))
+        return '\n'.join(lines) + '\n'
+
+
+def _process_alive(path):
+    try:
+        os.kill(int(path.stem.rpartition('_')[2]), 0)
+    except ProcessLookupError:
+        return False
+    except (PermissionError, ValueError):
+        pass
+    return True
+
+
+def _sort_key(sample):
+    return sorted(sample[0].items())
+
+
+def _escape(value):
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _sample(name, labels, value):
+    rendered = ','.join(
+        f'{label}="{_escape(str(text))}"' for label, text in sorted(labels.items())
+    )
+    number = int(value) if float(value).is_integer() else value
+    return f'{name}{{{rendered}}} {number}' if rendered else f'{name} {number}'
+
+
+metrics = Metrics()
+
+
+class MetricsMiddleware(AsyncCapableMiddleware):
+    """Учитывает каждый запрос в метриках (METRICS_ENABLED)."""
+
+    def __init__(self, get_response):
+        if not settings.METRICS_ENABLED:
+            raise MiddlewareNotUsed
+        super().__init__(get_response)
+
+    def process_timings(self, request, response, timings):
+        metrics.observe_request(
+            view=view_label(request) or 'unmatched',
+            method=request.method,
+            status=response.status_code,
+            duration=time.perf_counter() - timings.started,
+            queries=timings.queries,
+            db_time=timings.sql_time,
+        )
+        return response
+
+
+def metrics_view(request):
+    """Метрики всех процессов сервиса в формате Prometheus."""
+
+    return HttpResponse(
+        metrics.render(), content_type='text/plain; version=0.0.4; charset=utf-8'
+    )
@@ -0,0 +1,226 @@
+import hashlib
+
+from django.http import StreamingHttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+from rest_framework import status
+from rest_framework.response import Response
+
+from ads.export import CONTENT_TYPES, export_chunks
+from api.perf import serialize, validate
+from api.serializers import ExportQuerySerializer
+
+CONDITIONAL_HEADERS = ('HTTP_IF_NONE_MATCH', 'HTTP_IF_MODIFIED_SINCE')
+
+
+def make_etag(*parts):
+    """Строит сильный ETag из значений, определяющих представление."""
+
+    value = '|'.join(str(part) for part in parts)
+    return '"{}"'.format(hashlib.md5(value.encode(), usedforsecurity=False).hexdigest())
+
+
+class TimedSerializationMixin:
+    """Стандартные действия вьюсета с замером фаз validate и serialize
+    (Server-Timing, api.perf): время меряется вокруг is_valid() и .data
+    во вьюхе, сами сериализаторы не меняются."""
+
+    def list(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            return self.get_paginated_response(
+                serialize(self.get_serializer(page, many=True))
+            )
+        return Response(serialize(self.get_serializer(queryset, many=True)))
+
+    def retrieve(self, request, *args, **kwargs):
+        return Response(serialize(self.get_serializer(self.get_object())))
+
+    def create(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.data)
+        validate(serializer)
+        self.perform_create(serializer)
+        data = serialize(serializer)
+        return Response(
+            data,
+            status=status.HTTP_201_CREATED,
+            headers=self.get_success_headers(data),
+        )
+
+    def update(self, request, *args, **kwargs):
+        partial = kwargs.pop('partial', False)
+        instance = self.get_object()
+        serializer = self.get_serializer(
+            instance, data=request.data, partial=partial
+        )
+        validate(serializer)
+        self.perform_update(serializer)
+        if getattr(instance, '_prefetched_objects_cache', None):
+            instance._prefetched_objects_cache = {}
+        return Response(serialize(serializer))
+
+
+class ConditionalGetMixin:
+    """Условные GET-запросы (ETag / Last-Modified / 304) для list и retrieve.
+
+    Валидаторы строятся из версий объектов (get_instance_version) на
+    текущей странице: ETag — из всех версий, Last-Modified — из самой
+    поздней даты в них. Удаление объекта не сдвигает Last-Modified,
+    поэтому при If-None-Match решает ETag (он учитывает count и ссылки).
+    Для условного запроса страница выбирается узким запросом
+    (get_validator_queryset) без сериализации; если ответ всё же нужен,
+    полные объекты той же страницы дочитываются по id, без повторной
+    пагинации. Для обычного запроса валидаторы считаются по уже
+    выбранным объектам без лишних запросов."""
+
+    def get_validator_queryset(self, queryset):
+        """Сужает выборку до полей, нужных get_instance_version."""
+
+        return queryset
+
+    def get_instance_version(self, instance):
+        """Значения, меняющиеся вместе с представлением объекта.
+        Даты из них используются для Last-Modified."""
+
+        return (instance.pk,)
+
+    def get_etag_extra(self):
+        """Общие для всех объектов части ETag (например, версии кэшей)."""
+
+        return ()
+
+    @staticmethod
+    def is_conditional(request):
+        return any(header in request.META for header in CONDITIONAL_HEADERS)
+
+    def get_validator_object(self):
+        """Объект из узкой выборки для условного retrieve или None."""
+
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        return self.get_validator_queryset(self.get_queryset()).filter(
+            **{self.lookup_field: self.kwargs[lookup_url_kwarg]}
+        ).first()
+
+    def get_list_etag(self, objects, paginated):
+        parts = [self.get_etag_extra()]
+        parts.extend(self.get_instance_version(obj) for obj in objects)
+        if paginated:
+            parts.append((
+                getattr(self.paginator, 'count', None),
+                self.paginator.get_next_link(),
+                self.paginator.get_previous_link(),
+            ))
+        return make_etag(*parts)
+
+    def get_last_modified(self, objects):
+        """Самая поздняя дата из версий объектов (для Last-Modified)."""
+
+        dates = [
+            part
+            for obj in objects
+            for part in self.get_instance_version(obj)
+            if hasattr(part, 'timestamp')
+        ]
+        return int(max(dates).timestamp()) if dates else None
+
+    def get_object_validators(self, instance):
+        version = self.get_instance_version(instance)
+        return (
+            make_etag(self.get_etag_extra(), version),
+            self.get_last_modified([instance]),
+        )
+
+    def list(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+        if not self.is_conditional(request):
+            return self.render_list(queryset)
+
+        narrow = self.get_validator_queryset(queryset)
+        page = self.paginate_queryset(narrow)
+        paginated = page is not None
+        objects = page if paginated else list(narrow)
+        etag = self.get_list_etag(objects, paginated)
+        last_modified = self.get_last_modified(objects)
+        response = get_conditional_response(
+            request, etag=etag, last_modified=last_modified
+        )
+        if response is not None:
+            return self.set_validators(response, etag, last_modified)
+
+        if narrow is not queryset:
+            found = queryset.in_bulk([obj.pk for obj in objects])
+            objects = [found[obj.pk] for obj in objects if obj.pk in found]
+        return self.render_page(objects, paginated)
+
+    def render_list(self, queryset):
+        """Выбирает страницу списка и сериализует её."""
+
+        page = self.paginate_queryset(queryset)
+        if page is None:
+            return self.render_page(list(queryset), paginated=False)
+        return self.render_page(page, paginated=True)
+
+    def render_page(self, objects, paginated):
+        """Сериализует выбранные объекты и добавляет ETag и Last-Modified."""
+
+        data = serialize(self.get_serializer(objects, many=True))
+        if paginated:
+            response = self.get_paginated_response(data)
+        else:
+            response = Response(data)
+        return self.set_validators(
+            response,
+            self.get_list_etag(objects, paginated),
+            self.get_last_modified(objects),
+        )
+
+    def retrieve(self, request, *args, **kwargs):
+        if self.is_conditional(request):
+            narrow = self.get_validator_object()
+            if narrow is not None:
+                etag, last_modified = self.get_object_validators(narrow)
+                response = get_conditional_response(
+                    request, etag=etag, last_modified=last_modified
+                )
+                if response is not None:
+                    return self.set_validators(response, etag, last_modified)
+
+        instance = self.get_object()
+        etag, last_modified = self.get_object_validators(instance)
+        response = Response(serialize(self.get_serializer(instance)))
+        return self.set_validators(response, etag, last_modified)
+
+    @staticmethod
+    def set_validators(response, etag, last_modified=None):
+        response['ETag'] = etag
+        if last_modified is not None:
+            response['Last-Modified'] = http_date(last_modified)
+        return response
+
+
+class StreamingExportMixin:
+    """Потоковая выгрузка отфильтрованного списка в NDJSON или CSV.
+
+    Применяются те же фильтры и сортировка, что и у списка; строки
+    читаются итератором и отдаются порциями по мере чтения."""
+
+    export_fields = None
+    export_name = None
+
+    def stream_export(self, request):
+        query = ExportQuerySerializer(data=request.query_params)
+        query.is_valid(raise_exception=True)
+        file_format = query.validated_data['output']
+        response = StreamingHttpResponse(
+            export_chunks(
+                self.filter_queryset(self.get_queryset()),
+                self.export_fields,
+                file_format,
+            ),
+            content_type=CONTENT_TYPES[file_format],
+        )
+        response['Content-Disposition'] = (
+            f'attachment; filename="{self.export_name}.{file_format}"'
+        )
+        return response
@@ -0,0 +1,216 @@
+import operator
+from base64 import b64decode, b64encode
+from functools import reduce
+from urllib import parse
+
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import LimitOffsetPagination, _positive_int
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+from config import constants
+
+
+class KeysetPagination:
+    """Курсорная (keyset) пагинация по составному ключу ordering.
+    Последнее поле ключа должно быть уникальным (id), поэтому страницы
+    не пропускают и не повторяют записи. Не выполняет OFFSET и COUNT(*)."""
+
+    cursor_query_param = 'cursor'
+    limit_query_param = 'limit'
+    ordering = ('-created_at', '-id')
+    invalid_cursor_message = 'Неверный курсор'
+
+    def __init__(self, default_limit, max_limit=constants.MAX_PAGE_SIZE):
+        self.default_limit = default_limit
+        self.max_limit = max_limit
+
+    def get_limit(self, request):
+        try:
+            return _positive_int(
+                request.query_params[self.limit_query_param],
+                strict=True,
+                cutoff=self.max_limit
+            )
+        except (KeyError, ValueError):
+            return self.default_limit
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.limit = self.get_limit(request)
+        self.ordering = self.get_ordering(request, queryset, view)
+        self.base_url = request.build_absolute_uri()
+        self.fields = [
+            self.get_field(queryset, field.lstrip('-')) for field in self.ordering
+        ]
+        reverse, position = self.decode_cursor(request)
+
+        ordering = self.ordering
+        if reverse:
+            ordering = tuple(self._invert(field) for field in ordering)
+        queryset = queryset.order_by(*ordering)
+        if position is not None:
+            queryset = queryset.filter(self.get_keyset_filter(ordering, position))
+
+        results = list(queryset[:self.limit + 1])
+        self.page = results[:self.limit]
+        has_more = len(results) > self.limit
+        if reverse:
+            self.page.reverse()
+            self.has_next, self.has_previous = True, has_more
+        else:
+            self.has_next, self.has_previous = has_more, position is not None
+        return self.page
+
+    def get_ordering(self, request, queryset, view):
+        """Ключ пагинации берётся из фильтра сортировки вьюсета,
+        если он есть (как в CursorPagination DRF)."""
+
+        for backend in getattr(view, 'filter_backends', []):
+            if hasattr(backend, 'get_ordering'):
+                return tuple(backend().get_ordering(request, queryset, view))
+        return self.ordering
+
+    @staticmethod
+    def get_field(queryset, name):
+        """Поле ключа: поле модели или аннотация (rank поиска)."""
+
+        if name in queryset.query.annotations:
+            return queryset.query.annotations[name].output_field
+        return queryset.model._meta.get_field(name)
+
+    @staticmethod
+    def _invert(field):
+        return field[1:] if field.startswith('-') else f'-{field}'
+
+    @staticmethod
+    def get_keyset_filter(ordering, position):
+        """Строит условие «после позиции» для составного ключа:
+        (a < x) OR (a = x AND b < y) ... с учётом направления полей.
+        Первое поле дополнительно ограничено сверху/снизу, чтобы
+        условие обслуживалось диапазоном индекса."""
+
+        clauses = []
+        equal = {}
+        for field, value in zip(ordering, position):
+            name = field.lstrip('-')
+            lookup = 'lt' if field.startswith('-') else 'gt'
+            clauses.append(Q(**equal, **{f'{name}__{lookup}': value}))
+            equal[name] = value
+        first = ordering[0]
+        bound = 'lte' if first.startswith('-') else 'gte'
+        return Q(**{f'{first.lstrip("-")}__{bound}': position[0]}) & reduce(
+            operator.or_, clauses
+        )
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return False, None
+        try:
+            querystring = b64decode(encoded.encode('ascii')).decode('ascii')
+            tokens = parse.parse_qs(querystring, strict_parsing=True)
+            reverse = bool(int(tokens.get('r', ['0'])[0]))
+            values = tokens['p']
+            if len(values) != len(self.ordering):
+                raise ValueError
+            position = tuple(
+                field.to_python(value) for field, value in zip(self.fields, values)
+            )
+        except (TypeError, ValueError, KeyError, ValidationError):
+            raise NotFound(self.invalid_cursor_message)
+        if any(value is None for value in position):
+            raise NotFound(self.invalid_cursor_message)
+        return reverse, position
+
+    def encode_cursor(self, instance, reverse):
+        position = [
+            field.value_to_string(instance) if hasattr(field, 'attname')
+            else str(getattr(instance, name.lstrip('-')))
+            for field, name in zip(self.fields, self.ordering)
+        ]
+        tokens = {'p': position}
+        if reverse:
+            tokens['r'] = '1'
+        querystring = parse.urlencode(tokens, doseq=True)
+        encoded = b64encode(querystring.encode('ascii')).decode('ascii')
+        return replace_query_param(self.base_url, self.cursor_query_param, encoded)
+
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+        return self.encode_cursor(self.page[-1], reverse=False)
+
+    def get_previous_link(self):
+        if not self.has_previous:
+            return None
+        if not self.page:
+            return replace_query_param(self.base_url, self.cursor_query_param, '')
+        return self.encode_cursor(self.page[0], reverse=True)
+
+    def get_paginated_response(self, data):
+        return Response({
+            'next': self.get_next_link(),
+            'previous': self.get_previous_link(),
+            'results': data,
+        })
+
+
+class CursorOrOffsetPagination(LimitOffsetPagination):
+    """Пагинация limit/offset (по умолчанию, для обратной совместимости)
+    или курсорная, если в запросе передан параметр cursor
+    (для первой страницы — пустой: ?cursor=)."""
+
+    cursor_query_param = KeysetPagination.cursor_query_param
+    cursor_query_description = (
+        'Курсор страницы. Передайте пустое значение для первой страницы '
+        'в режиме курсорной пагинации, далее используйте ссылки next/previous.'
+    )
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.keyset = None
+        if self.cursor_query_param in request.query_params:
+            self.keyset = KeysetPagination(self.default_limit)
+            return self.keyset.paginate_queryset(queryset, request, view)
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        if self.keyset is not None:
+            return self.keyset.get_paginated_response(data)
+        return super().get_paginated_response(data)
+
+    def get_next_link(self):
+        if self.keyset is not None:
+            return self.keyset.get_next_link()
+        return super().get_next_link()
+
+    def get_previous_link(self):
+        if self.keyset is not None:
+            return self.keyset.get_previous_link()
+        return super().get_previous_link()
+
+    def get_html_context(self):
+        if self.keyset is not None:
+            return {
+                'previous_url': self.get_previous_link(),
+                'next_url': self.get_next_link(),
+            }
+        return super().get_html_context()
+
+    def get_paginated_response_schema(self, schema):
+        response_schema = super().get_paginated_response_schema(schema)
+        response_schema['required'] = ['results']
+        return response_schema
+
+    def get_schema_operation_parameters(self, view):
+        return super().get_schema_operation_parameters(view) + [
+            {
+                'name': self.cursor_query_param,
+                'required': False,
+                'in': 'query',
+                'description': self.cursor_query_description,
+                'schema': {'type': 'string'},
+            },
+        ]
@@ -0,0 +1,246 @@
+"""Замеры обработки запроса: SQL, аутентификация, валидация,
+сериализация и рендеринг ответа.
+
+PerformanceMiddleware кладёт RequestTimings в contextvar; SQL замеряет
+обёртка выполнения запросов (execute_wrappers) каждого соединения,
+остальные фазы отмечаются менеджером контекста phase(). Итог отдаётся
+в заголовке Server-Timing, а запросы дольше SLOW_REQUEST_MS пишутся
+в лог api.perf одной JSON-строкой с нормализованным SQL самых дорогих
+запросов. Фазы validate и serialize отмечают вьюхи (validate(),
+serialize(), api.mixins.TimedSerializationMixin). Фазы могут
+перекрываться: SQL внутри сериализации входит и в db, и в serialize.
+"""
+import contextvars
+import json
+import logging
+import re
+import time
+from contextlib import contextmanager
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+
+from config import constants
+
+logger = logging.getLogger(__name__)
+
+_current_timings = contextvars.ContextVar('request_timings', default=None)
+
+_IN_LIST = re.compile(r'IN \((?:%s, )*%s\)')
+_LITERALS = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+_SPACES = re.compile(r'\s+')
+
+
+def normalize_sql(sql):
+    """SQL без значений: списки IN сворачиваются, литералы заменяются на ?."""
+
+    sql = _IN_LIST.sub('IN (...)', sql)
+    sql = _LITERALS.sub('?', sql)
+    return _SPACES.sub(' ', sql).strip()
+
+
+def view_label(request):
+    """Имя обработчика вида AdViewSet.list или LoginView.post."""
+
+    match = getattr(request, 'resolver_match', None)
+    if match is None:
+        return None
+    view = getattr(match.func, 'cls', None) or getattr(match.func, 'view_class', None)
+    if view is None:
+        return match.view_name
+    actions = getattr(match.func, 'actions', None) or {}
+    method = request.method.lower()
+    return f'{view.__name__}.{actions.get(method, method)}'
+
+
+class RequestTimings:
+    """Накопленные за запрос длительности (в секундах)."""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.phases = {}
+        self.active = set()
+        self.queries = 0
+        self.sql_time = 0.0
+        self.statements = {}
+
+    def add_query(self, sql, duration):
+        self.queries += 1
+        self.sql_time += duration
+        stats = self.statements.get(sql)
+        if stats is None:
+            self.statements[sql] = [1, duration]
+        else:
+            stats[0] += 1
+            stats[1] += duration
+
+    def add_phase(self, name, duration):
+        self.phases[name] = self.phases.get(name, 0.0) + duration
+
+    def worst_queries(self, limit):
+        grouped = {}
+        for sql, (count, duration) in self.statements.items():
+            stats = grouped.setdefault(normalize_sql(sql), [0, 0.0])
+            stats[0] += count
+            stats[1] += duration
+        worst = sorted(grouped.items(), key=lambda item: item[1][1], reverse=True)
+        return [
+            {'sql': sql, 'count': count, 'ms': round(duration * 1000, 2)}
+            for sql, (count, duration) in worst[:limit]
+        ]
+
+    def server_timing(self, total):
+        metrics = [f'db;dur={self.sql_time * 1000:.2f};desc="{self.queries} queries"']
+        metrics.extend(
+            f'{name};dur={duration * 1000:.2f}'
+            for name, duration in self.phases.items()
+        )
+        metrics.append(f'total;dur={total * 1000:.2f}')
+        return ', '.join(metrics)
+
+
+@contextmanager
+def phase(name):
+    """Отмечает фазу обработки текущего запроса; вложенные вызовы той
+    же фазы не считаются повторно."""
+
+    timings = _current_timings.get()
+    if timings is None or name in timings.active:
+        yield
+        return
+    timings.active.add(name)
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings.add_phase(name, time.perf_counter() - started)
+        timings.active.discard(name)
+
+
+def record_sql(execute, sql, params, many, context):
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        timings = _current_timings.get()
+        if timings is not None:
+            timings.add_query(sql, time.perf_counter() - started)
+
+
+@receiver(connection_created)
+def install_sql_timer(sender, connection, **kwargs):
+    """Обёртка record_sql ставится на каждое соединение: под ASGI
+    middleware работает в цикле событий, а вьюха выполняет SQL в потоке
+    sync_to_async со своим соединением; запрос, к которому относится
+    SQL, находится по contextvar."""
+
+    if record_sql not in connection.execute_wrappers:
+        connection.execute_wrappers.append(record_sql)
+
+
+@contextmanager
+def track_request():
+    """RequestTimings текущего запроса. Вложенный вызов (второй
+    middleware) получает уже начатые замеры."""
+
+    timings = _current_timings.get()
+    if timings is not None:
+        yield timings
+        return
+    timings = RequestTimings()
+    token = _current_timings.set(timings)
+    try:
+        yield timings
+    finally:
+        _current_timings.reset(token)
+
+
+def validate(serializer):
+    """serializer.is_valid(raise_exception=True) в фазе validate."""
+
+    with phase('validate'):
+        serializer.is_valid(raise_exception=True)
+
+
+def serialize(serializer):
+    """serializer.data в фазе serialize."""
+
+    with phase('serialize'):
+        return serializer.data
+
+
+class AsyncCapableMiddleware:
+    """Middleware и для WSGI, и для ASGI: при асинхронной цепочке
+    вызывается __acall__, и запрос не переходит между циклом событий
+    и потоком на каждом middleware."""
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        with track_request() as timings:
+            response = self.get_response(request)
+        return self.process_timings(request, response, timings)
+
+    async def __acall__(self, request):
+        with track_request() as timings:
+            response = await self.get_response(request)
+        return self.process_timings(request, response, timings)
+
+    def process_timings(self, request, response, timings):
+        return response
+
+
+class PerformanceMiddleware(AsyncCapableMiddleware):
+    """Server-Timing и журнал медленных запросов (PERF_TIMING_ENABLED)."""
+
+    def __init__(self, get_response):
+        if not settings.PERF_TIMING_ENABLED:
+            raise MiddlewareNotUsed
+        super().__init__(get_response)
+
+    def process_timings(self, request, response, timings):
+        total = time.perf_counter() - timings.started
+        response['Server-Timing'] = timings.server_timing(total)
+        if total * 1000 >= settings.SLOW_REQUEST_MS:
+            logger.warning(json.dumps({
+                'event': 'slow_request',
+                'method': request.method,
+                'path': request.path,
+                'view': view_label(request),
+                'status': response.status_code,
+                'total_ms': round(total * 1000, 2),
+                'db_ms': round(timings.sql_time * 1000, 2),
+                'queries': timings.queries,
+                'phases_ms': {
+                    name: round(duration * 1000, 2)
+                    for name, duration in timings.phases.items()
+                },
+                'top_queries': timings.worst_queries(
+                    constants.SLOW_REQUEST_TOP_QUERIES
+                ),
+            }, ensure_ascii=False))
+        return response
+
+    def process_template_response(self, request, response):
+        """Время рендеринга: от вызова этого хука до post-render колбэка."""
+
+        timings = _current_timings.get()
+        if timings is not None:
+            started = time.perf_counter()
+            response.add_post_render_callback(
+                lambda rendered: timings.add_phase(
+                    'render', time.perf_counter() - started
+                )
+            )
+        return response
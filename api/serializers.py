@@ -1,9 +1,14 @@
+from django.conf import settings
 from django.core.validators import FileExtensionValidator
 from django.contrib.auth.password_validation import validate_password
 from django.contrib.auth import authenticate
+from drf_spectacular.utils import extend_schema_field
 from rest_framework import serializers
 
 from ads import models
+from ads.export import EXPORT_FORMATS
+from ads.images import build_srcset
+from ads.percolator import normalize
 from ads import choices as chcs
 from config import constants
 from users.models import User
@@ -105,6 +110,36 @@ class AdCreateSerializer(serializers.ModelSerializer):
         )
 
 
+class AdBatchItemSerializer(serializers.ModelSerializer):
+    """Сериализатор одного объявления пакетного создания.
+    Категория проверяется по словарю context['categories'], уникальность
+    заголовков — одним запросом на весь пакет (во вьюсете)."""
+
+    title = serializers.CharField(max_length=constants.MAX_CHAR_LENGTH)
+    category = serializers.IntegerField()
+    condition = serializers.ChoiceField(
+        choices=chcs.AD_CONDITION_CHOICES
+    )
+
+    class Meta:
+        model = models.Ad
+        fields = (
+            'title',
+            'description',
+            'category',
+            'condition',
+        )
+
+    def validate_category(self, value):
+        category = self.context['categories'].get(value)
+        if category is None:
+            raise serializers.ValidationError(
+                serializers.PrimaryKeyRelatedField.default_error_messages[
+                    'does_not_exist'].format(pk_value=value)
+            )
+        return category
+
+
 class AdReadSerializer(serializers.ModelSerializer):
     """Сериализатор для чтения модели Ad."""
 
@@ -113,6 +148,7 @@ class AdReadSerializer(serializers.ModelSerializer):
         read_only=True
     )
     category = CategorySerializer()
+    image_srcset = serializers.SerializerMethodField()
 
     class Meta:
         model = models.Ad
@@ -122,11 +158,35 @@ class AdReadSerializer(serializers.ModelSerializer):
             'description',
             'user',
             'image_url',
+            'image_srcset',
             'category',
             'condition',
             'created_at',
         )
 
+    @extend_schema_field({
+        'type': 'object',
+        'nullable': True,
+        'additionalProperties': {'type': 'string'},
+        'example': {
+            'original': '/media/ad_images/renditions/ad_images/a.jpg_320.jpg 320w',
+            'webp': '/media/ad_images/renditions/ad_images/a.jpg_320.webp 320w',
+        },
+    })
+    def get_image_srcset(self, obj):
+        """srcset-строки уменьшенных копий изображения по форматам."""
+
+        return build_srcset(obj, self.context.get('request'))
+
+
+class AdMatchSerializer(AdReadSerializer):
+    """Сериализатор объявления-кандидата для обмена с оценкой подбора."""
+
+    score = serializers.FloatField(source='match_score', read_only=True)
+
+    class Meta(AdReadSerializer.Meta):
+        fields = AdReadSerializer.Meta.fields + ('score',)
+
 
 class ProposalReadSerializer(serializers.ModelSerializer):
     """Сериализатор для чтения модели ExchangeProposal."""
@@ -186,10 +246,10 @@ class ProposalCreateSerializer(serializers.ModelSerializer):
         ad_sender = data.get('ad_sender')
         ad_receiver = data.get('ad_receiver')
 
-        if ad_sender.user != request_user:
+        if ad_sender.user_id != request_user.id:
             raise serializers.ValidationError("Вы можете предложить обмен только от своего объявления!")
 
-        if ad_receiver.user == request_user:
+        if ad_receiver.user_id == request_user.id:
             raise serializers.ValidationError("Нельзя отправить предложение на своё же объявление!")
 
         return data
@@ -203,3 +263,136 @@ class ProposalUpdateSerializer(serializers.ModelSerializer):
     class Meta:
         model = models.ExchangeProposal
         fields = ('status',)
+
+    def update(self, instance, validated_data):
+        """Принятие выполняется через ExchangeProposal.objects.approve:
+        остальные ожидающие предложения с теми же объявлениями
+        отклоняются, повторный обмен объявлением запрещён."""
+
+        if validated_data.get('status') != chcs.Status.APPROVED:
+            return super().update(instance, validated_data)
+
+        approved, _ = models.ExchangeProposal.objects.approve([instance])
+        if not approved:
+            raise serializers.ValidationError(
+                "Объявление уже участвует в принятом обмене!"
+            )
+        instance.status = chcs.Status.APPROVED
+        return instance
+
+
+class ProposalBulkStatusSerializer(serializers.Serializer):
+    """Сериализатор массовой смены статуса входящих предложений."""
+
+    ids = serializers.ListField(
+        child=serializers.IntegerField(),
+        allow_empty=False,
+        max_length=constants.MAX_BULK_STATUS_IDS,
+    )
+    status = serializers.ChoiceField(
+        choices=chcs.PROPOSAL_DECISION_CHOICES
+    )
+
+
+class LimitQuerySerializer(serializers.Serializer):
+    """Параметр limit для выдач без пагинации."""
+
+    limit = serializers.IntegerField(
+        min_value=1, max_value=constants.MAX_PAGE_SIZE, default=20
+    )
+
+
+class AdListQuerySerializer(serializers.Serializer):
+    """Дополнительные параметры списка объявлений."""
+
+    facets = serializers.BooleanField(
+        default=False,
+        help_text=('Добавить в ответ счётчики объявлений по категориям '
+                   'и состояниям для текущих фильтров.'),
+    )
+
+
+class ExportQuerySerializer(serializers.Serializer):
+    """Параметры потоковой выгрузки."""
+
+    output = serializers.ChoiceField(
+        choices=EXPORT_FORMATS, default='ndjson',
+        help_text='Формат выгрузки: ndjson (объект JSON в строке) или csv.',
+    )
+
+
+class BarterCycleQuerySerializer(LimitQuerySerializer):
+    """Параметры поиска многосторонних обменов."""
+
+    max_length = serializers.IntegerField(min_value=2, required=False)
+
+    def validate_max_length(self, value):
+        if value > settings.BARTER_MAX_CYCLE_LENGTH:
+            raise serializers.ValidationError(
+                f'Не больше {settings.BARTER_MAX_CYCLE_LENGTH} участников.'
+            )
+        return value
+
+
+class BarterCycleStepSerializer(serializers.Serializer):
+    """Предложение — шаг многостороннего обмена."""
+
+    id = serializers.IntegerField()
+    sender_user = serializers.IntegerField(source='sender_user_id')
+    receiver_user = serializers.IntegerField(source='receiver_user_id')
+    ad_sender = serializers.IntegerField(source='ad_sender_id')
+    ad_receiver = serializers.IntegerField(source='ad_receiver_id')
+
+
+class SavedSearchSerializer(serializers.ModelSerializer):
+    """Сериализатор сохранённого поиска."""
+
+    category = serializers.PrimaryKeyRelatedField(
+        queryset=models.Category.objects.all(),
+        required=False,
+        allow_null=True
+    )
+    condition = serializers.ChoiceField(
+        choices=chcs.AD_CONDITION_CHOICES,
+        required=False,
+        allow_blank=True
+    )
+
+    class Meta:
+        model = models.SavedSearch
+        fields = (
+            'id',
+            'category',
+            'condition',
+            'keywords',
+            'created_at',
+        )
+
+    def validate(self, data):
+        if not (data.get('category') or data.get('condition')
+                or normalize([data.get('keywords')])[0]):
+            raise serializers.ValidationError(
+                "Укажите категорию, состояние или ключевые слова!"
+            )
+        user = self.context['request'].user
+        if models.SavedSearch.objects.filter(
+                user=user).count() >= constants.MAX_SAVED_SEARCHES:
+            raise serializers.ValidationError(
+                f"Можно сохранить не больше {constants.MAX_SAVED_SEARCHES} поисков!"
+            )
+        return data
+
+
+class SavedSearchMatchSerializer(serializers.ModelSerializer):
+    """Сериализатор ленты совпадений сохранённых поисков."""
+
+    ad = AdReadSerializer()
+
+    class Meta:
+        model = models.SavedSearchMatch
+        fields = (
+            'id',
+            'saved_search',
+            'ad',
+            'created_at',
+        )
@@ -0,0 +1,80 @@
+import pytest
+
+from ads.models import Ad, ExchangeProposal
+
+
+@pytest.fixture
+def market(user, another_user, category):
+    """Создаёт объявления двух пользователей и предложения:
+    два на объявление user, одно от него и одно постороннее."""
+
+    def ad(title, owner):
+        return Ad.objects.create(
+            title=title, description='...',
+            user=owner, category=category, condition='new'
+        )
+
+    own, own_spare = ad('Велосипед', user), ad('Гантели', user)
+    first, second, third = (
+        ad(title, another_user) for title in ('Книга', 'Лампа', 'Стул')
+    )
+    return {
+        'approve': ExchangeProposal.objects.create(ad_sender=first, ad_receiver=own),
+        'same_receiver': ExchangeProposal.objects.create(ad_sender=second, ad_receiver=own),
+        'same_sender': ExchangeProposal.objects.create(ad_sender=first, ad_receiver=own_spare),
+        'unrelated': ExchangeProposal.objects.create(ad_sender=third, ad_receiver=own_spare),
+    }
+
+
+def statuses(market):
+    """Возвращает текущие статусы предложений по ключам market."""
+
+    return {
+        key: ExchangeProposal.objects.get(id=proposal.id).status
+        for key, proposal in market.items()
+    }
+
+
+@pytest.mark.django_db
+def test_approval_rejects_conflicts(auth_client, market):
+    """Проверяет отклонение ожидающих предложений с теми же объявлениями
+    и запрет принять второй обмен тем же объявлением."""
+
+    response = auth_client.patch(
+        f"/api/proposals/{market['approve'].id}/", {'status': 'approved'}
+    )
+    assert response.status_code == 200
+    assert statuses(market) == {
+        'approve': 'approved',
+        'same_receiver': 'rejected',
+        'same_sender': 'rejected',
+        'unrelated': 'pending',
+    }
+
+    response = auth_client.patch(
+        f"/api/proposals/{market['same_receiver'].id}/", {'status': 'approved'}
+    )
+    assert response.status_code == 400
+    assert statuses(market)['same_receiver'] == 'rejected'
+
+
+@pytest.mark.django_db
+def test_bulk_approval_skips_conflicts(auth_client, market):
+    """Проверяет, что массовое принятие принимает только одно предложение
+    на объявление."""
+
+    ids = [market[key].id for key in ('approve', 'same_receiver', 'unrelated')]
+    response = auth_client.post(
+        '/api/proposals/bulk-status/',
+        {'ids': ids, 'status': 'approved'}, format='json'
+    )
+
+    assert response.status_code == 200
+    assert response.data['updated'] == [market['approve'].id, market['unrelated'].id]
+    assert response.data['refused'] == [market['same_receiver'].id]
+    assert statuses(market) == {
+        'approve': 'approved',
+        'same_receiver': 'rejected',
+        'same_sender': 'rejected',
+        'unrelated': 'approved',
+    }
@@ -0,0 +1,84 @@
+import pytest
+from rest_framework.authtoken.models import Token
+
+from api.authentication import TokenCache, token_cache
+
+
+class FakeTimer:
+    """Управляемые часы для проверки TTL."""
+
+    def __init__(self):
+        self.now = 0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.mark.django_db
+def test_token_cache_counts_hits_and_misses(auth_client):
+    """Проверяет, что повторный запрос с тем же токеном берётся из кэша."""
+
+    auth_client.get('/api/me/')
+    auth_client.get('/api/me/')
+    assert token_cache.stats() == {'hits': 1, 'misses': 1, 'size': 1}
+
+
+@pytest.mark.django_db
+def test_logout_invalidates_cached_token(auth_client):
+    """Проверяет, что после выхода закэшированный токен не принимается."""
+
+    assert auth_client.get('/api/me/').status_code == 200
+    assert auth_client.post('/api/logout/').status_code == 200
+    assert auth_client.get('/api/me/').status_code == 401
+
+
+@pytest.mark.django_db
+def test_deactivated_user_is_rejected(auth_client, user):
+    """Проверяет, что деактивация пользователя сбрасывает кэш."""
+
+    assert auth_client.get('/api/me/').status_code == 200
+    user.is_active = False
+    user.save()
+    assert token_cache.stats()['size'] == 0
+    assert auth_client.get('/api/me/').status_code == 401
+
+
+@pytest.mark.django_db
+def test_token_cache_ttl_and_lru(user, another_user):
+    """Проверяет истечение записи по TTL и вытеснение самой старой записи."""
+
+    timer = FakeTimer()
+    cache = TokenCache(max_size=1, ttl=10, timer=timer)
+    token = Token.objects.create(user=user)
+    another_token = Token.objects.create(user=another_user)
+
+    cache.set(token.key, token, cache.get_version(token.key))
+    assert cache.get(token.key) == token
+    timer.now = 10
+    assert cache.get(token.key) is None
+
+    cache.set(token.key, token, cache.get_version(token.key))
+    cache.set(
+        another_token.key, another_token, cache.get_version(another_token.key)
+    )
+    assert cache.get(token.key) is None
+    assert cache.get(another_token.key) == another_token
+
+
+@pytest.mark.django_db
+def test_revocation_reaches_other_workers(user):
+    """Проверяет, что запись, закэшированная в другом воркере,
+    отбрасывается после выхода или деактивации по штампу версии."""
+
+    token = Token.objects.create(user=user)
+    other_worker = TokenCache(max_size=10, ttl=60)
+    other_worker.set(token.key, token, other_worker.get_version(token.key))
+    assert other_worker.get(token.key) == token
+
+    user.is_active = False
+    user.save()
+    assert other_worker.get(token.key) is None
+
+    other_worker.set(token.key, token, other_worker.get_version(token.key))
+    token.delete()
+    assert other_worker.get(token.key) is None
@@ -0,0 +1,85 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from ads.models import Ad
+
+
+def make_items(category, count, prefix='Товар'):
+    """Возвращает список данных объявлений для пакетного создания."""
+
+    return [
+        {
+            'title': f'{prefix} {number}',
+            'description': 'Описание',
+            'category': category.id,
+            'condition': 'new',
+        }
+        for number in range(count)
+    ]
+
+
+@pytest.mark.django_db
+def test_batch_create_reports_item_errors(auth_client, user, category):
+    """Проверяет создание корректных объявлений и ошибки по индексам
+    для остальных."""
+
+    Ad.objects.create(
+        title='Занято', description='...', user=user,
+        category=category, condition='new'
+    )
+    items = make_items(category, 2)
+    items += [
+        {**items[0]},
+        {**items[0], 'title': 'Занято'},
+        {**items[0], 'title': 'Без категории', 'category': 999},
+        {'title': 'Без описания'},
+    ]
+
+    response = auth_client.post('/api/ads/batch/', items, format='json')
+
+    assert response.status_code == 201
+    assert [ad['title'] for ad in response.data['created']] == ['Товар 0', 'Товар 1']
+    assert response.data['created'][0]['user'] == user.username
+    assert [error['index'] for error in response.data['errors']] == [2, 3, 4, 5]
+    assert 'title' in response.data['errors'][0]['errors']
+    assert 'category' in response.data['errors'][2]['errors']
+    assert Ad.objects.filter(user=user).count() == 3
+
+
+@pytest.mark.django_db
+def test_batch_create_query_count(auth_client, category):
+    """Проверяет, что число запросов не зависит от размера пакета."""
+
+    auth_client.post('/api/ads/batch/', make_items(category, 1, 'Разогрев'), format='json')
+
+    counts = []
+    for prefix, size in (('Малый', 1), ('Большой', 50)):
+        with CaptureQueriesContext(connection) as context:
+            response = auth_client.post(
+                '/api/ads/batch/', make_items(category, size, prefix), format='json'
+            )
+        assert response.status_code == 201
+        counts.append(len(context.captured_queries))
+    assert counts[0] == counts[1]
+
+
+@pytest.mark.django_db
+def test_batch_create_limits(auth_client, api_client, category, settings):
+    """Проверяет ошибку для пустого пакета, ограничение размера пакета
+    и новые объявления в кэшированном анонимном списке."""
+
+    assert api_client.get('/api/ads/').data['count'] == 0
+
+    response = auth_client.post('/api/ads/batch/', [], format='json')
+    assert response.status_code == 400
+    assert response.data == {'detail': 'Список объявлений пуст.'}
+
+    settings.ADS_BATCH_MAX_SIZE = 2
+    response = auth_client.post('/api/ads/batch/', make_items(category, 3), format='json')
+    assert response.status_code == 400
+    assert not Ad.objects.exists()
+
+    response = auth_client.post('/api/ads/batch/', make_items(category, 2), format='json')
+    assert response.status_code == 201
+    assert api_client.get('/api/ads/').data['count'] == 2
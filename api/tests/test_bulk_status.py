@@ -0,0 +1,76 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from ads.models import Ad, ExchangeProposal
+
+
+@pytest.fixture
+def inbox(user, another_user, category):
+    """Создаёт три входящих предложения для user (одно уже отклонено)
+    и одно исходящее."""
+
+    own = Ad.objects.create(
+        title='Мой велосипед', description='...',
+        user=user, category=category, condition='used'
+    )
+    offers = [
+        Ad.objects.create(
+            title=f'Чужая книга {number}', description='...',
+            user=another_user, category=category, condition='new'
+        )
+        for number in range(3)
+    ]
+    incoming = [
+        ExchangeProposal.objects.create(ad_sender=offer, ad_receiver=own)
+        for offer in offers
+    ]
+    incoming[2].status = 'rejected'
+    incoming[2].save()
+    outgoing = ExchangeProposal.objects.create(ad_sender=own, ad_receiver=offers[0])
+    return incoming, outgoing
+
+
+@pytest.mark.django_db
+def test_bulk_status_single_update(auth_client, inbox):
+    """Проверяет смену статуса только ожидающих входящих предложений
+    одним условным UPDATE без SELECT и список отклонённых id."""
+
+    incoming, outgoing = inbox
+    ids = [proposal.id for proposal in incoming] + [outgoing.id, 999]
+
+    with CaptureQueriesContext(connection) as context:
+        response = auth_client.post(
+            '/api/proposals/bulk-status/',
+            {'ids': ids, 'status': 'rejected'}, format='json'
+        )
+
+    assert response.status_code == 200
+    assert response.data['updated'] == [incoming[0].id, incoming[1].id]
+    assert response.data['refused'] == sorted([incoming[2].id, outgoing.id, 999])
+    queries = [
+        query['sql'] for query in context.captured_queries
+        if 'exchangeproposal' in query['sql']
+    ]
+    assert len(queries) == 1
+    assert queries[0].startswith('UPDATE')
+    assert set(
+        ExchangeProposal.objects.filter(status='rejected').values_list('id', flat=True)
+    ) == {proposal.id for proposal in incoming}
+    outgoing.refresh_from_db()
+    assert outgoing.status == 'pending'
+
+
+@pytest.mark.django_db
+def test_bulk_status_validation(auth_client, inbox):
+    """Проверяет отказ для пустого списка и статуса 'pending'."""
+
+    response = auth_client.post(
+        '/api/proposals/bulk-status/', {'ids': [], 'status': 'rejected'}, format='json'
+    )
+    assert response.status_code == 400
+    response = auth_client.post(
+        '/api/proposals/bulk-status/',
+        {'ids': [inbox[0][0].id], 'status': 'pending'}, format='json'
+    )
+    assert response.status_code == 400
@@ -0,0 +1,65 @@
+import pytest
+
+from ads.models import Ad, Category
+
+
+@pytest.mark.django_db
+def test_category_list_is_served_from_cache(
+        api_client, category, count_queries):
+    """Проверяет, что повторный список категорий не обращается к БД,
+    а изменение категории сразу видно в ответе."""
+
+    api_client.get('/api/categories/')
+    queries, response = count_queries(api_client, '/api/categories/')
+    assert queries == 0
+    assert response.data['results'][0]['title'] == category.title
+
+    category.title = 'Журналы'
+    category.save()
+    response = api_client.get(f'/api/categories/{category.id}/')
+    assert response.data['title'] == 'Журналы'
+
+
+@pytest.mark.django_db
+def test_category_etag(api_client, category):
+    """Проверяет ответ 304 по ETag и смену ETag после изменения категорий."""
+
+    response = api_client.get('/api/categories/')
+    etag = response['ETag']
+
+    response = api_client.get('/api/categories/', HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == 304
+
+    Category.objects.create(title='Игры', description='Настольные')
+    response = api_client.get('/api/categories/', HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == 200
+    assert response['ETag'] != etag
+    assert response.data['count'] == 2
+
+
+@pytest.mark.django_db
+def test_unknown_category_returns_404(api_client, category):
+    """Проверяет ответ 404 для несуществующей категории."""
+
+    assert api_client.get('/api/categories/999/').status_code == 404
+
+
+@pytest.mark.django_db
+def test_ad_filter_by_cached_category(api_client, user, category):
+    """Проверяет фильтрацию объявлений по заголовку категории из кэша."""
+
+    other = Category.objects.create(title='Игры', description='Настольные')
+    Ad.objects.create(
+        title='Роман', description='...',
+        user=user, category=category, condition='new'
+    )
+    Ad.objects.create(
+        title='Шахматы', description='...',
+        user=user, category=other, condition='new'
+    )
+
+    response = api_client.get('/api/ads/', {'category': 'Игры'})
+    assert [ad['title'] for ad in response.data['results']] == ['Шахматы']
+
+    response = api_client.get('/api/ads/', {'category': 'Нет такой'})
+    assert response.status_code == 400
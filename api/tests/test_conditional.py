@@ -0,0 +1,126 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from ads.models import Ad, ExchangeProposal
+
+
+@pytest.fixture
+def proposal(user, another_user, category):
+    """Создаёт предложение обмена между объявлениями двух пользователей."""
+
+    ad_sender = Ad.objects.create(
+        title='Велосипед', description='...',
+        user=user, category=category, condition='used'
+    )
+    ad_receiver = Ad.objects.create(
+        title='Самокат', description='...',
+        user=another_user, category=category, condition='new'
+    )
+    return ExchangeProposal.objects.create(
+        ad_sender=ad_sender, ad_receiver=ad_receiver
+    )
+
+
+@pytest.mark.django_db
+def test_ad_list_not_modified(auth_client, proposal):
+    """Проверяет 304 для неизменного списка объявлений одним запросом к БД
+    и смену ETag после изменения объявления."""
+
+    params = {'cursor': ''}
+    etag = auth_client.get('/api/ads/', params)['ETag']
+
+    with CaptureQueriesContext(connection) as context:
+        response = auth_client.get('/api/ads/', params, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == 304
+    assert len(context.captured_queries) == 1
+
+    ad = proposal.ad_receiver
+    ad.description = 'Новое описание'
+    ad.save()
+    response = auth_client.get('/api/ads/', params, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == 200
+    assert response['ETag'] != etag
+
+
+@pytest.mark.django_db
+def test_ad_list_etag_changes_on_delete(api_client, proposal):
+    """Проверяет смену ETag списка после удаления объявления."""
+
+    etag = api_client.get('/api/ads/')['ETag']
+    proposal.ad_sender.delete()
+    response = api_client.get('/api/ads/', HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == 200
+    assert response.data['count'] == 1
+
+
+@pytest.mark.django_db
+def test_ad_retrieve_not_modified(api_client, proposal):
+    """Проверяет 304 по If-None-Match и If-Modified-Since для объявления."""
+
+    url = f'/api/ads/{proposal.ad_sender_id}/'
+    response = api_client.get(url)
+    etag, last_modified = response['ETag'], response['Last-Modified']
+
+    with CaptureQueriesContext(connection) as context:
+        response = api_client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == 304
+    assert len(context.captured_queries) == 1
+
+    response = api_client.get(url, HTTP_IF_MODIFIED_SINCE=last_modified)
+    assert response.status_code == 304
+
+
+@pytest.mark.django_db
+def test_proposal_list_follows_nested_ads(auth_client, proposal):
+    """Проверяет, что изменение вложенного объявления меняет ETag
+    списка предложений."""
+
+    etag = auth_client.get('/api/proposals/')['ETag']
+    assert auth_client.get(
+        '/api/proposals/', HTTP_IF_NONE_MATCH=etag
+    ).status_code == 304
+
+    ad = proposal.ad_receiver
+    ad.title = 'Самокат электрический'
+    ad.save()
+    response = auth_client.get('/api/proposals/', HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == 200
+    assert response.data['results'][0]['ad_receiver']['title'] == ad.title
+
+
+@pytest.mark.django_db
+def test_ad_list_last_modified(auth_client, proposal):
+    """Проверяет Last-Modified списка по самому позднему updated_at,
+    304 по If-Modified-Since и один COUNT при промахе валидатора."""
+
+    response = auth_client.get('/api/ads/')
+    last_modified = response['Last-Modified']
+    assert auth_client.get(
+        '/api/ads/', HTTP_IF_MODIFIED_SINCE=last_modified
+    ).status_code == 304
+
+    etag = response['ETag']
+    ad = proposal.ad_sender
+    ad.description = 'Новое описание'
+    ad.save()
+    with CaptureQueriesContext(connection) as context:
+        response = auth_client.get('/api/ads/', HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == 200
+    assert response['ETag'] != etag
+    assert response.data['count'] == 2
+    counts = [
+        query for query in context.captured_queries
+        if 'COUNT(' in query['sql'].upper()
+    ]
+    assert len(counts) == 1
+
+
+@pytest.mark.django_db
+def test_anonymous_ad_list_last_modified(api_client, proposal):
+    """Проверяет Last-Modified у списка из кэша ответов."""
+
+    last_modified = api_client.get('/api/ads/')['Last-Modified']
+    response = api_client.get('/api/ads/', HTTP_IF_MODIFIED_SINCE=last_modified)
+    assert response.status_code == 304
+    assert response['Last-Modified'] == last_modified
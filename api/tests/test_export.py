@@ -0,0 +1,86 @@
+import csv
+import io
+import json
+
+import pytest
+from django.core.management import call_command
+
+from ads.models import Ad, Category, ExchangeProposal
+
+
+def streamed(response):
+    return b''.join(response.streaming_content).decode()
+
+
+@pytest.mark.django_db
+def test_export_ads(auth_client, user, category):
+    """Проверяет потоковую выгрузку объявлений с фильтрами в NDJSON и CSV."""
+
+    other = Category.objects.create(title='Игры', description='...')
+    for i in range(5):
+        Ad.objects.create(
+            user=user, title=f'Книга {i}', description='"с кавычками", и запятой',
+            category=category, condition='new',
+        )
+    Ad.objects.create(
+        user=user, title='Игра', description='...',
+        category=other, condition='used',
+    )
+
+    response = auth_client.get('/api/ads/export/', {'category': 'Книги'})
+    assert response.status_code == 200
+    assert response.streaming
+    assert response['Content-Type'] == 'application/x-ndjson'
+    rows = [json.loads(line) for line in streamed(response).splitlines()]
+    assert [row['title'] for row in rows] == [f'Книга {i}' for i in range(4, -1, -1)]
+    assert rows[0]['user'] == user.username
+    assert rows[0]['category'] == 'Книги'
+
+    response = auth_client.get(
+        '/api/ads/export/', {'output': 'csv', 'condition': 'new', 'ordering': 'oldest'}
+    )
+    assert 'attachment; filename="ads.csv"' == response['Content-Disposition']
+    rows = list(csv.DictReader(io.StringIO(streamed(response))))
+    assert len(rows) == 5
+    assert rows[0]['title'] == 'Книга 0'
+    assert rows[0]['description'] == '"с кавычками", и запятой'
+
+    assert auth_client.get('/api/ads/export/', {'output': 'xml'}).status_code == 400
+
+
+@pytest.mark.django_db
+def test_export_proposals(
+        auth_client, another_auth_client, user, another_user, category, tmp_path):
+    """Проверяет выгрузку только своих предложений через API и команду."""
+
+    ad_sender = Ad.objects.create(
+        user=user, title='Книга', description='...',
+        category=category, condition='new',
+    )
+    ad_receiver = Ad.objects.create(
+        user=another_user, title='Другая книга', description='...',
+        category=category, condition='new',
+    )
+    proposal = ExchangeProposal.objects.create(
+        ad_sender=ad_sender, ad_receiver=ad_receiver, comment='Меняю'
+    )
+
+    response = another_auth_client.get('/api/proposals/export/')
+    rows = [json.loads(line) for line in streamed(response).splitlines()]
+    assert rows == [{
+        'id': proposal.id, 'ad_sender': ad_sender.id,
+        'ad_receiver': ad_receiver.id, 'sender_user': user.username,
+        'receiver_user': another_user.username, 'comment': 'Меняю',
+        'status': 'pending', 'created_at': proposal.created_at.isoformat(),
+        'updated_at': proposal.updated_at.isoformat(),
+    }]
+    response = auth_client.get('/api/proposals/export/', {'status': 'approved'})
+    assert streamed(response) == ''
+
+    path = tmp_path / 'proposals.csv'
+    call_command(
+        'export_data', 'proposals', '--user', user.username,
+        '--format', 'csv', '--output', str(path), '--chunk-size', '1',
+    )
+    with open(path, encoding='utf-8', newline='') as file:
+        assert [row['id'] for row in csv.DictReader(file)] == [str(proposal.id)]
@@ -0,0 +1,147 @@
+import pytest
+from django.core.management import call_command
+
+from ads.models import Ad, AdFacetCount, Category
+
+
+def facet_counts(data):
+    return (
+        {item['title']: item['count'] for item in data['facets']['category']},
+        {item['value']: item['count'] for item in data['facets']['condition']},
+    )
+
+
+@pytest.mark.django_db
+def test_facet_counts_follow_ads(auth_client, user, category):
+    """Проверяет счётчики после создания, пакетного создания,
+    изменения и удаления объявлений."""
+
+    other = Category.objects.create(title='Игры', description='...')
+    ad = Ad.objects.create(
+        user=user, title='Книга', description='...',
+        category=category, condition='new',
+    )
+    auth_client.post('/api/ads/batch/', [
+        {'title': 'Игра', 'description': '...',
+         'category': other.id, 'condition': 'used'},
+        {'title': 'Ещё книга', 'description': '...',
+         'category': category.id, 'condition': 'used'},
+    ], format='json')
+
+    response = auth_client.get('/api/ads/', {'facets': 'true'})
+    assert facet_counts(response.data) == (
+        {'Книги': 2, 'Игры': 1}, {'new': 1, 'used': 2}
+    )
+
+    auth_client.patch(f'/api/ads/{ad.id}/', {
+        'category': other.id, 'condition': 'used'
+    })
+    response = auth_client.get(
+        '/api/ads/', {'facets': 'true', 'category': 'Игры'}
+    )
+    assert response.data['count'] == 2
+    assert facet_counts(response.data) == (
+        {'Книги': 1, 'Игры': 2}, {'new': 0, 'used': 2}
+    )
+
+    auth_client.delete(f'/api/ads/{ad.id}/')
+    response = auth_client.get(
+        '/api/ads/', {'facets': 'true', 'condition': 'used'}
+    )
+    assert facet_counts(response.data) == (
+        {'Книги': 1, 'Игры': 1}, {'new': 0, 'used': 2}
+    )
+    assert 'facets' not in auth_client.get('/api/ads/').data
+
+
+@pytest.mark.django_db
+def test_facet_counts_with_search(api_client, user, category):
+    """Проверяет счётчики по результатам поиска и кэш анонимных списков."""
+
+    for title, condition in (('Синий зонт', 'new'), ('Красный зонт', 'used'),
+                             ('Синяя книга', 'new')):
+        Ad.objects.create(
+            user=user, title=title, description='...',
+            category=category, condition=condition,
+        )
+
+    response = api_client.get('/api/ads/', {'facets': 'true', 'search': 'зонт'})
+    assert facet_counts(response.data) == ({'Книги': 2}, {'new': 1, 'used': 1})
+
+    Ad.objects.create(
+        user=user, title='Зелёный зонт', description='...',
+        category=Category.objects.create(title='Игры', description='...'),
+        condition='used',
+    )
+    response = api_client.get(
+        '/api/ads/', {'facets': 'true', 'category': 'Книги'}
+    )
+    assert facet_counts(response.data) == (
+        {'Книги': 3, 'Игры': 1}, {'new': 2, 'used': 1}
+    )
+
+
+@pytest.mark.django_db
+def test_rebuild_facets(user, category):
+    """Проверяет исправление расхождений командой rebuild_facets."""
+
+    Ad.objects.create(
+        user=user, title='Книга', description='...',
+        category=category, condition='new',
+    )
+    AdFacetCount.objects.update(count=5)
+    AdFacetCount.objects.create(category=category, condition='used', count=2)
+
+    call_command('rebuild_facets')
+    assert list(AdFacetCount.objects.values_list(
+        'category_id', 'condition', 'count'
+    )) == [(category.id, 'new', 1)]
+
+
+@pytest.mark.django_db
+def test_facet_counts_share_transaction_with_ads(
+        auth_client, category, monkeypatch):
+    """Проверяет, что ошибка обновления счётчиков откатывает и создание
+    объявления через API, и пакетную вставку."""
+
+    def fail(*args, **kwargs):
+        raise RuntimeError('counter update failed')
+
+    monkeypatch.setattr(AdFacetCount.objects, 'apply', fail)
+    data = {'title': 'Книга', 'description': '...',
+            'category': category.id, 'condition': 'new'}
+    with pytest.raises(RuntimeError):
+        auth_client.post('/api/ads/', data)
+    with pytest.raises(RuntimeError):
+        auth_client.post('/api/ads/batch/', [data], format='json')
+    assert not Ad.objects.exists()
+
+
+@pytest.mark.django_db(transaction=True)
+def test_facet_counts_share_transaction_in_autocommit(
+        user, category, monkeypatch):
+    """Проверяет, что ошибка обновления счётчиков откатывает сохранение
+    и удаление объявления, сделанные вне transaction.atomic()."""
+
+    ad = Ad.objects.create(title='Книга', description='...', user=user,
+                           category=category, condition='new')
+
+    def fail(*args, **kwargs):
+        raise RuntimeError('counter update failed')
+
+    monkeypatch.setattr(AdFacetCount.objects, 'apply', fail)
+    with pytest.raises(RuntimeError):
+        Ad.objects.create(title='Журнал', description='...', user=user,
+                          category=category, condition='new')
+    ad.condition = 'used'
+    with pytest.raises(RuntimeError):
+        ad.save()
+    with pytest.raises(RuntimeError):
+        Ad.objects.get(pk=ad.pk).delete()
+
+    assert list(Ad.objects.values_list('title', 'condition')) == [
+        ('Книга', 'new')
+    ]
+    assert list(AdFacetCount.objects.values_list(
+        'category_id', 'condition', 'count'
+    )) == [(category.id, 'new', 1)]
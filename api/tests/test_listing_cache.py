@@ -0,0 +1,85 @@
+import pytest
+from django.core.cache import cache
+
+from ads.models import Ad
+from api.cache import ListingCache
+
+
+@pytest.mark.django_db
+def test_anonymous_listing_is_cached(api_client, ads, count_queries):
+    """Проверяет, что повторный анонимный запрос не обращается к БД,
+    а порядок параметров не влияет на ключ."""
+
+    count_queries(api_client, '/api/ads/', {'condition': 'new', 'limit': 1})
+    queries, response = count_queries(
+        api_client, '/api/ads/', {'limit': 1, 'condition': 'new'}
+    )
+    assert queries == 0
+    assert response.data['count'] == 2
+
+
+@pytest.mark.django_db
+def test_listing_invalidated_by_category(
+        api_client, ads, category, user, count_queries):
+    """Проверяет, что изменение объявления сбрасывает только списки
+    его категории и общие списки."""
+
+    books, games = {'category': category.title}, {'category': 'Игры'}
+    for params in (books, games, {}):
+        count_queries(api_client, '/api/ads/', params)
+
+    Ad.objects.create(
+        title='Повесть', description='...',
+        user=user, category=category, condition='used'
+    )
+
+    assert count_queries(api_client, '/api/ads/', games)[0] == 0
+    queries, response = count_queries(api_client, '/api/ads/', books)
+    assert queries > 0
+    assert response.data['count'] == 2
+    assert count_queries(api_client, '/api/ads/', {})[1].data['count'] == 3
+
+
+@pytest.mark.django_db
+def test_moving_ad_invalidates_old_category(
+        api_client, ads, other_category, count_queries):
+    """Проверяет сброс списка прежней категории при смене категории."""
+
+    book = Ad.objects.get(pk=ads[0].pk)
+    params = {'category': book.category.title}
+    count_queries(api_client, '/api/ads/', params)
+
+    book.category = other_category
+    book.save()
+    assert count_queries(api_client, '/api/ads/', params)[1].data['count'] == 0
+
+
+@pytest.mark.django_db
+def test_authenticated_listing_is_not_cached(auth_client, ads, count_queries):
+    """Проверяет, что авторизованные запросы идут мимо кэша ответов."""
+
+    count_queries(auth_client, '/api/ads/', {})
+    assert count_queries(auth_client, '/api/ads/', {})[0] > 0
+
+
+def test_stale_entry_served_while_locked():
+    """Проверяет, что при занятой блокировке отдаётся устаревшая запись,
+    а без записи — ожидание и построение без блокировки."""
+
+    listing = ListingCache(ttl=30, stale_ttl=30, lock_timeout=0.1, poll_interval=0.01)
+    calls = []
+
+    def build():
+        calls.append(1)
+        return {'data': len(calls)}
+
+    cache.set('stale', {'data': 'old', 'fresh_until': 0}, 60)
+    cache.add('stale:lock', 1, 60)
+    assert listing.get_or_build('stale', build)['data'] == 'old'
+    assert not calls
+
+    cache.add('missing:lock', 1, 60)
+    assert listing.get_or_build('missing', build)['data'] == 1
+
+    assert listing.get_or_build('fresh', build)['data'] == 2
+    assert listing.get_or_build('fresh', build)['data'] == 2
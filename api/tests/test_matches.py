@@ -0,0 +1,121 @@
+import pytest
+
+from ads.matches import MatchIndex
+from ads.models import Ad, Category, ExchangeProposal
+from users.models import User
+
+
+@pytest.fixture
+def catalogue(user, another_user, category):
+    """Создаёт объявление user и объявления-кандидаты another_user."""
+
+    phones = Category.objects.create(title='Смартфоны', description='...')
+
+    def ad(title, owner, condition='new', ad_category=category):
+        return Ad.objects.create(
+            title=title, description='...', user=owner,
+            category=ad_category, condition=condition
+        )
+
+    own = ad('Мой роман', user)
+    ads = {
+        'own': own,
+        'own_other': ad('Мой сборник', user),
+        'same': ad('Повесть', another_user),
+        'used': ad('Словарь', another_user, condition='used'),
+        'phone': ad('Телефон', another_user, ad_category=phones),
+        'proposed': ad('Поэма', another_user),
+    }
+    ExchangeProposal.objects.create(ad_sender=own, ad_receiver=ads['proposed'])
+    return ads
+
+
+def titles(response):
+    """Заголовки объявлений из ответа подбора."""
+
+    return [ad['title'] for ad in response.data]
+
+
+@pytest.mark.django_db
+def test_matches_ranking_and_exclusions(auth_client, catalogue):
+    """Проверяет ранжирование кандидатов и исключение своих объявлений
+    и объявлений, на которые уже отправлено предложение."""
+
+    response = auth_client.get(f"/api/ads/{catalogue['own'].id}/matches/")
+
+    assert response.status_code == 200
+    assert titles(response) == ['Повесть', 'Словарь']
+    assert response.data[0]['score'] > response.data[1]['score']
+
+
+@pytest.mark.django_db
+def test_matches_follow_history_and_changes(
+        auth_client, another_user, catalogue, settings):
+    """Проверяет учёт истории предложений между категориями
+    и инкрементальное обновление индекса."""
+
+    url = f"/api/ads/{catalogue['own'].id}/matches/"
+    assert 'Телефон' not in titles(auth_client.get(url))
+
+    settings.MATCH_AFFINITY_TTL = 0
+    reader = User.objects.create_user(username='reader', password='12345678')
+    ExchangeProposal.objects.create(
+        ad_sender=Ad.objects.create(
+            title='Сказки', description='...', user=reader,
+            category=catalogue['own'].category, condition='used'
+        ),
+        ad_receiver=catalogue['phone'],
+    )
+    Ad.objects.create(
+        title='Новая повесть', description='...', user=another_user,
+        category=catalogue['own'].category, condition='new'
+    )
+    catalogue['same'].delete()
+
+    assert titles(auth_client.get(url)) == [
+        'Новая повесть', 'Сказки', 'Словарь', 'Телефон'
+    ]
+
+
+@pytest.mark.django_db
+def test_matches_only_for_owner(another_auth_client, catalogue):
+    """Проверяет, что подбор доступен только автору объявления."""
+
+    response = another_auth_client.get(f"/api/ads/{catalogue['own'].id}/matches/")
+    assert response.status_code == 403
+
+
+@pytest.mark.django_db
+def test_matches_skip_ads_from_any_user_proposal(
+        auth_client, another_user, catalogue):
+    """Проверяет, что исключаются объявления из всех предложений
+    пользователя: отправленных с других его объявлений и входящих."""
+
+    ExchangeProposal.objects.create(
+        ad_sender=catalogue['own_other'], ad_receiver=catalogue['same']
+    )
+    ExchangeProposal.objects.create(
+        ad_sender=catalogue['used'], ad_receiver=catalogue['own_other']
+    )
+
+    response = auth_client.get(f"/api/ads/{catalogue['own'].id}/matches/")
+    assert titles(response) == []
+
+
+@pytest.mark.django_db
+def test_matches_drop_ads_deleted_in_another_process(catalogue, settings):
+    """Проверяет, что индекс другого процесса, уже видевший объявление,
+    перестаёт предлагать его после удаления."""
+
+    settings.MATCH_SYNC_OVERLAP = 0
+    other_worker = MatchIndex()
+    own, deleted_id = catalogue['own'], catalogue['same'].id
+    assert deleted_id in {
+        ad_id for _, ad_id in other_worker.candidates(own, set(), 10)
+    }
+
+    catalogue['same'].delete()
+
+    assert deleted_id not in {
+        ad_id for _, ad_id in other_worker.candidates(own, set(), 10)
+    }
@@ -0,0 +1,119 @@
+import os
+
+import pytest
+from rest_framework.test import APIClient
+
+from api.metrics import Metrics, MmapStore
+
+
+def samples(text):
+    return dict(
+        line.rsplit(' ', 1) for line in text.splitlines()
+        if line and not line.startswith('#')
+    )
+
+
+@pytest.mark.django_db
+def test_metrics_endpoint(auth_client, category):
+    """Проверяет счётчики, гистограмму и метки обработчиков."""
+
+    auth_client.get('/api/ads/')
+    auth_client.get('/api/ads/')
+    auth_client.get('/api/ads/100500/')
+    auth_client.get('/api/no-such-page/')
+
+    response = APIClient().get('/metrics')
+    assert response.status_code == 200
+    assert response['Content-Type'].startswith('text/plain; version=0.0.4')
+    values = samples(response.content.decode())
+    assert values[
+        'http_requests_total{method="GET",status="200",view="AdViewSet.list"}'
+    ] == '2'
+    assert values[
+        'http_requests_total{method="GET",status="404",view="AdViewSet.retrieve"}'
+    ] == '1'
+    assert values[
+        'http_requests_total{method="GET",status="404",view="unmatched"}'
+    ] == '1'
+    assert values[
+        'http_request_duration_seconds_bucket{le="+Inf",view="AdViewSet.list"}'
+    ] == '2'
+    assert values['http_request_duration_seconds_count{view="AdViewSet.list"}'] == '2'
+    assert int(values['http_request_db_queries_total{view="AdViewSet.list"}']) > 0
+
+
+def test_metrics_aggregate_workers(metrics_dir):
+    """Проверяет суммирование файлов нескольких воркеров и рост файла."""
+
+    first = MmapStore(f'{metrics_dir}/metrics_1.db')
+    second = MmapStore(f'{metrics_dir}/metrics_2.db')
+    key = Metrics.key('http_requests_total', view='AdViewSet.list')
+    first.inc(key)
+    second.inc(key, 2)
+    for number in range(5000):
+        second.inc(Metrics.key('http_request_errors_total', view=f'View{number}'))
+    assert Metrics().collect()[key] == 3
+    assert len(MmapStore.read(f'{metrics_dir}/metrics_2.db')) == 5001
+
+    reopened = MmapStore(f'{metrics_dir}/metrics_1.db')
+    reopened.inc(key)
+    assert Metrics().collect()[key] == 4
+
+
+def test_metrics_histogram_cumulative(metrics_dir):
+    """Проверяет накопительные бакеты и экранирование меток."""
+
+    metrics = Metrics()
+    for duration in (0.001, 0.2, 30):
+        metrics.observe_request('View "a"', 'GET', 500, duration, 1, 0.001)
+    values = samples(metrics.render())
+    assert values['http_request_duration_seconds_bucket{le="0.005",view="View \\"a\\""}'] == '1'
+    assert values['http_request_duration_seconds_bucket{le="0.25",view="View \\"a\\""}'] == '2'
+    assert values['http_request_duration_seconds_bucket{le="10.0",view="View \\"a\\""}'] == '2'
+    assert values['http_request_duration_seconds_bucket{le="+Inf",view="View \\"a\\""}'] == '3'
+    assert values['http_request_errors_total{view="View \\"a\\""}'] == '3'
+
+
+@pytest.mark.django_db
+def test_token_cache_metrics(auth_client):
+    """Проверяет попадания, промахи и размер кэша токенов в /metrics."""
+
+    auth_client.get('/api/me/')
+    auth_client.get('/api/me/')
+    auth_client.get('/api/me/')
+
+    values = samples(APIClient().get('/metrics').content.decode())
+    assert values['auth_token_cache_hits_total'] == '2'
+    assert values['auth_token_cache_misses_total'] == '1'
+    assert values['auth_token_cache_entries'] == '1'
+
+
+def test_gauges_skip_finished_workers(metrics_dir):
+    """Проверяет, что gauge завершившегося воркера не входит в сумму,
+    а его счётчики остаются."""
+
+    MmapStore(f'{metrics_dir}/metrics_{os.getpid()}.db').set(
+        Metrics.key('auth_token_cache_entries'), 3
+    )
+    finished = MmapStore(f'{metrics_dir}/metrics_99999999.db')
+    finished.set(Metrics.key('auth_token_cache_entries'), 5)
+    finished.set(Metrics.key('auth_token_cache_hits_total'), 7)
+
+    values = Metrics().collect()
+    assert values[Metrics.key('auth_token_cache_entries')] == 3
+    assert values[Metrics.key('auth_token_cache_hits_total')] == 7
+
+
+def test_metrics_through_gateway_host(settings):
+    """Проверяет, что шлюз передаёт в /metrics исходный заголовок Host:
+    запрос с адресом из ALLOWED_HOSTS отдаётся, а с адресом бэкенда
+    внутри сети Docker отклоняется."""
+
+    conf = (settings.BASE_DIR / 'nginx.conf').read_text()
+    block = conf.split('location /metrics {')[1].split('}')[0]
+    assert 'proxy_set_header Host $http_host;' in block
+
+    response = APIClient().get('/metrics', HTTP_HOST='127.0.0.1:8000')
+    assert response.status_code == 200
+    response = APIClient().get('/metrics', HTTP_HOST='backend:8000')
+    assert response.status_code == 400
@@ -0,0 +1,134 @@
+import pytest
+from django.db import connection
+from django.utils import timezone
+
+from ads.models import Ad
+
+
+@pytest.fixture
+def many_ads(user, category):
+    """Создаёт 7 объявлений, часть — с одинаковой датой публикации."""
+
+    ads = [
+        Ad.objects.create(
+            title=f'Объявление {i}', description='...', user=user,
+            category=category, condition='new' if i % 2 else 'used'
+        )
+        for i in range(7)
+    ]
+    Ad.objects.filter(pk__in=[ad.pk for ad in ads[2:5]]).update(
+        created_at=timezone.now()
+    )
+    return ads
+
+
+def walk_pages(client, url, params):
+    """Проходит все страницы по ссылкам next и возвращает id объектов."""
+
+    ids = []
+    response = client.get(url, params)
+    while True:
+        assert response.status_code == 200
+        assert 'count' not in response.data
+        ids.extend(item['id'] for item in response.data['results'])
+        if not response.data['next']:
+            return ids, response
+        response = client.get(response.data['next'])
+
+
+@pytest.mark.django_db
+def test_cursor_pagination_is_stable(api_client, many_ads):
+    """Проверяет, что курсорная пагинация обходит все объявления
+    без пропусков и повторов при одинаковой дате публикации."""
+
+    ids, _ = walk_pages(api_client, '/api/ads/', {'cursor': '', 'limit': 2})
+    expected = list(
+        Ad.objects.order_by('-created_at', '-id').values_list('id', flat=True)
+    )
+    assert ids == expected
+
+
+@pytest.mark.django_db
+def test_cursor_pagination_previous_link(api_client, many_ads):
+    """Проверяет возврат на предыдущую страницу по ссылке previous."""
+
+    first = api_client.get('/api/ads/', {'cursor': '', 'limit': 3})
+    assert first.data['previous'] is None
+    second = api_client.get(first.data['next'])
+    back = api_client.get(second.data['previous'])
+    assert back.data['results'] == first.data['results']
+
+
+@pytest.mark.django_db
+def test_cursor_pagination_with_filter(api_client, many_ads):
+    """Проверяет совместную работу курсорной пагинации и фильтра."""
+
+    ids, _ = walk_pages(
+        api_client, '/api/ads/', {'cursor': '', 'limit': 2, 'condition': 'used'}
+    )
+    assert sorted(ids) == sorted(ad.id for ad in many_ads if ad.condition == 'used')
+
+
+@pytest.mark.django_db
+def test_invalid_cursor(api_client, many_ads):
+    """Проверяет ответ 404 на повреждённый курсор."""
+
+    response = api_client.get('/api/ads/', {'cursor': 'broken'})
+    assert response.status_code == 404
+
+
+@pytest.mark.django_db
+def test_offset_pagination_is_default(api_client, many_ads):
+    """Проверяет, что без параметра cursor используется limit/offset."""
+
+    response = api_client.get('/api/ads/', {'limit': 2, 'offset': 2})
+    assert response.status_code == 200
+    assert response.data['count'] == len(many_ads)
+    assert len(response.data['results']) == 2
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('ordering, order_by', [
+    ('newest', ('-created_at', '-id')),
+    ('oldest', ('created_at', 'id')),
+    ('title', ('title', 'id')),
+])
+def test_ordering_choices(api_client, many_ads, ordering, order_by):
+    """Проверяет сортировку в обоих режимах пагинации."""
+
+    expected = list(Ad.objects.order_by(*order_by).values_list('id', flat=True))
+    ids, _ = walk_pages(
+        api_client, '/api/ads/', {'cursor': '', 'limit': 3, 'ordering': ordering}
+    )
+    assert ids == expected
+
+    response = api_client.get('/api/ads/', {'ordering': ordering, 'limit': 10})
+    assert [ad['id'] for ad in response.data['results']] == expected
+
+
+@pytest.mark.django_db
+def test_invalid_ordering(api_client, many_ads):
+    """Проверяет ответ 400 на неизвестный вариант сортировки."""
+
+    response = api_client.get('/api/ads/', {'ordering': 'price'})
+    assert response.status_code == 400
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('filters, index', [
+    ({}, 'ad_title_idx'),
+    ({'category': True}, 'ad_category_title_idx'),
+    ({'condition': 'used'}, 'ad_condition_title_idx'),
+    ({'category': True, 'condition': 'used'}, 'ad_cat_cond_title_idx'),
+])
+def test_title_ordering_uses_index(many_ads, category, filters, index):
+    """Проверяет, что сортировка по названию с фильтрами по категории
+    и состоянию читается по индексу без сортировки в памяти."""
+
+    if connection.vendor != 'sqlite':
+        pytest.skip('план запроса проверяется на SQLite')
+    if filters.pop('category', False):
+        filters['category'] = category
+    plan = Ad.objects.filter(**filters).order_by('title', 'id')[:20].explain()
+    assert index in plan
+    assert 'TEMP B-TREE' not in plan
@@ -0,0 +1,111 @@
+import json
+import logging
+
+import pytest
+from asgiref.sync import async_to_sync
+from django.test import AsyncClient
+from rest_framework.authtoken.models import Token
+from rest_framework.serializers import BaseSerializer, Serializer
+from rest_framework.test import APIClient
+
+from ads.models import Ad
+from api.perf import normalize_sql
+
+
+def server_timing(response):
+    return {
+        metric.split(';')[0]: metric
+        for metric in response['Server-Timing'].split(', ')
+    }
+
+
+@pytest.mark.django_db
+def test_server_timing_header(auth_client, user, category):
+    """Проверяет метрики Server-Timing: SQL, аутентификация, сериализация."""
+
+    Ad.objects.create(
+        user=user, title='Книга', description='...',
+        category=category, condition='new',
+    )
+    auth_client.get('/api/ads/')
+    metrics = server_timing(auth_client.get('/api/ads/'))
+    assert metrics.keys() >= {'db', 'auth', 'serialize', 'render', 'total'}
+    assert 'desc="2 queries"' in metrics['db']
+
+    metrics = server_timing(auth_client.post('/api/ads/', {
+        'title': 'Новая книга', 'description': '...',
+        'category': category.id, 'condition': 'new',
+    }))
+    assert 'validate' in metrics
+
+
+@pytest.mark.django_db
+def test_server_timing_under_asgi(auth_client, user, category):
+    """Проверяет ответы и замеры SQL и аутентификации, когда те же
+    эндпоинты обслуживает ASGI-обработчик (асинхронная цепочка
+    middleware, вьюха в потоке)."""
+
+    Ad.objects.create(
+        user=user, title='Книга', description='...',
+        category=category, condition='new',
+    )
+    token, _ = Token.objects.get_or_create(user=user)
+    get = async_to_sync(AsyncClient().get)
+
+    response = get('/api/ads/', headers={'Authorization': f'Token {token.key}'})
+    assert response.status_code == 200
+    assert response.json() == auth_client.get('/api/ads/').json()
+    metrics = server_timing(response)
+    assert 'auth' in metrics
+    assert 'desc="0 queries"' not in metrics['db']
+
+    response = get('/api/proposals/')
+    assert response.status_code == 401
+    assert response['WWW-Authenticate'] == 'Token'
+
+
+@pytest.mark.django_db
+def test_slow_request_log(auth_client, user, category, settings, caplog):
+    """Проверяет запись медленного запроса с нормализованным SQL."""
+
+    settings.SLOW_REQUEST_MS = 0
+    with caplog.at_level(logging.WARNING, logger='api.perf'):
+        auth_client.get(f'/api/ads/?category={category.title}&limit=3')
+    entry = json.loads(caplog.records[-1].getMessage())
+    assert entry['event'] == 'slow_request'
+    assert entry['view'] == 'AdViewSet.list'
+    assert entry['queries'] == sum(query['count'] for query in entry['top_queries'])
+    assert all('3' not in query['sql'] for query in entry['top_queries'])
+
+
+@pytest.mark.django_db
+def test_perf_timing_disabled(settings):
+    """Проверяет, что выключенный middleware не добавляет заголовок."""
+
+    settings.PERF_TIMING_ENABLED = False
+    assert 'Server-Timing' not in APIClient().get('/api/categories/')
+
+
+def test_normalize_sql():
+    """Проверяет свёртку списков IN и замену литералов."""
+
+    assert normalize_sql(
+        'SELECT "t1"."id" FROM "t1"  WHERE "t1"."id" IN (%s, %s, %s)\n'
+        "AND \"t1\".\"title\" = 'a''b' LIMIT 21"
+    ) == (
+        'SELECT "t1"."id" FROM "t1" WHERE "t1"."id" IN (...) '
+        'AND "t1"."title" = ? LIMIT ?'
+    )
+
+
+@pytest.mark.django_db
+def test_serializer_phases_without_patching(auth_client, category):
+    """Проверяет, что фазы отмечают вьюхи, а классы сериализаторов
+    DRF остаются без изменений."""
+
+    metrics = server_timing(auth_client.post('/api/saved-searches/', {
+        'category': category.id,
+    }))
+    assert {'validate', 'serialize'} <= metrics.keys()
+    assert Serializer.data.fget.__module__ == 'rest_framework.serializers'
+    assert BaseSerializer.is_valid.__module__ == 'rest_framework.serializers'
@@ -0,0 +1,40 @@
+import pytest
+
+# Бюджет запросов к БД для каждого эндпоинта на чтение:
+# (клиент, url, максимальное число запросов).
+# Замер выполняется после прогревочного запроса, поэтому
+# токен-авторизация берётся из кэша и запросов не добавляет.
+QUERY_BUDGETS = [
+    ('api_client', '/api/ads/', 2),
+    ('api_client', '/api/ads/{ad_id}/', 1),
+    ('api_client', '/api/categories/', 0),
+    ('auth_client', '/api/ads/', 2),
+    ('auth_client', '/api/ads/?facets=true', 3),
+    ('auth_client', '/api/proposals/', 2),
+    ('auth_client', '/api/proposals/{proposal_id}/', 1),
+    ('api_client', '/api/ads/?cursor=', 1),
+    ('auth_client', '/api/proposals/?cursor=', 1),
+]
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('client_name, url, budget', QUERY_BUDGETS)
+def test_read_endpoints_query_budget(
+        request, client_name, url, budget, exchange_history, count_queries):
+    """Проверяет, что эндпоинты на чтение укладываются в бюджет запросов
+    и число запросов не зависит от размера страницы."""
+
+    client = request.getfixturevalue(client_name)
+    url = url.format(
+        ad_id=exchange_history.ad_sender_id, proposal_id=exchange_history.id
+    )
+    separator = '&' if '?' in url else '?'
+
+    client.get(url)
+    small_page, _ = count_queries(client, f'{url}{separator}limit=1')
+    large_page, _ = count_queries(client, f'{url}{separator}limit=20')
+
+    assert large_page <= budget, (
+        f'{url}: {large_page} запросов при бюджете {budget}'
+    )
+    assert small_page == large_page
@@ -0,0 +1,58 @@
+import pytest
+
+from ads.models import Ad
+
+
+@pytest.mark.django_db
+def test_saved_search_feed(
+        auth_client, another_auth_client, category,
+        django_capture_on_commit_callbacks):
+    """Проверяет попадание новых подходящих объявлений в ленту,
+    включая пакетное создание."""
+
+    response = auth_client.post(
+        '/api/saved-searches/', {'category': category.id, 'keywords': 'велосипед'}
+    )
+    assert response.status_code == 201
+
+    with django_capture_on_commit_callbacks(execute=True):
+        another_auth_client.post('/api/ads/', {
+            'title': 'Горный велосипед', 'description': '...',
+            'category': category.id, 'condition': 'used',
+        })
+        another_auth_client.post('/api/ads/', {
+            'title': 'Самокат', 'description': '...',
+            'category': category.id, 'condition': 'new',
+        })
+        another_auth_client.post('/api/ads/batch/', [{
+            'title': 'Детский велосипед', 'description': '...',
+            'category': category.id, 'condition': 'new',
+        }], format='json')
+        auth_client.post('/api/ads/', {
+            'title': 'Мой велосипед', 'description': '...',
+            'category': category.id, 'condition': 'new',
+        })
+
+    response = auth_client.get('/api/saved-searches/feed/')
+    assert response.status_code == 200
+    assert [match['ad']['title'] for match in response.data['results']] == [
+        'Детский велосипед', 'Горный велосипед'
+    ]
+
+    Ad.objects.get(title='Горный велосипед').delete()
+    assert auth_client.get('/api/saved-searches/feed/').data['count'] == 1
+
+
+@pytest.mark.django_db
+def test_saved_search_validation(auth_client, another_auth_client):
+    """Проверяет отказ для пустого поиска и видимость только своих поисков."""
+
+    response = auth_client.post('/api/saved-searches/', {'keywords': 'и'})
+    assert response.status_code == 400
+
+    search_id = auth_client.post(
+        '/api/saved-searches/', {'condition': 'new'}
+    ).data['id']
+    assert another_auth_client.get('/api/saved-searches/').data['count'] == 0
+    response = another_auth_client.delete(f'/api/saved-searches/{search_id}/')
+    assert response.status_code == 404
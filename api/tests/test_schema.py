@@ -0,0 +1,29 @@
+import pytest
+from drf_spectacular.generators import SchemaGenerator
+
+
+@pytest.fixture(scope='module')
+def schema():
+    """OpenAPI-схема API, как её отдаёт drf-spectacular."""
+
+    return SchemaGenerator().get_schema(request=None, public=True)
+
+
+@pytest.mark.parametrize('path, method, summary', [
+    ('/api/proposals/export/', 'get', 'Выгрузка своих предложений обмена.'),
+    ('/api/proposals/cycles/', 'get', 'Предлагаемые многосторонние обмены.'),
+    ('/api/proposals/bulk-status/', 'post',
+     'Массовая смена статуса входящих предложений.'),
+])
+def test_proposal_action_summaries(schema, path, method, summary):
+    """Проверяет, что описание схемы относится к своему действию."""
+
+    assert schema['paths'][path][method]['summary'] == summary
+
+
+def test_bulk_status_response_schema(schema):
+    """Проверяет схему ответа массовой смены статуса."""
+
+    response = schema['paths']['/api/proposals/bulk-status/']['post'][
+        'responses']['200']['content']['application/json']['schema']
+    assert response == {'$ref': '#/components/schemas/proposal_bulk_status_response'}
@@ -4,7 +4,8 @@ from django.urls import include, path
 from rest_framework.routers import DefaultRouter
 
 from .views import (AdViewSet, CategoryViewSet, ExchangeProposalViewSet,
-                    LoginView, LogoutView, MeView, RegistrationView)
+                    LoginView, LogoutView, MeView, RegistrationView,
+                    SavedSearchViewSet)
 
 app_name = 'api'
 
@@ -14,6 +15,7 @@ router_v1 = DefaultRouter()
 router_v1.register('ads', AdViewSet, basename='ads')
 router_v1.register('categories', CategoryViewSet, basename='categories')
 router_v1.register('proposals', ExchangeProposalViewSet, basename='proposals')
+router_v1.register('saved-searches', SavedSearchViewSet, basename='saved-searches')
 
 urlpatterns = [
     path('', include(router_v1.urls)),
@@ -1,24 +1,43 @@
-from django.db.models import Q
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import Count, Q
+from django.http import Http404
+from django.utils import timezone
+from django.utils.cache import get_conditional_response
+from django.utils.http import parse_http_date_safe
 from django_filters.rest_framework import DjangoFilterBackend
+from drf_spectacular.types import OpenApiTypes
 from drf_spectacular.utils import extend_schema, extend_schema_view, inline_serializer
 
 from rest_framework import viewsets, generics, status, serializers, permissions
 from rest_framework.authtoken.models import Token
-from rest_framework.filters import SearchFilter
+from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
 from rest_framework.permissions import IsAuthenticated, AllowAny
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
+from ads import choices as chcs
 from ads import models
+from ads.barter import barter_index
+from ads.cache import category_cache
+from ads.export import AD_EXPORT_FIELDS, PROPOSAL_EXPORT_FIELDS
+from ads.matches import match_index
 from api import serializers as srlzs
-from api.filters import AdFilter, ExchangeProposalFilter
+from api.cache import invalidate_listing, listing_cache
+from api.mixins import (ConditionalGetMixin, StreamingExportMixin,
+                        TimedSerializationMixin, make_etag)
+from api.filters import (AdFilter, AdSearchFilter, ChoiceOrderingFilter,
+                         ExchangeProposalFilter)
+from api.pagination import CursorOrOffsetPagination
+from api.perf import serialize, validate
 
 
 @extend_schema(
     tags=[('Пользователи')],
     summary=('Регистрация пользователя'),
 )
-class RegistrationView(generics.CreateAPIView):
+class RegistrationView(TimedSerializationMixin, generics.CreateAPIView):
     """Регистрация пользователя в системе.
     Требуется отправить логин, почту и пароль."""
 
@@ -41,7 +60,7 @@ class LoginView(APIView):
 
     def post(self, request):
         serializer = srlzs.UserLoginSerializer(data=request.data)
-        serializer.is_valid(raise_exception=True)
+        validate(serializer)
         user = serializer.validated_data['user']
         token, _ = Token.objects.get_or_create(user=user)
         return Response({'token': token.key})
@@ -58,7 +77,7 @@ class LogoutView(APIView):
     permission_classes = (IsAuthenticated,)
 
     def post(self, request):
-        request.user.auth_token.delete()
+        request.auth.delete()
         return Response(
             {'message': 'Выход выполнен'}, status=status.HTTP_200_OK
         )
@@ -100,7 +119,11 @@ class MeView(APIView):
     ),
     list=extend_schema(
         summary='Просмотр списка объявлений.',
-        description='Возвращает список объектов объявлений.',
+        description=('Возвращает список объектов объявлений.<br>'
+                     'С параметром facets=true в ответ добавляется поле '
+                     'facets: число объявлений по категориям (с учётом '
+                     'остальных фильтров) и по состояниям.'),
+        parameters=[srlzs.AdListQuerySerializer],
     ),
     create=extend_schema(
         summary='Создание объявления (Доступно только авторизованному пользователю).',
@@ -115,15 +138,24 @@ class MeView(APIView):
         description='Удаляет объект объявления по id.',
     ),
 )
-class AdViewSet(viewsets.ModelViewSet):
+class AdViewSet(ConditionalGetMixin, TimedSerializationMixin, StreamingExportMixin,
+                viewsets.ModelViewSet):
     """Вьюсет для работы с объектами модели Ad.
     Методы POST, GET, PATCH, DELETE."""
 
     http_method_names = ['get', 'post', 'patch', 'delete']
-    filter_backends = [DjangoFilterBackend, SearchFilter]
-    search_fields = ['title', 'description']
+    filter_backends = [DjangoFilterBackend, AdSearchFilter, ChoiceOrderingFilter]
     filterset_class = AdFilter
-    queryset = models.Ad.objects.all()
+    ordering_choices = {
+        'newest': ('-created_at', '-id'),
+        'oldest': ('created_at', 'id'),
+        'title': ('title', 'id'),
+    }
+    default_ordering = 'newest'
+    pagination_class = CursorOrOffsetPagination
+    queryset = models.Ad.objects.select_related('user', 'category')
+    export_fields = AD_EXPORT_FIELDS
+    export_name = 'ads'
 
     def get_serializer_class(self):
         if self.action in ('list', 'retrieve'):
@@ -136,7 +168,268 @@ class AdViewSet(viewsets.ModelViewSet):
         return super().get_permissions()
 
     def perform_create(self, serializer):
-        serializer.save(user=self.request.user)
+        """Сохраняет объявление; счётчики AdFacetCount обновляются
+        сигналом в той же транзакции."""
+
+        with transaction.atomic():
+            serializer.save(user=self.request.user)
+
+    def perform_update(self, serializer):
+        with transaction.atomic():
+            serializer.save()
+
+    def perform_destroy(self, instance):
+        with transaction.atomic():
+            instance.delete()
+
+    @extend_schema(
+        summary='Пакетное создание объявлений (Доступно только авторизованному пользователю).',
+        description=('Принимает непустой список объявлений (не больше ADS_BATCH_MAX_SIZE).<br>'
+                     'Корректные объявления создаются, для остальных '
+                     'возвращаются ошибки с индексом в списке.'),
+        request=srlzs.AdBatchItemSerializer(many=True),
+        responses={
+            201: inline_serializer(
+                name='ad_batch_response',
+                fields={
+                    'created': srlzs.AdReadSerializer(many=True),
+                    'errors': serializers.ListField(
+                        child=serializers.DictField()
+                    ),
+                },
+            ),
+        },
+    )
+    @action(detail=False, methods=['post'])
+    def batch(self, request):
+        """Пакетное создание: категории берутся из category_cache,
+        заголовки проверяются одним запросом, вставка — bulk_create.
+        Сигналы post_save не отправляются, поэтому счётчики, кэш
+        списков и сохранённые поиски обновляются здесь."""
+
+        items = request.data
+        if not isinstance(items, list):
+            raise ValidationError({'detail': 'Ожидается список объявлений.'})
+        if not items:
+            raise ValidationError({'detail': 'Список объявлений пуст.'})
+        if len(items) > settings.ADS_BATCH_MAX_SIZE:
+            raise ValidationError({'detail': (
+                f'Можно создать не больше {settings.ADS_BATCH_MAX_SIZE} '
+                f'объявлений за запрос.'
+            )})
+
+        categories = {category.id: category for category in category_cache.all()}
+        valid, errors = {}, []
+        for index, item in enumerate(items):
+            serializer = srlzs.AdBatchItemSerializer(
+                data=item, context={'categories': categories}
+            )
+            if serializer.is_valid():
+                valid[index] = serializer.validated_data
+            else:
+                errors.append({'index': index, 'errors': serializer.errors})
+
+        created = self.create_batch(valid, errors)
+        if created:
+            invalidate_listing(*{ad.category_id for ad in created})
+            models.percolate_on_commit(created)
+        errors.sort(key=lambda error: error['index'])
+        return Response(
+            {
+                'created': serialize(srlzs.AdReadSerializer(
+                    created, many=True, context=self.get_serializer_context()
+                )),
+                'errors': errors,
+            },
+            status=status.HTTP_201_CREATED if created else status.HTTP_400_BAD_REQUEST,
+        )
+
+    def create_batch(self, valid, errors):
+        """Отбрасывает занятые заголовки и вставляет остальные объявления
+        вместе с обновлением счётчиков AdFacetCount в одной транзакции.
+        При гонке за заголовок (IntegrityError) проверка повторяется."""
+
+        for attempt in range(2):
+            valid = self.reject_taken_titles(valid, errors)
+            ads = [
+                models.Ad(user=self.request.user, **data)
+                for data in valid.values()
+            ]
+            try:
+                with transaction.atomic():
+                    created = models.Ad.objects.bulk_create(ads)
+                    models.AdFacetCount.objects.add_ads(created)
+                    return created
+            except IntegrityError:
+                if attempt:
+                    raise
+
+    @staticmethod
+    def reject_taken_titles(valid, errors):
+        field = models.Ad._meta.get_field('title')
+        message = field.error_messages['unique'] % {
+            'model_name': models.Ad._meta.verbose_name,
+            'field_label': field.verbose_name,
+        }
+        taken = set(models.Ad.objects.filter(
+            title__in=[data['title'] for data in valid.values()]
+        ).values_list('title', flat=True))
+
+        accepted = {}
+        for index, data in valid.items():
+            if data['title'] in taken:
+                errors.append({'index': index, 'errors': {'title': [message]}})
+            else:
+                taken.add(data['title'])
+                accepted[index] = data
+        return accepted
+
+    @extend_schema(
+        summary='Возможные обмены для объявления (Доступно только автору).',
+        description=('Возвращает объявления других пользователей, с которыми '
+                     'у пользователя ещё нет предложений (входящих или '
+                     'исходящих, от любого его объявления), '
+                     'по убыванию оценки: близость категорий (та же категория '
+                     'и история предложений между категориями), состояние '
+                     'и свежесть.'),
+        parameters=[srlzs.LimitQuerySerializer],
+        responses=srlzs.AdMatchSerializer(many=True),
+    )
+    @action(detail=True, methods=['get'], filter_backends=[], pagination_class=None)
+    def matches(self, request, pk=None):
+        """Кандидаты из индекса match_index; из БД читаются только
+        итоговые объявления."""
+
+        ad = self.get_object()
+        if ad.user_id != request.user.id:
+            return Response(
+                {"detail": "Подбор доступен только автору объявления."},
+                status=status.HTTP_403_FORBIDDEN
+            )
+        query = srlzs.LimitQuerySerializer(data=request.query_params)
+        query.is_valid(raise_exception=True)
+        limit = query.validated_data['limit']
+
+        proposals = models.ExchangeProposal.objects.filter(
+            Q(sender_user=request.user) | Q(receiver_user=request.user)
+        ).values_list('ad_sender_id', 'ad_receiver_id')
+        exclude_ids = {
+            ad_id for pair in proposals for ad_id in pair
+        }
+        scored = match_index.candidates(ad, exclude_ids, 2 * limit)
+        found = self.get_queryset().in_bulk([ad_id for _, ad_id in scored])
+        matches = []
+        for score, ad_id in scored:
+            if ad_id in found and len(matches) < limit:
+                found[ad_id].match_score = round(score, 4)
+                matches.append(found[ad_id])
+        return Response(serialize(srlzs.AdMatchSerializer(
+            matches, many=True, context=self.get_serializer_context()
+        )))
+
+    @extend_schema(
+        summary='Выгрузка объявлений (Доступно только авторизованному пользователю).',
+        description=('Отдаёт все объявления, подходящие под фильтры списка, '
+                     'потоком в NDJSON или CSV (параметр output), без '
+                     'пагинации.'),
+        parameters=[srlzs.ExportQuerySerializer],
+        responses={
+            (200, 'application/x-ndjson'): OpenApiTypes.STR,
+            (200, 'text/csv'): OpenApiTypes.STR,
+        },
+    )
+    @action(detail=False, methods=['get'], pagination_class=None)
+    def export(self, request):
+        return self.stream_export(request)
+
+    def list(self, request, *args, **kwargs):
+        """Анонимные списки отдаются из кэша ответов listing_cache."""
+
+        if request.user.is_authenticated:
+            return super().list(request, *args, **kwargs)
+
+        entry = listing_cache.get_or_build(
+            listing_cache.make_key(request), self.build_listing
+        )
+        response = get_conditional_response(
+            request, etag=entry['etag'], last_modified=entry.get('last_modified')
+        )
+        if response is None:
+            response = Response(entry['data'])
+        return self.set_validators(
+            response, entry['etag'], entry.get('last_modified')
+        )
+
+    def build_listing(self):
+        response = self.render_list(self.filter_queryset(self.get_queryset()))
+        return {
+            'data': response.data,
+            'etag': response['ETag'],
+            'last_modified': parse_http_date_safe(response.get('Last-Modified')),
+        }
+
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        if self.action == 'list':
+            query = srlzs.AdListQuerySerializer(data=self.request.query_params)
+            query.is_valid(raise_exception=True)
+            self.facets = (
+                self.get_facets() if query.validated_data['facets'] else None
+            )
+        return queryset
+
+    def get_facets(self):
+        """Счётчики по категориям и состояниям для текущих фильтров.
+        Без поиска берутся из таблицы AdFacetCount, с поиском —
+        группировкой найденных объявлений."""
+
+        params = self.request.query_params
+        category = category_cache.get_by_title(params.get('category', ''))
+        rows = None
+        if params.get('search'):
+            rows = AdSearchFilter().filter_queryset(
+                self.request, models.Ad.objects.all(), self
+            ).order_by().values_list('category_id', 'condition').annotate(
+                count=Count('id')
+            )
+        categories, conditions = models.AdFacetCount.objects.facets(
+            category.id if category else None,
+            params.get('condition') or None,
+            rows,
+        )
+        return {
+            'category': [
+                {'id': item.id, 'title': item.title, 'count': categories[item.id]}
+                for item in category_cache.all()
+            ],
+            'condition': [
+                {'value': value, 'title': title, 'count': conditions[value]}
+                for value, title in chcs.AD_CONDITION_CHOICES
+            ],
+        }
+
+    def render_page(self, objects, paginated):
+        response = super().render_page(objects, paginated)
+        if self.facets is not None:
+            response.data['facets'] = self.facets
+        return response
+
+    def get_list_etag(self, objects, paginated):
+        etag = super().get_list_etag(objects, paginated)
+        if self.facets is None:
+            return etag
+        return make_etag(etag, self.facets)
+
+    def get_validator_queryset(self, queryset):
+        return queryset.select_related(None).only(
+            'id', 'title', 'created_at', 'updated_at'
+        )
+
+    def get_instance_version(self, instance):
+        return (instance.id, instance.updated_at)
+
+    def get_etag_extra(self):
+        return (category_cache.version,)
 
 
 @extend_schema(tags=['Категории объявлений'])
@@ -148,13 +441,33 @@ class AdViewSet(viewsets.ModelViewSet):
         summary='Просмотр списка категорий.',
     ),
 )
-class CategoryViewSet(viewsets.ReadOnlyModelViewSet):
-    """Вьюсет для чтения/получения категорий."""
+class CategoryViewSet(ConditionalGetMixin, TimedSerializationMixin,
+                      viewsets.ReadOnlyModelViewSet):
+    """Вьюсет для чтения/получения категорий.
+    Категории отдаются из кэша category_cache, ответы содержат ETag
+    по версии кэша (304 при совпадении If-None-Match)."""
 
     queryset = models.Category.objects.all()
     serializer_class = srlzs.CategorySerializer
     permission_classes = (permissions.AllowAny,)
 
+    def get_queryset(self):
+        return category_cache.all()
+
+    def get_object(self):
+        lookup = str(self.kwargs[self.lookup_url_kwarg or self.lookup_field])
+        category = category_cache.get(int(lookup)) if lookup.isdigit() else None
+        if category is None:
+            raise Http404
+        self.check_object_permissions(self.request, category)
+        return category
+
+    def get_validator_object(self):
+        return self.get_object()
+
+    def get_etag_extra(self):
+        return (category_cache.version,)
+
 
 @extend_schema(tags=['Предложения обмена'])
 @extend_schema_view(
@@ -174,41 +487,191 @@ class CategoryViewSet(viewsets.ReadOnlyModelViewSet):
     partial_update=extend_schema(
         summary='Частичное обновление предложения (Доступно только авторизованному автору).',
         description=('Частичное обновление объекта предложения по id: изменение статуса предложения (например, «принята» или «отклонена»<br>'
-                     'При этом изменить статус может только получатель предложения'),
+                     'При этом изменить статус может только получатель предложения.<br>'
+                     'При принятии остальные ожидающие предложения с теми же объявлениями отклоняются'),
     ),
     destroy=extend_schema(
         summary='Удаление предложения (Доступно только авторизованному автору).',
         description='Удаляет объект предложения по id.',
     ),
 )
-class ExchangeProposalViewSet(viewsets.ModelViewSet):
+class ExchangeProposalViewSet(ConditionalGetMixin, TimedSerializationMixin,
+                              StreamingExportMixin, viewsets.ModelViewSet):
     """Вьюсет для работы с объектами модели ExchangeProposal.
     Методы POST, GET, PATCH, DELETE."""
 
     http_method_names = ['get', 'post', 'patch', 'delete']
-    filter_backends = [DjangoFilterBackend]
+    filter_backends = [DjangoFilterBackend, ChoiceOrderingFilter]
     filterset_class = ExchangeProposalFilter
+    ordering_choices = {
+        'newest': ('-created_at', '-id'),
+        'oldest': ('created_at', 'id'),
+    }
+    default_ordering = 'newest'
+    pagination_class = CursorOrOffsetPagination
     queryset = models.ExchangeProposal.objects.none()
+    export_fields = PROPOSAL_EXPORT_FIELDS
+    export_name = 'proposals'
 
     def get_queryset(self):
         user = self.request.user
         return models.ExchangeProposal.objects.filter(
-            Q(ad_sender__user=user) | Q(ad_receiver__user=user)
+            Q(sender_user=user) | Q(receiver_user=user)
+        ).select_related(
+            'ad_sender__user',
+            'ad_sender__category',
+            'ad_receiver__user',
+            'ad_receiver__category',
+        )
+
+    def get_validator_queryset(self, queryset):
+        return queryset.select_related(None).select_related(
+            'ad_sender', 'ad_receiver'
+        ).only(
+            'id', 'created_at', 'updated_at',
+            'ad_sender__updated_at', 'ad_receiver__updated_at'
+        )
+
+    def get_instance_version(self, instance):
+        return (
+            instance.id,
+            instance.updated_at,
+            instance.ad_sender.updated_at,
+            instance.ad_receiver.updated_at,
         )
 
+    def get_etag_extra(self):
+        return (category_cache.version,)
+
     def get_serializer_class(self):
         if self.action in ('list', 'retrieve'):
             return srlzs.ProposalReadSerializer
         if self.action == 'partial_update':
             return srlzs.ProposalUpdateSerializer
+        if self.action == 'bulk_status':
+            return srlzs.ProposalBulkStatusSerializer
         return srlzs.ProposalCreateSerializer
 
+    @extend_schema(
+        summary='Выгрузка своих предложений обмена.',
+        description=('Отдаёт входящие и исходящие предложения пользователя, '
+                     'подходящие под фильтры списка, потоком в NDJSON или '
+                     'CSV (параметр output), без пагинации.'),
+        parameters=[srlzs.ExportQuerySerializer],
+        responses={
+            (200, 'application/x-ndjson'): OpenApiTypes.STR,
+            (200, 'text/csv'): OpenApiTypes.STR,
+        },
+    )
+    @action(detail=False, methods=['get'], pagination_class=None)
+    def export(self, request):
+        return self.stream_export(request)
+
+    @extend_schema(
+        summary='Предлагаемые многосторонние обмены.',
+        description=('Возвращает циклы ожидающих предложений через текущего '
+                     'пользователя: A хочет объявление B, B — объявление C, '
+                     'C — объявление A.<br>'
+                     'max_length — число участников (от 2 до '
+                     'BARTER_MAX_CYCLE_LENGTH), limit — число циклов.'),
+        parameters=[srlzs.BarterCycleQuerySerializer],
+        responses={
+            200: inline_serializer(
+                name='barter_cycle',
+                many=True,
+                fields={
+                    'length': serializers.IntegerField(),
+                    'proposals': srlzs.BarterCycleStepSerializer(many=True),
+                },
+            ),
+        },
+    )
+    @action(detail=False, methods=['get'], filter_backends=[], pagination_class=None)
+    def cycles(self, request):
+        """Циклы из графа barter_index (без полного чтения таблицы
+        предложений на запрос)."""
+
+        query = srlzs.BarterCycleQuerySerializer(data=request.query_params)
+        query.is_valid(raise_exception=True)
+        cycles = barter_index.find_cycles(
+            request.user.id,
+            query.validated_data.get(
+                'max_length', settings.BARTER_MAX_CYCLE_LENGTH
+            ),
+            query.validated_data['limit'],
+        )
+        return Response([
+            {
+                'length': len(cycle),
+                'proposals': serialize(
+                    srlzs.BarterCycleStepSerializer(cycle, many=True)
+                ),
+            }
+            for cycle in cycles
+        ])
+
+    @extend_schema(
+        summary='Массовая смена статуса входящих предложений.',
+        description=('Переводит ожидающие входящие предложения из списка ids '
+                     'в статус status одним UPDATE.<br>'
+                     'При принятии остальные ожидающие предложения с теми же '
+                     'объявлениями отклоняются.<br>'
+                     'Возвращает изменённые id (updated) и отклонённые '
+                     '(refused): чужие, несуществующие или уже обработанные.'),
+        responses={
+            200: inline_serializer(
+                name='proposal_bulk_status_response',
+                fields={
+                    'updated': serializers.ListField(
+                        child=serializers.IntegerField()
+                    ),
+                    'refused': serializers.ListField(
+                        child=serializers.IntegerField()
+                    ),
+                },
+            ),
+        },
+    )
+    @action(detail=False, methods=['post'], url_path='bulk-status')
+    def bulk_status(self, request):
+        """Меняет статус подходящих предложений одним условным
+        UPDATE ... RETURNING id (без предварительного SELECT). Принятие
+        идёт через ExchangeProposal.objects.approve (с отклонением
+        конфликтующих)."""
+
+        serializer = self.get_serializer(data=request.data)
+        validate(serializer)
+        ids = set(serializer.validated_data['ids'])
+        new_status = serializer.validated_data['status']
+        proposals = models.ExchangeProposal.objects.filter(
+            id__in=ids,
+            receiver_user=request.user,
+            status=chcs.Status.PENDING,
+        ).order_by('id')
+
+        if new_status == chcs.Status.APPROVED:
+            updated, _ = models.ExchangeProposal.objects.approve(
+                proposals.only('id', 'ad_sender_id', 'ad_receiver_id')
+            )
+            return Response({
+                'updated': updated,
+                'refused': sorted(ids.difference(updated)),
+            })
+
+        updated = models.ExchangeProposal.objects.update_returning_ids(
+            proposals, status=new_status, updated_at=timezone.now(),
+        )
+        return Response({
+            'updated': updated,
+            'refused': sorted(ids.difference(updated)),
+        })
+
     def partial_update(self, request, *args, **kwargs):
         """Менять статус может только получатель предложения."""
 
         instance = self.get_object()
 
-        if instance.ad_receiver.user != request.user:
+        if instance.receiver_user_id != request.user.id:
             return Response(
                 {"detail": "Вы можете менять статус только входящего предложения!"},
                 status=status.HTTP_403_FORBIDDEN
@@ -221,10 +684,67 @@ class ExchangeProposalViewSet(viewsets.ModelViewSet):
 
         instance = self.get_object()
 
-        if instance.ad_sender.user != request.user:
+        if instance.sender_user_id != request.user.id:
             return Response(
                 {"detail": "Удаление доступно только автору предложения."},
                 status=status.HTTP_403_FORBIDDEN
             )
 
         return super().destroy(request, *args, **kwargs)
+
+
+@extend_schema(tags=['Сохранённые поиски'])
+@extend_schema_view(
+    list=extend_schema(
+        summary='Просмотр списка сохранённых поисков.',
+        description='Возвращает сохранённые поиски текущего пользователя.',
+    ),
+    retrieve=extend_schema(
+        summary='Просмотр сохранённого поиска по id записи.',
+    ),
+    create=extend_schema(
+        summary='Сохранение поиска.',
+        description=('Сохраняет поиск по категории, состоянию и ключевым словам '
+                     '(нужно хотя бы одно условие).<br>'
+                     'Новые объявления, подходящие под поиск, попадают в ленту feed.'),
+    ),
+    destroy=extend_schema(
+        summary='Удаление сохранённого поиска.',
+    ),
+)
+class SavedSearchViewSet(TimedSerializationMixin, viewsets.ModelViewSet):
+    """Вьюсет сохранённых поисков пользователя и ленты совпадений.
+    Методы POST, GET, DELETE."""
+
+    http_method_names = ['get', 'post', 'delete']
+    filter_backends = [ChoiceOrderingFilter]
+    ordering_choices = {
+        'newest': ('-created_at', '-id'),
+        'oldest': ('created_at', 'id'),
+    }
+    default_ordering = 'newest'
+    pagination_class = CursorOrOffsetPagination
+    queryset = models.SavedSearch.objects.none()
+
+    def get_queryset(self):
+        if self.action == 'feed':
+            return models.SavedSearchMatch.objects.filter(
+                user=self.request.user
+            ).select_related('ad__user', 'ad__category')
+        return models.SavedSearch.objects.filter(user=self.request.user)
+
+    def get_serializer_class(self):
+        if self.action == 'feed':
+            return srlzs.SavedSearchMatchSerializer
+        return srlzs.SavedSearchSerializer
+
+    def perform_create(self, serializer):
+        serializer.save(user=self.request.user)
+
+    @extend_schema(
+        summary='Лента новых совпадений сохранённых поисков.',
+        description='Объявления, подошедшие под сохранённые поиски, от новых к старым.',
+    )
+    @action(detail=False, methods=['get'])
+    def feed(self, request):
+        return super().list(request)
@@ -1,6 +1,17 @@
 # acceptable types for images
 IMAGE_EXTENSIONS = ('jpg', 'jpeg', 'png')
 
+# widths of generated image renditions
+IMAGE_RENDITION_WIDTHS = (320, 640, 1280)
+
+# files removed per batch of the media cleanup queue
+MEDIA_CLEANUP_BATCH_SIZE = 500
+
+# delay before retrying a failed file deletion (seconds), doubled after
+# every failed attempt up to the maximum
+MEDIA_CLEANUP_RETRY_DELAY = 60
+MEDIA_CLEANUP_MAX_RETRY_DELAY = 24 * 60 * 60
+
 # max len CharField in models
 MAX_CHAR_LENGTH = 255
 MAX_CHOICES_LENGTH = 50
@@ -13,3 +24,32 @@ EMAIL_MAX_LENGTH = 50
 
 # nullable fields
 NULLABLE = {'null': True, 'blank': True}
+
+# max page size for cursor pagination
+MAX_PAGE_SIZE = 100
+
+# candidate index of ad matches: ads kept per category, categories
+# considered per ad, recency half-life in days
+MATCH_CANDIDATES_PER_CATEGORY = 200
+MATCH_CATEGORY_FANOUT = 5
+MATCH_RECENCY_HALF_LIFE_DAYS = 14
+
+# max saved searches per user
+MAX_SAVED_SEARCHES = 20
+
+# max proposal ids in one bulk status request
+MAX_BULK_STATUS_IDS = 500
+
+# rows read from the database and written out per chunk in exports
+EXPORT_CHUNK_SIZE = 2000
+
+# rows per batch of the bulk ad import
+IMPORT_BATCH_SIZE = 2000
+
+# worst SQL statements included in a slow request log entry
+SLOW_REQUEST_TOP_QUERIES = 5
+
+# upper bounds of the request latency histogram buckets (seconds)
+METRICS_LATENCY_BUCKETS = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0,
+)
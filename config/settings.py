@@ -38,6 +38,8 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'api.perf.PerformanceMiddleware',
+    'api.metrics.MetricsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -88,6 +90,23 @@ else:
     }
 
 
+# The cache is shared between gunicorn workers in the container:
+# the version stamps of the in-process caches (ads.cache) live here.
+if DOCKER:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+            'LOCATION': os.getenv('CACHE_LOCATION', '/tmp/barter_cache'),
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        }
+    }
+
+
 AUTH_PASSWORD_VALIDATORS = [
     {
         'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator',
@@ -131,12 +150,44 @@ REST_FRAMEWORK = {
         'rest_framework.permissions.IsAuthenticated',
     ],
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework.authentication.TokenAuthentication',
+        'api.authentication.CachedTokenAuthentication',
     ],
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.LimitOffsetPagination',
     'PAGE_SIZE': 5,
 }
 
+# in-process token cache for CachedTokenAuthentication
+TOKEN_CACHE_MAX_SIZE = int(os.getenv('TOKEN_CACHE_MAX_SIZE', 10000))
+TOKEN_CACHE_TTL = int(os.getenv('TOKEN_CACHE_TTL', 60))
+
+# response cache for anonymous ad listings (seconds)
+ADS_LISTING_CACHE_TTL = int(os.getenv('ADS_LISTING_CACHE_TTL', 30))
+ADS_LISTING_CACHE_STALE_TTL = int(os.getenv('ADS_LISTING_CACHE_STALE_TTL', 30))
+ADS_LISTING_CACHE_LOCK_TIMEOUT = int(os.getenv('ADS_LISTING_CACHE_LOCK_TIMEOUT', 5))
+
+# max ads accepted by POST /api/ads/batch/
+ADS_BATCH_MAX_SIZE = int(os.getenv('ADS_BATCH_MAX_SIZE', 1000))
+
+# multi-party barter cycles: max users in a cycle, sync overlap (seconds)
+BARTER_MAX_CYCLE_LENGTH = int(os.getenv('BARTER_MAX_CYCLE_LENGTH', 4))
+BARTER_SYNC_OVERLAP = int(os.getenv('BARTER_SYNC_OVERLAP', 30))
+
+# ad matches index: sync overlap, category history refresh (seconds)
+MATCH_SYNC_OVERLAP = int(os.getenv('MATCH_SYNC_OVERLAP', 30))
+MATCH_AFFINITY_TTL = int(os.getenv('MATCH_AFFINITY_TTL', 300))
+
+# background media tasks: image renditions and file cleanup
+MEDIA_TASKS_ASYNC = os.getenv('MEDIA_TASKS_ASYNC', 'True') == 'True'
+MEDIA_TASK_WORKERS = int(os.getenv('MEDIA_TASK_WORKERS', 2))
+
+# per-request timings: Server-Timing header and slow request log (ms)
+PERF_TIMING_ENABLED = os.getenv('PERF_TIMING_ENABLED', 'True') == 'True'
+SLOW_REQUEST_MS = int(os.getenv('SLOW_REQUEST_MS', 500))
+
+# Prometheus metrics at /metrics, one mmap file per worker process
+METRICS_ENABLED = os.getenv('METRICS_ENABLED', 'True') == 'True'
+METRICS_DIR = os.getenv('METRICS_DIR', '/tmp/barter_metrics')
+
 SPECTACULAR_SETTINGS = {
     "TITLE": "barter_system_platform",
     "DESCRIPTION": "Документация для приложения barter_system_platform",
@@ -146,4 +197,8 @@ SPECTACULAR_SETTINGS = {
         "filter": True,
     },
     "COMPONENT_SPLIT_REQUEST": True,
+    "ENUM_NAME_OVERRIDES": {
+        "ProposalStatusEnum": "ads.choices.PROPOSAL_STATUS_CHOICES",
+        "ProposalDecisionEnum": "ads.choices.PROPOSAL_DECISION_CHOICES",
+    },
 }
@@ -1,8 +1,44 @@
 import pytest
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from rest_framework.test import APIClient
 from users.models import User
-from ads.models import Category
+from ads.models import Ad, Category, ExchangeProposal
 from rest_framework.authtoken.models import Token
+from ads.barter import barter_index
+from ads.matches import match_index
+from api.authentication import token_cache
+from api.metrics import metrics
+
+
+@pytest.fixture(autouse=True)
+def clear_caches():
+    """Очищает кэш токенов, индексы обменов и кэш Django между тестами."""
+
+    token_cache.clear()
+    barter_index.reset()
+    match_index.reset()
+    cache.clear()
+
+
+@pytest.fixture(autouse=True)
+def metrics_dir(settings, tmp_path_factory):
+    """Отдельный каталог файлов метрик для каждого теста."""
+
+    settings.METRICS_DIR = str(tmp_path_factory.mktemp('metrics'))
+    metrics.reset()
+    yield settings.METRICS_DIR
+    metrics.reset()
+
+
+@pytest.fixture
+def media(settings, tmp_path):
+    """Временная медиа-папка и синхронные медиа-задачи."""
+
+    settings.MEDIA_ROOT = str(tmp_path)
+    settings.MEDIA_TASKS_ASYNC = False
+    return tmp_path
 
 
 @pytest.fixture
@@ -37,6 +73,64 @@ def category():
     )
 
 
+@pytest.fixture
+def other_category():
+    """Создаёт и возвращает вторую категорию 'Игры'."""
+
+    return Category.objects.create(title='Игры', description='Настольные')
+
+
+@pytest.fixture
+def ads(user, category, other_category):
+    """Создаёт по объявлению user в категориях category и other_category."""
+
+    return (
+        Ad.objects.create(
+            title='Роман', description='...',
+            user=user, category=category, condition='new'
+        ),
+        Ad.objects.create(
+            title='Шахматы', description='...',
+            user=user, category=other_category, condition='new'
+        ),
+    )
+
+
+@pytest.fixture
+def exchange_history(user, another_user, category):
+    """Создаёт 10 пар объявлений user и another_user с предложением
+    обмена в каждой паре и возвращает последнее предложение."""
+
+    proposal = None
+    for i in range(10):
+        ad_sender = Ad.objects.create(
+            title=f'Объявление {user.username} {i}', description='...',
+            user=user, category=category, condition='new'
+        )
+        ad_receiver = Ad.objects.create(
+            title=f'Объявление {another_user.username} {i}', description='...',
+            user=another_user, category=category, condition='used'
+        )
+        proposal = ExchangeProposal.objects.create(
+            ad_sender=ad_sender, ad_receiver=ad_receiver
+        )
+    return proposal
+
+
+@pytest.fixture
+def count_queries():
+    """Возвращает функцию (client, url, data=None), которая выполняет
+    GET-запрос и возвращает число запросов к БД и ответ."""
+
+    def count(client, url, data=None):
+        with CaptureQueriesContext(connection) as context:
+            response = client.get(url, data)
+        assert response.status_code == 200, response.data
+        return len(context.captured_queries), response
+
+    return count
+
+
 @pytest.fixture
 def api_client():
     """Возвращает DRF APIClient без авторизации."""
@@ -15,5 +15,8 @@ python manage.py create_su || true
 echo "Creating test categories..."
 python manage.py create_category || true
 
+echo "Clearing metrics of previous workers..."
+rm -rf "${METRICS_DIR:-/tmp/barter_metrics}"
+
 echo "Starting Gunicorn..."
 exec "$@"
@@ -0,0 +1,11 @@
+"""Настройки gunicorn сервиса backend (WSGI, синхронные воркеры).
+
+Число воркеров задаёт SERVER_WORKERS.
+"""
+import os
+
+wsgi_app = 'config.wsgi:application'
+workers = int(os.getenv('SERVER_WORKERS', 1))
+bind = '0.0.0.0:8000'
+timeout = 120
+chdir = '/app'